@@ -0,0 +1,203 @@
+import gc
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from users.models import CustomUser, Organisation
+
+from . import models
+
+
+def measure_time(repeat: int, run) -> float:
+    """Times a function, keeping the best of ``repeat`` runs
+
+    Args:
+        repeat (int): Number of runs
+        run (callable): Function to time
+
+    Returns:
+        float: fastest run in ms
+    """
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def measure_throughput(run, min_time: float) -> dict:
+    """Measures the best ops/sec of 3 rounds of ``min_time`` seconds, and the
+    peak memory of one run
+
+    Args:
+        run (callable): Function to measure
+        min_time (float): Seconds each round runs for
+
+    Returns:
+        dict: ``ops_per_sec`` and ``peak_memory_bytes``
+    """
+
+    best = 0
+    for _ in range(3):
+        ops, started = 0, time.perf_counter()
+        while (elapsed := time.perf_counter() - started) < min_time:
+            run()
+            ops += 1
+        best = max(best, ops / elapsed)
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ops_per_sec": round(best, 2), "peak_memory_bytes": peak}
+
+
+def measure_memory(load) -> int:
+    """Measures the memory held by the result of a function (kept alive until
+    measured)
+
+    Args:
+        load (callable): Function returning the measured objects
+
+    Returns:
+        int: allocated bytes
+    """
+
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def build_user(i: int, **fields) -> CustomUser:
+    """Builds an unsaved synthetic user numbered ``i``"""
+
+    return CustomUser(
+        **{
+            "email": f"user{i}@planora.test",
+            "name": f"User {i}",
+            "location": "Bhopal",
+            **fields,
+        }
+    )
+
+
+def build_organisation(i: int, **fields) -> Organisation:
+    """Builds an unsaved synthetic organisation numbered ``i``"""
+
+    return Organisation(
+        **{
+            "name": f"Org {i}",
+            "description": "Organisation description",
+            "email": f"org{i}@planora.test",
+            "tags": ["music", "live"],
+            "location": "Bhopal",
+            **fields,
+        }
+    )
+
+
+def build_event(i: int, organisation, user, now=None, **fields) -> models.Event:
+    """Builds an unsaved synthetic published event numbered ``i``, starting
+    ``i`` hours after ``now``
+
+    Args:
+        i (int): Number of the event (unique scan id)
+        organisation (Organisation): Organisation of the event
+        user (CustomUser): Creator of the event
+        now (datetime): Reference time (defaults to the current time)
+        fields: Overridden field values
+
+    Returns:
+        Event: event
+    """
+
+    start = (now or timezone.now()) + timedelta(hours=i)
+    return models.Event(
+        **{
+            "organisation": organisation,
+            "created_by": user,
+            "name": f"Event {i}",
+            "scan_id": str(10000000 + i),
+            "description": "Description " * 20,
+            "start_datetime": start,
+            "end_datetime": start + timedelta(hours=2),
+            "category": "music",
+            "tags": ["live", "free"],
+            "type": "offline",
+            "location": "Bhopal",
+            "latitude": Decimal("23.25990"),
+            "longitude": Decimal("77.41260"),
+            "status": "published",
+            **fields,
+        }
+    )
+
+
+def build_objects(count: int) -> tuple:
+    """Builds in-memory (unsaved, but with ids and timestamps) events, each
+    with its own organisation and creator, for the serialization benchmarks
+
+    Args:
+        count (int): Number of events
+
+    Returns:
+        tuple: (events, users, organisations)
+    """
+
+    now = timezone.now()
+    users = [build_user(i, id=i, date_joined=now) for i in range(1, count + 1)]
+    organisations = [
+        build_organisation(i, id=i, created_at=now, updated_at=now)
+        for i in range(1, count + 1)
+    ]
+    events = [
+        build_event(i, organisation, user, now, id=i, created_at=now, updated_at=now)
+        for i, (organisation, user) in enumerate(zip(organisations, users), 1)
+    ]
+    return events, users, organisations
+
+
+def seed_events(count: int, batch_size: int, owners: int = 100, fields=None):
+    """Inserts synthetic events, shared by ``owners`` organisations and users,
+    with bulk inserts (no signals: the read-models are not refreshed)
+
+    Args:
+        count (int): Number of events
+        batch_size (int): Number of events inserted per query
+        owners (int): Number of organisations and users
+        fields (callable): Returns the overridden field values of event ``i``
+    """
+
+    users = CustomUser.objects.bulk_create(
+        [build_user(i, email=f"benchmark{i}@planora.test") for i in range(owners)]
+    )
+    organisations = Organisation.objects.bulk_create(
+        [
+            build_organisation(i, email=f"benchmark{i}@planora.test")
+            for i in range(owners)
+        ]
+    )
+    now = timezone.now()
+
+    for offset in range(0, count, batch_size):
+        models.Event.objects.bulk_create(
+            [
+                build_event(
+                    i,
+                    organisations[i % owners],
+                    users[i % owners],
+                    now,
+                    **(fields(i) if fields else {}),
+                )
+                for i in range(offset, min(offset + batch_size, count))
+            ]
+        )
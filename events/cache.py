@@ -0,0 +1,178 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from utils.conditional import get_etag
+
+FEED_CACHE_PREFIX = "events:feed"
+FEED_VERSION_KEY = f"{FEED_CACHE_PREFIX}:version"
+FEED_HITS_KEY = f"{FEED_CACHE_PREFIX}:hits"
+FEED_MISSES_KEY = f"{FEED_CACHE_PREFIX}:misses"
+FEED_CHANGES_PREFIX = f"{FEED_CACHE_PREFIX}:changes"
+# Seconds the ids changed by a feed version are kept for the facet indexes
+FEED_CHANGES_TTL = 60 * 60
+# Indexes further behind the current version than this do a full sync
+FEED_CHANGES_MAX_VERSIONS = 100
+
+
+def increment(key: str) -> int:
+    """Atomically increments a counter in the cache, creating it if missing
+
+    Args:
+        key (str): Cache key of the counter
+
+    Returns:
+        int: new value of the counter
+    """
+
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:  # Evicted between add and incr
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def get_feed_version() -> int:
+    """Returns the current global feed version"""
+
+    return cache.get_or_set(FEED_VERSION_KEY, 1, timeout=None)
+
+
+def bump_feed_version(event_ids=None) -> int:
+    """Invalidates every cached feed page by moving to a new feed version, and
+    records the feed rows it changed so that the facet index of every process
+    can apply just those rows (see events.facets.get_facet_index)
+
+    Args:
+        event_ids (list): Ids of the added, changed or removed feed rows; None
+            when unknown, which makes the facet indexes do a full sync
+
+    Returns:
+        int: new feed version
+    """
+
+    version = increment(FEED_VERSION_KEY)
+    if event_ids is not None:
+        cache.set(
+            f"{FEED_CHANGES_PREFIX}:{version}",
+            list(event_ids),
+            timeout=FEED_CHANGES_TTL,
+        )
+
+    return version
+
+
+def get_feed_changes(since, until: int):
+    """Collects the feed rows changed between two feed versions
+
+    Args:
+        since (int): Version the caller is at (None if it has none)
+        until (int): Current feed version
+
+    Returns:
+        set: ids of the changed rows, or None if the changes of a version in
+        between are unknown (not recorded, evicted, or too many versions)
+    """
+
+    if since is None or not 0 <= until - since <= FEED_CHANGES_MAX_VERSIONS:
+        return None
+
+    keys = [
+        f"{FEED_CHANGES_PREFIX}:{version}" for version in range(since + 1, until + 1)
+    ]
+    changes = cache.get_many(keys)
+    if len(changes) < len(keys):
+        return None
+
+    return {event_id for event_ids in changes.values() for event_id in event_ids}
+
+
+def get_feed_signature(request) -> str:
+    """Normalizes the query parameters of a feed request, so that requests
+    asking for the same page share a cache entry
+
+    Args:
+        request (Request): Incoming request
+
+    Returns:
+        str: normalized filter signature
+    """
+
+    params = []
+    for key in sorted(request.GET.keys()):
+        values = [value.strip() for value in request.GET.getlist(key)]
+        if key == "search":
+            values = [value.lower() for value in values]
+        params.append(f"{key}={','.join(sorted(v for v in values if v))}")
+
+    return "&".join(params)
+
+
+def get_feed_cache_key(request) -> str:
+    """Builds the cache key of a feed page from its filter signature and the
+    current feed version
+
+    Args:
+        request (Request): Incoming request
+
+    Returns:
+        str: cache key
+    """
+
+    digest = hashlib.sha1(get_feed_signature(request).encode("utf-8")).hexdigest()
+    return f"{FEED_CACHE_PREFIX}:{get_feed_version()}:{request.path}:{digest}"
+
+
+def get_cached_feed(key: str):
+    """Fetches the cached response data of a feed page
+
+    Args:
+        key (str): Cache key of the page (see get_feed_cache_key)
+
+    Returns:
+        dict: cached data, or None
+    """
+
+    data = cache.get(key)
+    increment(FEED_HITS_KEY if data is not None else FEED_MISSES_KEY)
+
+    return data
+
+
+def get_feed_etag(key: str, renderer_format: str = "json") -> str:
+    """Builds the ETag of a feed page from its cache key, which holds the feed
+    version and the filter signature. As past events leave the feed without a
+    version bump, the ETag also changes every ``FEED_CACHE_TTL`` seconds.
+
+    Args:
+        key (str): Cache key of the page (see get_feed_cache_key)
+        renderer_format (str): Format of the representation (json / columnar)
+
+    Returns:
+        str: quoted ETag
+    """
+
+    return get_etag(key, renderer_format, int(time.time() // settings.FEED_CACHE_TTL))
+
+
+def set_cached_feed(key: str, data: dict):
+    """Caches the response data of a feed page for ``FEED_CACHE_TTL`` seconds"""
+
+    cache.set(key, data, timeout=settings.FEED_CACHE_TTL)
+
+
+def get_feed_cache_stats() -> dict:
+    """Returns the hit/miss counters of the feed cache"""
+
+    hits = cache.get(FEED_HITS_KEY, 0)
+    misses = cache.get(FEED_MISSES_KEY, 0)
+
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        "version": get_feed_version(),
+    }
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Caches that must be shared by all server processes: the feed version
+# (events.cache), rate-limit buckets and affinity invalidations would otherwise
+# only be seen by the process that wrote them. Fragments are keyed by version,
+# so a per-process fragment cache is only less effective
+SHARED_CACHE_ALIASES = ["default", "ratelimit", "affinity"]
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_caches(app_configs, **kwargs):
+    """Reports the shared cache aliases configured with a per-process backend
+    (run by ``manage.py check --deploy``)"""
+
+    errors = []
+    for alias in SHARED_CACHE_ALIASES:
+        if settings.CACHES[alias]["BACKEND"] not in settings.LOCAL_CACHE_BACKENDS:
+            continue
+        variables = "CACHE_URL"
+        if alias != "default":
+            variables = f"{alias.upper()}_CACHE_URL (or CACHE_URL)"
+        errors.append(
+            Error(
+                f"The {alias} cache must be shared by all server processes.",
+                hint=f"Set {variables} to a shared cache such as "
+                "redis://host:6379/0.",
+                id="events.E001",
+            )
+        )
+    return errors
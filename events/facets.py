@@ -0,0 +1,433 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils import timezone
+
+from utils.tags import normalize_tags
+
+from . import models
+from .cache import get_feed_changes, get_feed_version
+
+FACET_FIELDS = ["category", "type", "tags"]
+# Number of feed rows loaded per query while syncing the index
+FACET_SYNC_CHUNK_SIZE = 1000
+# Beyond this many changed rows, rebuilding the bitmaps in one pass is cheaper
+# than shifting every bitmap once per moved row
+FACET_APPLY_MAX_ROWS = 100
+
+
+def build_bitmap(positions: list, size: int) -> int:
+    """Builds a bitmap (an int whose bit ``i`` is set for each position ``i``)
+
+    Args:
+        positions (list): Positions of the set bits
+        size (int): Number of positions of the index
+
+    Returns:
+        int: bitmap
+    """
+
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def insert_bit(bitmap: int, position: int) -> int:
+    """Shifts the bits of a bitmap from ``position`` up by one (the new bit at
+    ``position`` is unset)"""
+
+    low = bitmap & ((1 << position) - 1)
+    return low | ((bitmap >> position) << (position + 1))
+
+
+def remove_bit(bitmap: int, position: int) -> int:
+    """Drops the bit at ``position`` of a bitmap, shifting the bits above it
+    down by one"""
+
+    low = bitmap & ((1 << position) - 1)
+    return low | ((bitmap >> (position + 1)) << position)
+
+
+def get_row_values(row: tuple) -> list:
+    """Lists the ``(field, value)`` pairs of a row that have a bitmap"""
+
+    _, category, event_type, tags, _ = row
+    return [("category", category), ("type", event_type)] + [
+        ("tags", tag) for tag in tags
+    ]
+
+
+class FacetResult:
+    """Lazy, date-ordered sequence of the event ids selected by a bitmap. Only
+    the ids of the sliced page are materialized, so paginating it (e.g. with a
+    ``PageNumberPagination``) does not walk the whole result.
+    """
+
+    def __init__(self, ids: list, mask: int, descending: bool = False):
+        self.ids = ids
+        self.mask = mask
+        self.descending = descending
+        self.count = mask.bit_count()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index : index + 1][0]
+
+        start, stop, _ = index.indices(self.count)
+
+        # Binary digits of the mask, latest position first when descending
+        bits = bin(self.mask)[2:] if self.descending else bin(self.mask)[:1:-1]
+        width = len(bits)
+
+        ids, position = [], -1
+        for found in range(stop):
+            position = bits.find("1", position + 1)
+            if found >= start:
+                ids.append(
+                    self.ids[width - 1 - position if self.descending else position]
+                )
+        return ids
+
+
+class FacetIndex:
+    """Per-process bitmap index over the feed read-model (``FeedEvent``)
+
+    Feed rows are held in an array ordered by ``(start_datetime, pk)``; every
+    category, type and tag has a bitmap of its positions in that array. Filters
+    are bitmap intersections / unions and facet counts are popcounts, so no SQL
+    is issued until the rows of the requested page are fetched.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.checked_at = 0.0
+        # pk -> (start_datetime, category, type, tags, updated_at)
+        self.rows = {}
+        # (ids, starts, bitmaps), swapped in as a whole on rebuild
+        self.snapshot = ([], [], {field: {} for field in FACET_FIELDS})
+
+    def load_rows(self, event_ids=None) -> dict:
+        """Loads the indexed attributes of feed rows from the database
+
+        Args:
+            event_ids (list): Ids to load, or None to load every row
+
+        Returns:
+            dict: pk -> (start_datetime, category, type, tags, updated_at)
+        """
+
+        feed_events = models.FeedEvent.objects.values_list(
+            "pk", "start_datetime", "category", "type", "details__tags", "updated_at"
+        )
+        if event_ids is None:
+            chunks = [feed_events]
+        else:
+            event_ids = list(event_ids)
+            chunks = [
+                feed_events.filter(
+                    pk__in=event_ids[offset : offset + FACET_SYNC_CHUNK_SIZE]
+                )
+                for offset in range(0, len(event_ids), FACET_SYNC_CHUNK_SIZE)
+            ]
+
+        return {
+            pk: (start, category, event_type, tuple(normalize_tags(tags)), updated)
+            for chunk in chunks
+            for pk, start, category, event_type, tags, updated in chunk.iterator(
+                chunk_size=FACET_SYNC_CHUNK_SIZE
+            )
+        }
+
+    def sync(self):
+        """Applies the feed rows added, changed or removed since the last sync.
+        Only the ``(pk, updated_at)`` pairs of unchanged rows are read.
+        """
+
+        current = dict(models.FeedEvent.objects.values_list("pk", "updated_at"))
+        removed = self.rows.keys() - current.keys()
+        changed = [
+            pk
+            for pk, updated_at in current.items()
+            if pk not in self.rows or self.rows[pk][4] != updated_at
+        ]
+
+        if removed or changed:
+            rows = {pk: row for pk, row in self.rows.items() if pk not in removed}
+            rows.update(self.load_rows(changed))
+            self.rebuild(rows)
+
+    def apply(self, event_ids):
+        """Applies the given added, changed or removed feed rows to the index
+        without reading any other row. Rows whose start is unchanged flip their
+        bits in place; moved, added and removed rows shift the bitmaps above
+        their position. The new snapshot is swapped in as a whole.
+
+        Args:
+            event_ids (set): Ids of the rows changed since the last sync
+        """
+
+        loaded = self.load_rows(event_ids)
+        rows = dict(self.rows)
+        changes = [
+            (pk, rows.get(pk), loaded.get(pk))
+            for pk in sorted(event_ids)
+            if rows.get(pk) != loaded.get(pk)
+        ]
+        if not changes:
+            return
+
+        for pk, _, row in changes:
+            if row is None:
+                rows.pop(pk, None)
+            else:
+                rows[pk] = row
+
+        if len(changes) > FACET_APPLY_MAX_ROWS:
+            self.rebuild(rows)
+            return
+
+        ids, starts, bitmaps = self.snapshot
+        ids, starts = list(ids), list(starts)
+        bitmaps = {field: dict(values) for field, values in bitmaps.items()}
+
+        def locate(start, pk):
+            return bisect_left(
+                range(len(ids)),
+                (start, pk),
+                key=lambda position: (starts[position], ids[position]),
+            )
+
+        for pk, old, new in changes:
+            if old is not None and new is not None and old[0] == new[0]:
+                position = locate(old[0], pk)
+                for field, value in get_row_values(old):
+                    bitmaps[field][value] &= ~(1 << position)
+            else:
+                if old is not None:
+                    position = locate(old[0], pk)
+                    del ids[position], starts[position]
+                    for values in bitmaps.values():
+                        for value, bitmap in values.items():
+                            values[value] = remove_bit(bitmap, position)
+                if new is None:
+                    continue
+                position = locate(new[0], pk)
+                ids.insert(position, pk)
+                starts.insert(position, new[0])
+                for values in bitmaps.values():
+                    for value, bitmap in values.items():
+                        values[value] = insert_bit(bitmap, position)
+
+            for field, value in get_row_values(new):
+                bitmaps[field][value] = bitmaps[field].get(value, 0) | (1 << position)
+
+        for values in bitmaps.values():
+            for value in [value for value, bitmap in values.items() if not bitmap]:
+                del values[value]
+
+        self.rows = rows
+        self.snapshot = (ids, starts, bitmaps)
+
+    def rebuild(self, rows: dict):
+        """Rebuilds the ordered id array and the bitmaps from in-memory rows"""
+
+        ids = sorted(rows, key=lambda pk: (rows[pk][0], pk))
+        positions = {field: defaultdict(list) for field in FACET_FIELDS}
+
+        for position, pk in enumerate(ids):
+            for field, value in get_row_values(rows[pk]):
+                positions[field][value].append(position)
+
+        bitmaps = {
+            field: {
+                value: build_bitmap(value_positions, len(ids))
+                for value, value_positions in positions[field].items()
+            }
+            for field in FACET_FIELDS
+        }
+
+        self.rows = rows
+        self.snapshot = (ids, [rows[pk][0] for pk in ids], bitmaps)
+
+    def check(self) -> list:
+        """Checks the index against the database and rebuilds it from the
+        database if it drifted
+
+        Returns:
+            list: ids of the rows that were missing, stale or no longer in the feed
+        """
+
+        rows = self.load_rows()
+        mismatched = sorted(
+            pk
+            for pk in rows.keys() | self.rows.keys()
+            if rows.get(pk) != self.rows.get(pk)
+        )
+        if mismatched:
+            self.rebuild(rows)
+
+        return mismatched
+
+    def get_mask(self, filters: dict, exclude=None, now=None, snapshot=None) -> int:
+        """Evaluates filters into a bitmap of upcoming feed rows
+
+        Args:
+            filters (dict): ``category``, ``type``, ``tags`` and ``match_all``
+            exclude (str): Facet field whose filter is ignored (facet counts)
+            now (datetime): Rows starting before it are left out
+            snapshot (tuple): Snapshot to evaluate (defaults to the current one)
+
+        Returns:
+            int: bitmap of the matching positions
+        """
+
+        ids, starts, bitmaps = snapshot or self.snapshot
+
+        # Rows are date-ordered, so the upcoming ones are a suffix of the array
+        first = bisect_left(starts, now or timezone.now())
+        mask = (1 << len(ids)) - (1 << first)
+
+        for field in ["category", "type"]:
+            if filters.get(field) and field != exclude:
+                mask &= bitmaps[field].get(filters[field], 0)
+
+        tags = normalize_tags(filters.get("tags"))
+        if tags and exclude != "tags":
+            tag_bitmaps = [bitmaps["tags"].get(tag, 0) for tag in tags]
+            if filters.get("match_all", True):
+                for bitmap in tag_bitmaps:
+                    mask &= bitmap
+            else:
+                union = 0
+                for bitmap in tag_bitmaps:
+                    union |= bitmap
+                mask &= union
+
+        return mask
+
+    def filter(self, filters: dict, descending: bool = False) -> FacetResult:
+        """Returns the ids of the upcoming feed rows matching the filters, in
+        ``(start_datetime, pk)`` order"""
+
+        snapshot = self.snapshot
+        return FacetResult(
+            snapshot[0], self.get_mask(filters, snapshot=snapshot), descending
+        )
+
+    def get_facet_counts(self, filters: dict) -> dict:
+        """Counts the matching rows per category, type and tag. Category and
+        type counts ignore their own filter (so every alternative is listed), as
+        do tag counts with ``match_all=False``; with ``match_all`` tag counts
+        narrow the current result.
+
+        Args:
+            filters (dict): ``category``, ``type``, ``tags`` and ``match_all``
+
+        Returns:
+            dict: field -> {value: count}, highest count first
+        """
+
+        snapshot = self.snapshot
+        now = timezone.now()
+        facets = {}
+
+        for field in FACET_FIELDS:
+            exclude = None
+            if field != "tags" or not filters.get("match_all", True):
+                exclude = field
+            mask = self.get_mask(filters, exclude=exclude, now=now, snapshot=snapshot)
+
+            counts = {
+                value: (mask & bitmap).bit_count()
+                for value, bitmap in snapshot[2][field].items()
+            }
+            facets[field] = dict(
+                sorted(
+                    ((value, count) for value, count in counts.items() if count),
+                    key=lambda item: (-item[1], item[0]),
+                )
+            )
+
+        return facets
+
+
+facet_index = FacetIndex()
+
+
+def is_check_due() -> bool:
+    return (
+        not facet_index.checked_at
+        or time.monotonic() - facet_index.checked_at
+        > settings.FACET_INDEX_CHECK_INTERVAL
+    )
+
+
+def get_facet_index() -> FacetIndex:
+    """Returns the facet index of this process, synced with the current feed
+    version. It is fully loaded on first use, and every
+    ``FACET_INDEX_CHECK_INTERVAL`` seconds checked against the database.
+
+    The feed version is read from the shared cache (see CACHES), so a change
+    made through any server process syncs the index of every process on its
+    next request. Only the rows recorded with the versions in between are
+    loaded and applied; the full ``(pk, updated_at)`` scan of ``sync`` is left
+    for versions whose changes are unknown (e.g. evicted). The periodic check
+    only repairs changes made behind the signals (e.g. ``QuerySet.update``).
+    """
+
+    version = get_feed_version()
+
+    if facet_index.version != version or is_check_due():
+        with facet_index.lock:
+            if is_check_due():
+                facet_index.check()
+                facet_index.checked_at = time.monotonic()
+            elif facet_index.version != version:
+                event_ids = get_feed_changes(facet_index.version, version)
+                if event_ids is None:
+                    facet_index.sync()
+                else:
+                    facet_index.apply(event_ids)
+            facet_index.version = version
+
+    return facet_index
+
+
+def get_facet_filters(request) -> dict:
+    """Reads the facet filters of a feed request"""
+
+    return {
+        "category": request.GET.get("category"),
+        "type": request.GET.get("type"),
+        "tags": request.GET.getlist("tags"),
+        "match_all": request.GET.get("tags_match", "all") != "any",
+    }
+
+
+def paginate_facet_feed(paginator, request) -> list:
+    """Filters the feed through the facet index and fetches only the rows of the
+    requested page
+
+    Args:
+        paginator (PageNumberPagination): Paginator of the view
+        request (Request): Incoming request
+
+    Returns:
+        list: FeedEvent rows of the page
+    """
+
+    event_ids = get_facet_index().filter(
+        get_facet_filters(request), descending=request.GET.get("order") == "desc"
+    )
+    page_event_ids = paginator.paginate_queryset(event_ids, request)
+    feed_events = models.FeedEvent.objects.defer("details").in_bulk(page_event_ids)
+
+    return [feed_events[id] for id in page_event_ids if id in feed_events]
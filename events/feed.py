@@ -0,0 +1,199 @@
+import json
+
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from . import models
+from .fragments import get_feed_fragments
+from .serializers import EventSerializer
+
+
+def serialize_feed_details(event: models.Event) -> dict:
+    """Serializes an event for the feed read-model. Values are stored exactly as
+    the renderer would encode them (datetimes as ISO strings, decimals as
+    floats), so feeds built from the read-model are identical to live ones.
+
+    Args:
+        event (Event): Event to serialize
+
+    Returns:
+        dict: JSON-compatible event details
+    """
+
+    return json.loads(
+        json.dumps(EventSerializer(event).details_serializer(), cls=JSONEncoder)
+    )
+
+
+def get_sparse_feed_details(feed_events: list, fields: list) -> list:
+    """Reads only the requested fields of the pre-serialized details of feed
+    rows, extracting them from the JSON column in SQL
+
+    Args:
+        feed_events (list): FeedEvent rows of a page (``details`` may be deferred)
+        fields (list): Requested fields (see utils.fields)
+
+    Returns:
+        list: dictionaries of the requested details, in the order of the rows
+    """
+
+    paths = {field: f"details__{field.replace('.', '__')}" for field in fields}
+    rows = models.FeedEvent.objects.filter(
+        pk__in=[feed_event.pk for feed_event in feed_events]
+    ).values("pk", *paths.values())
+    rows = {row["pk"]: row for row in rows}
+
+    sparse_details = []
+    for feed_event in feed_events:
+        if feed_event.pk not in rows:
+            continue
+        details = {}
+        for field, path in paths.items():
+            key, _, child = field.partition(".")
+            if child:
+                details.setdefault(key, {})[child] = rows[feed_event.pk][path]
+            else:
+                details[key] = rows[feed_event.pk][path]
+        sparse_details.append(details)
+
+    return sparse_details
+
+
+def get_feed_details(feed_events: list, fields: list = None) -> list:
+    """Returns the details of the feed rows of a page: their cached JSON
+    fragments, or only the requested fields of a sparse fieldset
+
+    Args:
+        feed_events (list): FeedEvent rows of a page (``details`` may be deferred)
+        fields (list): Requested fields (see utils.fields), None for all
+
+    Returns:
+        list: details (JSONFragment or dict) of each row
+    """
+
+    if fields:
+        return get_sparse_feed_details(feed_events, fields)
+    return get_feed_fragments(feed_events)
+
+
+def is_feed_event(event: models.Event) -> bool:
+    """Checks whether an event belongs in the feed (published and upcoming)"""
+
+    return event.status == "published" and event.start_datetime >= timezone.now()
+
+
+def build_feed_event(event: models.Event) -> models.FeedEvent:
+    return models.FeedEvent(
+        event=event,
+        name=event.name,
+        scan_id=event.scan_id,
+        start_datetime=event.start_datetime,
+        category=event.category,
+        type=event.type,
+        latitude=event.latitude,
+        longitude=event.longitude,
+        geohash=event.geohash,
+        details=serialize_feed_details(event),
+    )
+
+
+def refresh_feed_events(events) -> list:
+    """Upserts the feed rows of published upcoming events and removes the rows
+    of every other event
+
+    Args:
+        events (QuerySet | list): Saved events
+
+    Returns:
+        list: ids of the feed rows written or removed (empty if the events are
+        not, and were not, in the feed)
+    """
+
+    events = list(events)
+    feed_events = [build_feed_event(event) for event in events if is_feed_event(event)]
+
+    removed = list(
+        models.FeedEvent.objects.filter(
+            event__in=[event for event in events if not is_feed_event(event)]
+        ).values_list("pk", flat=True)
+    )
+    if removed:
+        models.FeedEvent.objects.filter(pk__in=removed).delete()
+    models.FeedEvent.objects.bulk_create(
+        feed_events,
+        update_conflicts=True,
+        unique_fields=["event"],
+        update_fields=[
+            "name",
+            "scan_id",
+            "start_datetime",
+            "category",
+            "type",
+            "latitude",
+            "longitude",
+            "geohash",
+            "details",
+            "updated_at",
+        ],
+    )
+
+    return [feed_event.pk for feed_event in feed_events] + removed
+
+
+def refresh_feed_events_of(**filters) -> list:
+    """Reloads the events matching the filters and refreshes their feed rows.
+    Events are reloaded because instances saved from request data still hold
+    the raw (string) input values.
+
+    Args:
+        filters: Event lookups, e.g. ``pk=1`` or ``organisation_id=1``
+
+    Returns:
+        list: ids of the feed rows written or removed
+    """
+
+    return refresh_feed_events(
+        models.Event.objects.filter(**filters).select_related(
+            "organisation", "created_by"
+        )
+    )
+
+
+def sweep_feed_events() -> int:
+    """Ages past events out of the feed read-model
+
+    Returns:
+        int: number of removed rows
+    """
+
+    deleted, _ = models.FeedEvent.objects.filter(
+        start_datetime__lt=timezone.now()
+    ).delete()
+    return deleted
+
+
+def rebuild_feed_events(batch_size: int = 1000) -> int:
+    """Rebuilds the feed read-model from the events table
+
+    Args:
+        batch_size (int): Number of events serialized per batch
+
+    Returns:
+        int: number of feed rows
+    """
+
+    models.FeedEvent.objects.all().delete()
+
+    events = models.Event.objects.filter(
+        status="published", start_datetime__gte=timezone.now()
+    ).select_related("organisation", "created_by")
+
+    batch = []
+    for event in events.iterator(chunk_size=batch_size):
+        batch.append(event)
+        if len(batch) >= batch_size:
+            refresh_feed_events(batch)
+            batch = []
+    refresh_feed_events(batch)
+
+    return models.FeedEvent.objects.count()
@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.core.cache import caches
+
+from planoraAPI.settings.custom_DRF_settings.renderers import (
+    JSONFragment,
+    UJSONRenderer,
+)
+
+from . import models
+
+FRAGMENT_CACHE_PREFIX = "events:fragment"
+
+
+def get_fragment_cache_key(feed_event: models.FeedEvent) -> str:
+    """Builds the cache key of the encoded details of a feed row. The row's
+    ``updated_at`` moves whenever the event is edited or published (or its
+    organisation / creator changes), so stale fragments are never read again
+    and simply expire.
+
+    Args:
+        feed_event (FeedEvent): Feed row
+
+    Returns:
+        str: cache key
+    """
+
+    version = int(feed_event.updated_at.timestamp() * 1_000_000)
+    return f"{FRAGMENT_CACHE_PREFIX}:{feed_event.pk}:{version}"
+
+
+def get_feed_fragments(feed_events: list) -> list:
+    """Returns the encoded details of feed rows, encoding (and caching) only the
+    ones missing from the cache. Details deferred on the rows are loaded in a
+    single query for the missing fragments only.
+
+    Args:
+        feed_events (list): FeedEvent rows (``details`` may be deferred)
+
+    Returns:
+        list: JSONFragment of each row, in the same order
+    """
+
+    keys = [get_fragment_cache_key(feed_event) for feed_event in feed_events]
+    fragments = caches["fragments"].get_many(keys)
+
+    missing = [
+        feed_event for key, feed_event in zip(keys, feed_events) if key not in fragments
+    ]
+    if missing:
+        deferred = [
+            feed_event.pk
+            for feed_event in missing
+            if "details" in feed_event.get_deferred_fields()
+        ]
+        details = dict(
+            models.FeedEvent.objects.filter(pk__in=deferred).values_list(
+                "pk", "details"
+            )
+            if deferred
+            else []
+        )
+
+        renderer = UJSONRenderer()
+        encoded = {
+            get_fragment_cache_key(feed_event): renderer.render(
+                details[feed_event.pk]
+                if feed_event.pk in details
+                else feed_event.details
+            )
+            for feed_event in missing
+        }
+        caches["fragments"].set_many(encoded, timeout=settings.EVENT_FRAGMENT_TTL)
+        fragments.update(encoded)
+
+    return [JSONFragment(fragments[key]) for key in keys]
@@ -0,0 +1,69 @@
+import ujson
+from django.core.management.base import BaseCommand
+
+from events.benchmarks import build_objects, measure_time
+from events.serializers import EventSerializer
+from planoraAPI.settings.custom_DRF_settings.renderers import UJSONRenderer
+
+
+class LegacyUJSONRenderer(UJSONRenderer):
+    """UJSONRenderer before the native datetime fast path (baseline)"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        ret = ujson.dumps(
+            data,
+            ensure_ascii=self.ensure_ascii,
+            escape_forward_slashes=self.escape_forward_slashes,
+            encode_html_chars=self.encode_html_chars,
+            indent=0,
+            default=self.encoder_class().default,
+        )
+        ret = ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+        return bytes(ret.encode("utf-8"))
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks UJSONRenderer against the previous renderer on a 25-event "
+        "feed page and a 10k-user list"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options):
+        events, users, _ = build_objects(10000)
+        payloads = {
+            "feed page (25 events)": {
+                "events": [
+                    {"details": EventSerializer(event).details_serializer()}
+                    for event in events[:25]
+                ],
+                "total_events": 25,
+                "page": 1,
+            },
+            "user list (10k users)": {
+                "users": [
+                    {
+                        "id": user.id,
+                        "email": user.email,
+                        "name": user.name,
+                        "created_at": user.date_joined,
+                    }
+                    for user in users
+                ]
+            },
+        }
+
+        legacy, renderer = LegacyUJSONRenderer(), UJSONRenderer()
+        for name, data in payloads.items():
+            assert legacy.render(data) == renderer.render(data)
+            repeat = options["repeat"] if "feed" in name else options["repeat"] // 20
+
+            legacy_ms = measure_time(repeat, lambda: legacy.render(data))
+            renderer_ms = measure_time(repeat, lambda: renderer.render(data))
+            self.stdout.write(
+                f"{name:24} previous: {legacy_ms:8.3f} ms   "
+                f"current: {renderer_ms:8.3f} ms   "
+                f"({legacy_ms / renderer_ms:.2f}x)"
+            )
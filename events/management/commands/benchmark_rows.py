@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from events.benchmarks import measure_memory, measure_time, seed_events
+from events.models import Event
+from events.serializers import EventSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks reading events as __slots__ rows (utils.rows) against model "
+        "hydration: per-row memory of the loaded rows, and the time to load and "
+        "serialize them. Runs inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=100000)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = options["events"]
+            self.stdout.write(f"Seeding {count} events...")
+            seed_events(count, options["batch_size"])
+
+            events = Event.objects.order_by("pk")
+            readers = {
+                "models": lambda: list(EventSerializer.narrow_queryset(events)),
+                "rows": lambda: list(EventSerializer.ROWS.read(events)),
+            }
+
+            assert [
+                EventSerializer(row).details_serializer()
+                for row in readers["rows"]()[:100]
+            ] == EventSerializer.bulk_details_serializer(events[:100])
+
+            for name, load in readers.items():
+                row_bytes = measure_memory(load) / count
+                load_ms = measure_time(options["repeat"], load)
+                serialize_ms = measure_time(
+                    options["repeat"],
+                    lambda: [
+                        EventSerializer(event).details_serializer() for event in load()
+                    ],
+                )
+                self.stdout.write(
+                    f"{name:8} {row_bytes:8.0f} B/row   load: {load_ms:9.1f} ms   "
+                    f"load + serialize: {serialize_ms:9.1f} ms"
+                )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,98 @@
+import itertools
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from events.benchmarks import measure_time, seed_events
+from events.models import Event
+from events.search import rebuild_search_index, search_events
+
+SYLLABLES = "ba ko ri ma tu ne so la vi de pu ga mo zi ta re lo fi na ku".split()
+# Queries hit words of different popularity (rank in the Zipf vocabulary)
+QUERY_RANKS = [(5,), (50,), (500,), (50, 500), (5, 50, 5000)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the feed search (token index vs. icontains scan) on a "
+        "synthetic dataset. Runs inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=500000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def build_vocabulary(self, rng, size):
+        vocabulary = set()
+        while len(vocabulary) < size:
+            vocabulary.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+        vocabulary = sorted(vocabulary)
+        rng.shuffle(vocabulary)
+        return vocabulary
+
+    def sentence(self, rng, length):
+        return " ".join(
+            rng.choices(self.vocabulary, cum_weights=self.cum_weights, k=length)
+        )
+
+    def seed(self, count, batch_size):
+        rng = random.Random(42)
+        self.vocabulary = self.build_vocabulary(rng, 20000)
+        # Word frequencies follow Zipf's law, like natural language text
+        self.cum_weights = list(
+            itertools.accumulate(1 / rank for rank in range(1, 20001))
+        )
+        now = timezone.now()
+
+        seed_events(
+            count,
+            batch_size,
+            owners=1,
+            fields=lambda i: {
+                "name": self.sentence(rng, 4),
+                "description": self.sentence(rng, 60),
+                "start_datetime": now + timedelta(hours=rng.randint(1, 24 * 90)),
+                "end_datetime": now + timedelta(days=91),
+                "tags": [],
+                "location": self.sentence(rng, 2),
+            },
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.stdout.write(f"Seeding {options['events']} events...")
+            self.seed(options["events"], options["batch_size"])
+            rebuild_search_index(batch_size=options["batch_size"])
+
+            events = Event.objects.filter(
+                status="published", start_datetime__gte=timezone.now()
+            )
+
+            for ranks in QUERY_RANKS:
+                query = " ".join(self.vocabulary[rank] for rank in ranks)
+                scan = events.filter(
+                    Q(name__icontains=query)
+                    | Q(description__icontains=query)
+                    | Q(location__icontains=query)
+                ).order_by("start_datetime")
+                indexed = search_events(events, query).order_by(
+                    "-relevance", "start_datetime"
+                )
+
+                scan_ms = measure_time(
+                    options["repeat"], lambda: list(scan[:25].values_list("id"))
+                )
+                indexed_ms = measure_time(
+                    options["repeat"], lambda: list(indexed[:25].values_list("id"))
+                )
+                self.stdout.write(
+                    f"{query!r:24} icontains: {scan_ms:9.2f} ms   "
+                    f"index: {indexed_ms:9.2f} ms"
+                )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,126 @@
+import json
+import platform
+
+from django.core.management.base import BaseCommand, CommandError
+
+from events.benchmarks import build_objects, measure_throughput
+from events.serializers import EventSerializer
+from planoraAPI.settings.custom_DRF_settings.renderers import UJSONRenderer
+from users.serializers import OrganisationSerializer, UserSerializer
+
+SIZES = [25, 1000, 10000]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the serializers and UJSONRenderer end to end on synthetic "
+        "in-memory events, users and organisations (25, 1k and 10k rows). "
+        "Writes ops/sec and peak memory to a JSON file and fails when a result "
+        "regresses past the threshold against a baseline file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default="benchmark_serializers.json")
+        parser.add_argument(
+            "--baseline", help="Results of a previous run to compare against"
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.15,
+            help="Allowed relative regression of ops/sec and peak memory",
+        )
+        parser.add_argument(
+            "--min-time",
+            type=float,
+            default=0.5,
+            help="Seconds each benchmark runs for (best of 3 rounds)",
+        )
+
+    def get_benchmarks(self, count):
+        events, users, organisations = build_objects(count)
+        renderer = UJSONRenderer()
+        return {
+            f"EventSerializer.details_serializer[{count}]": lambda: renderer.render(
+                {
+                    "events": [
+                        {"details": EventSerializer(event).details_serializer()}
+                        for event in events
+                    ]
+                }
+            ),
+            f"UserSerializer.condensed_details_serializer[{count}]": (
+                lambda: renderer.render(
+                    {
+                        "users": [
+                            UserSerializer(user).condensed_details_serializer()
+                            for user in users
+                        ]
+                    }
+                )
+            ),
+            f"OrganisationSerializer.details_serializer[{count}]": (
+                lambda: renderer.render(
+                    {
+                        "organisations": [
+                            {
+                                "details": OrganisationSerializer(
+                                    organisation
+                                ).details_serializer()
+                            }
+                            for organisation in organisations
+                        ]
+                    }
+                )
+            ),
+        }
+
+    def compare(self, results, baseline, threshold):
+        """Messages of the results regressed past the threshold"""
+        regressions = []
+        for name, result in results.items():
+            previous = baseline.get(name)
+            if not previous:
+                continue
+            if result["ops_per_sec"] < previous["ops_per_sec"] * (1 - threshold):
+                regressions.append(
+                    f"{name}: {result['ops_per_sec']} ops/sec "
+                    f"(baseline {previous['ops_per_sec']})"
+                )
+            if result["peak_memory_bytes"] > previous["peak_memory_bytes"] * (
+                1 + threshold
+            ):
+                regressions.append(
+                    f"{name}: {result['peak_memory_bytes']} B peak "
+                    f"(baseline {previous['peak_memory_bytes']})"
+                )
+        return regressions
+
+    def handle(self, *args, **options):
+        results = {}
+        for count in SIZES:
+            for name, run in self.get_benchmarks(count).items():
+                results[name] = measure_throughput(run, options["min_time"])
+                self.stdout.write(
+                    f"{name:56} {results[name]['ops_per_sec']:12.2f} ops/sec   "
+                    f"{results[name]['peak_memory_bytes'] / 1024:10.1f} KiB peak"
+                )
+
+        with open(options["output"], "w") as file:
+            json.dump(
+                {"python": platform.python_version(), "results": results},
+                file,
+                indent=2,
+            )
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if options["baseline"]:
+            with open(options["baseline"]) as file:
+                baseline = json.load(file)["results"]
+            regressions = self.compare(results, baseline, options["threshold"])
+            if regressions:
+                raise CommandError(
+                    "Regressions past %d%%:\n%s"
+                    % (options["threshold"] * 100, "\n".join(regressions))
+                )
+            self.stdout.write("No regressions against the baseline")
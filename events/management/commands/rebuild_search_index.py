@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from events.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the search index of all published events"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        indexed = rebuild_search_index(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} events"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from events.feed import rebuild_feed_events, sweep_feed_events
+
+
+class Command(BaseCommand):
+    help = "Ages past events out of the feed read-model (or rebuilds it)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            rows = rebuild_feed_events(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} feed events"))
+        else:
+            removed = sweep_feed_events()
+            self.stdout.write(self.style.SUCCESS(f"Removed {removed} past events"))
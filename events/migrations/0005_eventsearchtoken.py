@@ -0,0 +1,99 @@
+# Generated by Django 5.1.7 on 2026-10-17 23:40
+
+import re
+import unicodedata
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_event_search_tokens(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    EventSearchToken = apps.get_model("events", "EventSearchToken")
+
+    def fold(text):
+        return "".join(
+            char
+            for char in unicodedata.normalize("NFKD", text.casefold())
+            if not unicodedata.combining(char)
+        )
+
+    search_tokens = []
+    events = Event.objects.filter(status="published").only(
+        "id", "name", "location", "description"
+    )
+    for event in events.iterator(chunk_size=1000):
+        weights = Counter()
+        for field, weight in [("name", 5), ("location", 3), ("description", 1)]:
+            for token in re.findall(r"\w+", fold(getattr(event, field) or "")):
+                if len(token) >= 2:
+                    weights[token[:50]] += weight
+        search_tokens += [
+            EventSearchToken(event_id=event.id, token=token, weight=weight)
+            for token, weight in weights.items()
+        ]
+
+        if len(search_tokens) >= 1000:
+            EventSearchToken.objects.bulk_create(search_tokens)
+            search_tokens = []
+
+    EventSearchToken.objects.bulk_create(search_tokens)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0004_eventimage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventSearchToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "token",
+                    models.CharField(
+                        db_index=True,
+                        help_text="Token",
+                        max_length=50,
+                        verbose_name="token",
+                    ),
+                ),
+                (
+                    "weight",
+                    models.PositiveIntegerField(
+                        default=1, help_text="Weight", verbose_name="weight"
+                    ),
+                ),
+                (
+                    "event",
+                    models.ForeignKey(
+                        help_text="Event",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_tokens",
+                        to="events.event",
+                        verbose_name="event",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Event Search Token",
+                "verbose_name_plural": "Event Search Tokens",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("event", "token"), name="unique_event_search_token"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_event_search_tokens, migrations.RunPython.noop),
+    ]
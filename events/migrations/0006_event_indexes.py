@@ -0,0 +1,49 @@
+# Generated by Django 5.1.7 on 2026-10-17 23:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0005_eventsearchtoken"),
+        ("users", "0002_organisationcommittee_is_founder_userpreference"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["status", "start_datetime"], name="event_status_start_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["status", "category", "start_datetime"],
+                name="event_status_category_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["status", "type", "start_datetime"],
+                name="event_status_type_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["organisation", "start_datetime"],
+                name="event_organisation_start_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["created_by", "start_datetime"],
+                name="event_created_by_start_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.1.7 on 2026-10-17 23:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_event_tags(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    EventTag = apps.get_model("events", "EventTag")
+
+    event_tags = []
+    for event_id, tags in Event.objects.values_list("id", "tags").iterator():
+        if not isinstance(tags, list):
+            continue
+        normalized = (str(tag).strip()[:100] for tag in tags)
+        event_tags += [
+            EventTag(event_id=event_id, tag=tag)
+            for tag in dict.fromkeys(tag for tag in normalized if tag)
+        ]
+
+    EventTag.objects.bulk_create(event_tags, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0006_event_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventTag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "tag",
+                    models.CharField(
+                        help_text="Tag", max_length=100, verbose_name="tag"
+                    ),
+                ),
+                (
+                    "event",
+                    models.ForeignKey(
+                        help_text="Event",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="event_tags",
+                        to="events.event",
+                        verbose_name="event",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Event Tag",
+                "verbose_name_plural": "Event Tags",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("tag", "event"), name="unique_event_tag"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_event_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.7 on 2026-10-17 23:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+from utils.geohash import encode
+
+
+def backfill_geohashes(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+
+    events = Event.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    for event in events.only("id", "latitude", "longitude").iterator():
+        event.geohash = encode(float(event.latitude), float(event.longitude))
+        event.save(update_fields=["geohash"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0007_eventtag"),
+        ("users", "0003_organisationtag"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="geohash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Geohash of the latitude/longitude",
+                max_length=12,
+                verbose_name="geohash",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["status", "geohash"], name="event_status_geohash_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_geohashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,174 @@
+# Generated by Django 5.1.7 on 2026-10-17 23:50
+
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def backfill_feed_events(apps, schema_editor):
+    # The details are built as EventSerializer.details_serializer built them when
+    # this migration was written; the historical models cannot use app code
+    Event = apps.get_model("events", "Event")
+    FeedEvent = apps.get_model("events", "FeedEvent")
+
+    events = Event.objects.filter(
+        status="published", start_datetime__gte=timezone.now()
+    ).select_related("organisation", "created_by")
+
+    feed_events = []
+    for event in events.iterator(chunk_size=1000):
+        details = {
+            "id": event.id,
+            "organisation": {
+                "id": event.organisation.id,
+                "name": event.organisation.name,
+                "description": event.organisation.description,
+                "location": event.organisation.location,
+            },
+            "name": event.name,
+            "description": event.description,
+            "start_datetime": event.start_datetime,
+            "end_datetime": event.end_datetime,
+            "category": event.category,
+            "tags": event.tags,
+            "type": event.type,
+            "location": event.location,
+            "latitude": event.latitude,
+            "longitude": event.longitude,
+            "status": event.status,
+            "created_by": {
+                "id": event.created_by.id,
+                "email": event.created_by.email,
+                "name": event.created_by.name,
+            },
+            "created_at": event.created_at,
+            "updated_at": event.updated_at,
+        }
+        feed_events.append(
+            FeedEvent(
+                event=event,
+                name=event.name,
+                scan_id=event.scan_id,
+                start_datetime=event.start_datetime,
+                category=event.category,
+                type=event.type,
+                latitude=event.latitude,
+                longitude=event.longitude,
+                geohash=event.geohash,
+                details=json.loads(json.dumps(details, cls=JSONEncoder)),
+            )
+        )
+
+    FeedEvent.objects.bulk_create(feed_events, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0008_event_geohash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeedEvent",
+            fields=[
+                (
+                    "event",
+                    models.OneToOneField(
+                        help_text="Event",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="feed_entry",
+                        serialize=False,
+                        to="events.event",
+                        verbose_name="event",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="Name", max_length=255, verbose_name="name"
+                    ),
+                ),
+                (
+                    "scan_id",
+                    models.CharField(
+                        help_text="Scan ID", max_length=10, verbose_name="scan id"
+                    ),
+                ),
+                (
+                    "start_datetime",
+                    models.DateTimeField(
+                        help_text="Start Datetime", verbose_name="start datetime"
+                    ),
+                ),
+                (
+                    "category",
+                    models.CharField(
+                        help_text="Category", max_length=50, verbose_name="category"
+                    ),
+                ),
+                (
+                    "type",
+                    models.CharField(
+                        help_text="Type", max_length=255, verbose_name="type"
+                    ),
+                ),
+                (
+                    "latitude",
+                    models.DecimalField(
+                        blank=True, decimal_places=5, max_digits=9, null=True
+                    ),
+                ),
+                (
+                    "longitude",
+                    models.DecimalField(
+                        blank=True, decimal_places=5, max_digits=9, null=True
+                    ),
+                ),
+                (
+                    "geohash",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="Geohash",
+                        max_length=12,
+                        verbose_name="geohash",
+                    ),
+                ),
+                (
+                    "details",
+                    models.JSONField(
+                        help_text="Serialized event details (EventSerializer)",
+                        verbose_name="details",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Updated At", verbose_name="updated at"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Feed Event",
+                "verbose_name_plural": "Feed Events",
+                "indexes": [
+                    models.Index(fields=["start_datetime"], name="feedevent_start_idx"),
+                    models.Index(
+                        fields=["category", "start_datetime"],
+                        name="feedevent_category_idx",
+                    ),
+                    models.Index(
+                        fields=["type", "start_datetime"], name="feedevent_type_idx"
+                    ),
+                    models.Index(fields=["name"], name="feedevent_name_idx"),
+                    models.Index(fields=["scan_id"], name="feedevent_scan_id_idx"),
+                    models.Index(fields=["geohash"], name="feedevent_geohash_idx"),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_feed_events, migrations.RunPython.noop),
+    ]
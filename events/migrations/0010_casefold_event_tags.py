@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:20
+
+from django.db import migrations
+
+
+def casefold_event_tags(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    EventTag = apps.get_model("events", "EventTag")
+
+    EventTag.objects.all().delete()
+
+    event_tags = []
+    for event_id, tags in Event.objects.values_list("id", "tags").iterator():
+        if not isinstance(tags, list):
+            continue
+        normalized = (str(tag).strip().casefold()[:100] for tag in tags)
+        event_tags += [
+            EventTag(event_id=event_id, tag=tag)
+            for tag in dict.fromkeys(tag for tag in normalized if tag)
+        ]
+
+        if len(event_tags) >= 1000:
+            EventTag.objects.bulk_create(event_tags)
+            event_tags = []
+
+    EventTag.objects.bulk_create(event_tags)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("events", "0009_feedevent"),
+    ]
+
+    operations = [
+        migrations.RunPython(casefold_event_tags, migrations.RunPython.noop),
+    ]
@@ -51,6 +51,13 @@ class Event(models.Model):
     longitude = models.DecimalField(
         max_digits=9, decimal_places=5, blank=True, null=True
     )
+    geohash = models.CharField(
+        _("geohash"),
+        help_text="Geohash of the latitude/longitude",
+        max_length=12,
+        blank=True,
+        default="",
+    )
     status = models.CharField(
         _("status"),
         help_text="Status",
@@ -83,6 +90,31 @@ class Event(models.Model):
     class Meta:
         verbose_name = _("Event")
         verbose_name_plural = _("Events")
+        indexes = [
+            # Public and personalised feeds (optionally filtered by category/type)
+            models.Index(
+                fields=["status", "start_datetime"], name="event_status_start_idx"
+            ),
+            models.Index(
+                fields=["status", "category", "start_datetime"],
+                name="event_status_category_idx",
+            ),
+            models.Index(
+                fields=["status", "type", "start_datetime"],
+                name="event_status_type_idx",
+            ),
+            # Geo-proximity ("near me") feed filter
+            models.Index(fields=["status", "geohash"], name="event_status_geohash_idx"),
+            # Events listed by organisation and by creator
+            models.Index(
+                fields=["organisation", "start_datetime"],
+                name="event_organisation_start_idx",
+            ),
+            models.Index(
+                fields=["created_by", "start_datetime"],
+                name="event_created_by_start_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -286,3 +318,120 @@ class EventImage(models.Model):
 
     def __str__(self):
         return f"{self.event.name} - {self.user.name}"
+
+
+class EventSearchToken(models.Model):
+    """This model stores the inverted search index of published events
+
+    Returns:
+        class: details of event search tokens
+    """
+
+    event = models.ForeignKey(
+        "events.Event",
+        on_delete=models.CASCADE,
+        verbose_name="event",
+        help_text="Event",
+        related_name="search_tokens",
+    )
+    token = models.CharField(
+        _("token"), help_text="Token", max_length=50, db_index=True
+    )
+    weight = models.PositiveIntegerField(_("weight"), help_text="Weight", default=1)
+
+    class Meta:
+        verbose_name = _("Event Search Token")
+        verbose_name_plural = _("Event Search Tokens")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "token"], name="unique_event_search_token"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.event.name} - {self.token}"
+
+
+class EventTag(models.Model):
+    """This model stores the tags of events (normalized from Event.tags)
+
+    Returns:
+        class: details of event tags
+    """
+
+    event = models.ForeignKey(
+        "events.Event",
+        on_delete=models.CASCADE,
+        verbose_name="event",
+        help_text="Event",
+        related_name="event_tags",
+    )
+    tag = models.CharField(_("tag"), help_text="Tag", max_length=100)
+
+    class Meta:
+        verbose_name = _("Event Tag")
+        verbose_name_plural = _("Event Tags")
+        constraints = [
+            # Leading on tag so that it also serves tag lookups
+            models.UniqueConstraint(fields=["tag", "event"], name="unique_event_tag")
+        ]
+
+    def __str__(self):
+        return f"{self.event.name} - {self.tag}"
+
+
+class FeedEvent(models.Model):
+    """This model stores the denormalized feed read-model: one row per published
+    upcoming event, with its pre-serialized details
+
+    Returns:
+        class: details of feed events
+    """
+
+    event = models.OneToOneField(
+        "events.Event",
+        on_delete=models.CASCADE,
+        verbose_name="event",
+        help_text="Event",
+        related_name="feed_entry",
+        primary_key=True,
+    )
+    name = models.CharField(_("name"), help_text="Name", max_length=255)
+    scan_id = models.CharField(_("scan id"), help_text="Scan ID", max_length=10)
+    start_datetime = models.DateTimeField(
+        _("start datetime"), help_text="Start Datetime"
+    )
+    category = models.CharField(_("category"), help_text="Category", max_length=50)
+    type = models.CharField(_("type"), help_text="Type", max_length=255)
+    latitude = models.DecimalField(
+        max_digits=9, decimal_places=5, blank=True, null=True
+    )
+    longitude = models.DecimalField(
+        max_digits=9, decimal_places=5, blank=True, null=True
+    )
+    geohash = models.CharField(
+        _("geohash"), help_text="Geohash", max_length=12, blank=True, default=""
+    )
+    details = models.JSONField(
+        _("details"), help_text="Serialized event details (EventSerializer)"
+    )
+    updated_at = models.DateTimeField(
+        _("updated at"), help_text="Updated At", auto_now=True
+    )
+
+    class Meta:
+        verbose_name = _("Feed Event")
+        verbose_name_plural = _("Feed Events")
+        indexes = [
+            models.Index(fields=["start_datetime"], name="feedevent_start_idx"),
+            models.Index(
+                fields=["category", "start_datetime"], name="feedevent_category_idx"
+            ),
+            models.Index(fields=["type", "start_datetime"], name="feedevent_type_idx"),
+            models.Index(fields=["name"], name="feedevent_name_idx"),
+            models.Index(fields=["scan_id"], name="feedevent_scan_id_idx"),
+            models.Index(fields=["geohash"], name="feedevent_geohash_idx"),
+        ]
+
+    def __str__(self):
+        return self.name
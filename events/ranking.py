@@ -0,0 +1,258 @@
+import hashlib
+import math
+from collections import Counter
+
+from django.core.cache import cache, caches
+from django.utils import timezone
+
+from users.models import UserPreference
+from utils.tags import filter_by_tags, normalize_tags
+
+from . import models
+from .cache import FEED_CACHE_PREFIX, get_feed_version
+
+# Number of upcoming events re-ranked per personalised feed request
+CANDIDATE_LIMIT = 500
+CANDIDATE_TTL = 5 * 60  # seconds
+CANDIDATE_FIELDS = [
+    "id",
+    "category",
+    "type",
+    "tags",
+    "latitude",
+    "longitude",
+    "start_datetime",
+]
+AFFINITY_TTL = 60 * 60  # seconds
+# Number of past attendances / interactions an affinity vector is built from
+AFFINITY_HISTORY_LIMIT = 200
+
+# Weights of the ranking signals (every signal is scaled to 0..1)
+PREFERRED_CATEGORY_WEIGHT = 3.0
+CATEGORY_AFFINITY_WEIGHT = 2.0
+TAG_AFFINITY_WEIGHT = 1.5
+DISTANCE_WEIGHT = 2.0
+SOONNESS_WEIGHT = 1.0
+
+# Distance (km) at which the distance signal halves
+DISTANCE_HALF_KM = 10.0
+# Days ahead at which the soonness signal halves
+SOONNESS_HALF_DAYS = 7.0
+
+# Signal weights of the history rows an affinity vector is built from
+ATTENDANCE_WEIGHT = 2.0
+INTERACTION_WEIGHT = 1.0
+
+
+def get_candidates_cache_key(signature: str) -> str:
+    digest = hashlib.sha1(signature.encode("utf-8")).hexdigest()
+    return f"{FEED_CACHE_PREFIX}:{get_feed_version()}:candidates:{digest}"
+
+
+def get_affinity_cache_key(user_id: int) -> str:
+    return f"{FEED_CACHE_PREFIX}:affinity:{user_id}"
+
+
+def get_feed_candidates(
+    category=None, event_type=None, tags=None, match_all=True
+) -> list:
+    """Returns the precomputed candidate set of the personalised feed: the
+    soonest upcoming published events matching the filters, with the attributes
+    the ranking needs. The filters run in SQL before the candidate limit, so
+    filtered feeds are not limited to the events of the unfiltered set. It is
+    cached per feed version and filter set, so event changes rebuild it.
+
+    Args:
+        category (str): Optional category filter
+        event_type (str): Optional type filter
+        tags (list): Optional tags filter
+        match_all (bool): Whether all tags (AND) or any tag (OR) must match
+
+    Returns:
+        list: candidate tuples (id, category, type, tags, latitude, longitude,
+        start_datetime)
+    """
+
+    tags = sorted(normalize_tags(tags))
+    match_all = match_all or len(tags) < 2
+    key = get_candidates_cache_key(
+        f"{category or ''}|{event_type or ''}|{','.join(tags)}|{int(match_all)}"
+    )
+    candidates = cache.get(key)
+
+    if candidates is None:
+        events = models.Event.objects.filter(
+            status="published", start_datetime__gte=timezone.now()
+        )
+        if category:
+            events = events.filter(category=category)
+        if event_type:
+            events = events.filter(type=event_type)
+        events = filter_by_tags(
+            events, models.EventTag, "event", tags, match_all=match_all
+        )
+
+        rows = events.order_by("start_datetime", "id").values_list(*CANDIDATE_FIELDS)[
+            :CANDIDATE_LIMIT
+        ]
+        candidates = [
+            (
+                event_id,
+                category,
+                event_type,
+                normalize_tags(tags),
+                float(latitude) if latitude is not None else None,
+                float(longitude) if longitude is not None else None,
+                start,
+            )
+            for event_id, category, event_type, tags, latitude, longitude, start in rows
+        ]
+        cache.set(key, candidates, timeout=CANDIDATE_TTL)
+
+    return candidates
+
+
+def normalize(counter: Counter) -> dict:
+    """Scales the values of a counter to 0..1"""
+
+    top = max(counter.values(), default=0)
+    return {key: value / top for key, value in counter.items()} if top else {}
+
+
+def build_user_affinity(user) -> dict:
+    """Builds the affinity vector of a user from their preferences, location and
+    the categories/tags of the events they attended or interacted with
+
+    Args:
+        user (CustomUser): Authenticated user
+
+    Returns:
+        dict: affinity vector
+    """
+
+    categories, tags = Counter(), Counter()
+    history = [
+        (
+            ATTENDANCE_WEIGHT,
+            models.EventAttendees.objects.filter(attendee=user).order_by("-id"),
+        ),
+        (
+            INTERACTION_WEIGHT,
+            models.EventInteractions.objects.filter(user=user).order_by("-id"),
+        ),
+    ]
+
+    for weight, rows in history:
+        rows = rows.values_list("event__category", "event__tags")
+        for category, event_tags in rows[:AFFINITY_HISTORY_LIMIT]:
+            categories[category] += weight
+            for tag in normalize_tags(event_tags):
+                tags[tag] += weight
+
+    return {
+        "preferred_category": UserPreference.objects.filter(user=user)
+        .values_list("preferred_categories", flat=True)
+        .first(),
+        "latitude": float(user.latitude) if user.latitude is not None else None,
+        "longitude": float(user.longitude) if user.longitude is not None else None,
+        "categories": normalize(categories),
+        "tags": normalize(tags),
+    }
+
+
+def get_user_affinity(user) -> dict:
+    """Returns the (cached) affinity vector of a user"""
+
+    key = get_affinity_cache_key(user.id)
+    affinity = caches["affinity"].get(key)
+
+    if affinity is None:
+        affinity = build_user_affinity(user)
+        caches["affinity"].set(key, affinity, timeout=AFFINITY_TTL)
+
+    return affinity
+
+
+def invalidate_user_affinity(user_id: int):
+    """Drops the cached affinity vector of a user after new activity"""
+
+    caches["affinity"].delete(get_affinity_cache_key(user_id))
+
+
+def get_distance_km(latitude_1, longitude_1, latitude_2, longitude_2) -> float:
+    """Computes the great-circle (haversine) distance between two points in km"""
+
+    latitude_1, longitude_1, latitude_2, longitude_2 = map(
+        math.radians, (latitude_1, longitude_1, latitude_2, longitude_2)
+    )
+    a = (
+        math.sin((latitude_2 - latitude_1) / 2) ** 2
+        + math.cos(latitude_1)
+        * math.cos(latitude_2)
+        * math.sin((longitude_2 - longitude_1) / 2) ** 2
+    )
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+def score_candidate(candidate: tuple, affinity: dict, now) -> float:
+    """Scores a feed candidate for a user
+
+    Args:
+        candidate (tuple): Candidate tuple (see get_feed_candidates)
+        affinity (dict): Affinity vector of the user
+        now (datetime): Time of the request
+
+    Returns:
+        float: score of the candidate (higher is better)
+    """
+
+    _, category, _, tags, latitude, longitude, start_datetime = candidate
+
+    score = 0.0
+    if category == affinity["preferred_category"]:
+        score += PREFERRED_CATEGORY_WEIGHT
+    score += CATEGORY_AFFINITY_WEIGHT * affinity["categories"].get(category, 0.0)
+    if tags:
+        score += TAG_AFFINITY_WEIGHT * max(
+            affinity["tags"].get(tag, 0.0) for tag in tags
+        )
+
+    if None not in (affinity["latitude"], latitude, longitude):
+        distance = get_distance_km(
+            affinity["latitude"], affinity["longitude"], latitude, longitude
+        )
+        score += DISTANCE_WEIGHT * DISTANCE_HALF_KM / (DISTANCE_HALF_KM + distance)
+
+    days_ahead = max((start_datetime - now).total_seconds(), 0) / 86400
+    score += SOONNESS_WEIGHT * SOONNESS_HALF_DAYS / (SOONNESS_HALF_DAYS + days_ahead)
+
+    return score
+
+
+def rank_events_for_user(
+    user, category=None, event_type=None, tags=None, match_all=True
+) -> list:
+    """Ranks the precomputed feed candidates matching the filters for a user
+
+    Args:
+        user (CustomUser): Authenticated user
+        category (str): Optional category filter
+        event_type (str): Optional type filter
+        tags (list): Optional tags filter
+        match_all (bool): Whether all tags (AND) or any tag (OR) must match
+
+    Returns:
+        list: event ids, best match first
+    """
+
+    affinity = get_user_affinity(user)
+    now = timezone.now()
+
+    ranked = [
+        (score_candidate(candidate, affinity, now), candidate[6], candidate[0])
+        for candidate in get_feed_candidates(category, event_type, tags, match_all)
+        if candidate[6] >= now
+    ]
+    ranked.sort(key=lambda item: (-item[0], item[1], item[2]))
+
+    return [event_id for _, _, event_id in ranked]
@@ -0,0 +1,174 @@
+import re
+import unicodedata
+from collections import Counter
+
+from django.db.models import IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from . import models
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+TOKEN_MIN_LENGTH = 2
+TOKEN_MAX_LENGTH = 50
+# Maximum number of terms of a search query that are matched against the index
+QUERY_MAX_TOKENS = 8
+
+# Relevance weight of a token for each indexed field
+FIELD_WEIGHTS = {
+    "name": 5,
+    "location": 3,
+    "description": 1,
+}
+
+
+def fold(text: str) -> str:
+    """Case folds a text and strips its accents, so that tokens compare the same
+    way under every database collation (``Café`` and ``cafe`` are one token)
+
+    Args:
+        text (str): Text to fold
+
+    Returns:
+        str: folded text
+    """
+
+    return "".join(
+        char
+        for char in unicodedata.normalize("NFKD", text.casefold())
+        if not unicodedata.combining(char)
+    )
+
+
+def tokenize(text: str | None) -> list:
+    """Splits a text into folded search tokens
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        list: tokens of the text (in order, with repetitions)
+    """
+
+    if not text:
+        return []
+
+    return [
+        token[:TOKEN_MAX_LENGTH]
+        for token in TOKEN_PATTERN.findall(fold(text))
+        if len(token) >= TOKEN_MIN_LENGTH
+    ]
+
+
+def get_event_token_weights(event: models.Event) -> Counter:
+    """Computes the weighted tokens of an event
+
+    Args:
+        event (Event): Event to tokenize
+
+    Returns:
+        Counter: weight of every token of the event
+    """
+
+    weights = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(getattr(event, field)):
+            weights[token] += weight
+
+    return weights
+
+
+def index_event(event: models.Event):
+    """Updates the search index of an event. Only published events are kept in
+    the index; any other status drops the event's tokens.
+
+    Args:
+        event (Event): Created, edited or published event
+    """
+
+    models.EventSearchToken.objects.filter(event=event).delete()
+
+    if event.status != "published":
+        return
+
+    models.EventSearchToken.objects.bulk_create(
+        [
+            models.EventSearchToken(event=event, token=token, weight=weight)
+            for token, weight in get_event_token_weights(event).items()
+        ]
+    )
+
+
+def rebuild_search_index(batch_size: int = 1000) -> int:
+    """Rebuilds the search index of all published events
+
+    Args:
+        batch_size (int): Number of events tokenized per batch
+
+    Returns:
+        int: number of indexed events
+    """
+
+    models.EventSearchToken.objects.all().delete()
+
+    indexed = 0
+    search_tokens = []
+    events = models.Event.objects.filter(status="published").only(
+        "id", *FIELD_WEIGHTS.keys()
+    )
+    for event in events.iterator(chunk_size=batch_size):
+        search_tokens += [
+            models.EventSearchToken(event_id=event.id, token=token, weight=weight)
+            for token, weight in get_event_token_weights(event).items()
+        ]
+        indexed += 1
+
+        if len(search_tokens) >= batch_size:
+            models.EventSearchToken.objects.bulk_create(search_tokens)
+            search_tokens = []
+
+    models.EventSearchToken.objects.bulk_create(search_tokens)
+
+    return indexed
+
+
+def search_events(events, search_query: str):
+    """Filters events by a search query using the search index and annotates
+    them with their ``relevance``. Every term of the query must prefix-match a
+    token of the event; relevance is the summed weight of the matched tokens. A
+    query without any term of ``TOKEN_MIN_LENGTH`` characters matches nothing.
+
+    Args:
+        events (QuerySet): Events to search in
+        search_query (str): Search query entered by the user
+
+    Returns:
+        QuerySet: matching events annotated with ``relevance``
+    """
+
+    query_tokens = list(dict.fromkeys(tokenize(search_query)))[:QUERY_MAX_TOKENS]
+
+    if not query_tokens:
+        return events.none().annotate(relevance=Value(0))
+
+    matches = Q()
+    for token in query_tokens:
+        # Tokens are stored folded, so a case insensitive LIKE 'term%' matches
+        # the same rows under every collation and still uses the token index
+        token_match = Q(token__istartswith=token)
+        events = events.filter(
+            pk__in=models.EventSearchToken.objects.filter(token_match).values(
+                "event_id"
+            )
+        )
+        matches |= token_match
+
+    relevance = (
+        models.EventSearchToken.objects.filter(matches, event=OuterRef("pk"))
+        .values("event")
+        .annotate(relevance=Sum("weight"))
+        .values("relevance")
+    )
+
+    return events.annotate(
+        relevance=Coalesce(Subquery(relevance, output_field=IntegerField()), Value(0))
+    )
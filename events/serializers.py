@@ -1,5 +1,8 @@
+from django.db.models import QuerySet, prefetch_related_objects
 from rest_framework import serializers
 from users.serializers import UserSerializer, OrganisationSerializer
+from utils.fields import get_only_fields, serialize_fields
+from utils.rows import RowReader
 
 
 from . import models
@@ -8,6 +11,40 @@ from . import models
 class EventSerializer:
     """This serializer class contains serialization methods for Event Model"""
 
+    # Keys of details_serializer, usable in sparse fieldsets (?fields=)
+    FIELDS = [
+        "id",
+        "organisation",
+        "name",
+        "description",
+        "start_datetime",
+        "end_datetime",
+        "category",
+        "tags",
+        "type",
+        "location",
+        "latitude",
+        "longitude",
+        "status",
+        "created_by",
+        "created_at",
+        "updated_at",
+    ]
+    # Keys of the nested condensed organisation / creator details
+    NESTED_FIELDS = {
+        "organisation": ["id", "name", "description", "location"],
+        "created_by": ["id", "email", "name"],
+    }
+    # Rows serializable by details_serializer (see utils.rows)
+    ROWS = RowReader(
+        "EventRow",
+        [field for field in FIELDS if field not in ("organisation", "created_by")],
+        {
+            "organisation": OrganisationSerializer.CONDENSED_ROWS,
+            "created_by": UserSerializer.CONDENSED_ROWS,
+        },
+    )
+
     def __init__(self, obj: models.Event):
         self.obj = obj
 
@@ -44,6 +81,69 @@ class EventSerializer:
             "updated_at": self.obj.updated_at,
         }
 
+    @classmethod
+    def bulk_details_serializer(cls, events, fields: list = None):
+        """This serializer method serializes many events at once, resolving the
+        organisations and creators of all of them in one pass instead of two
+        lazy queries per event
+
+        Args:
+            events (QuerySet | list): Queryset or page of events (a page of a
+                sparse fieldset must be loaded through narrow_queryset)
+            fields (list): Sparse fieldset (see utils.fields), None for all
+
+        Returns:
+            list: List of dictionaries of all details (same as details_serializer),
+            or of the requested details
+        """
+
+        if isinstance(events, QuerySet):
+            events = list(cls.narrow_queryset(events, fields))
+        elif fields:
+            events = list(events)
+        else:
+            events = list(events)
+            prefetch_related_objects(events, "organisation", "created_by")
+
+        if fields:
+            return [cls(event).sparse_details_serializer(fields) for event in events]
+        return [cls(event).details_serializer() for event in events]
+
+    @classmethod
+    def narrow_queryset(cls, events: QuerySet, fields: list = None) -> QuerySet:
+        """Narrows the SQL of an events queryset to a sparse fieldset (only the
+        requested columns, joining the requested relations); without fields it
+        joins the organisation and creator
+
+        Args:
+            events (QuerySet): Events queryset
+            fields (list): Sparse fieldset (see utils.fields), None for all
+
+        Returns:
+            QuerySet: narrowed queryset
+        """
+
+        if not fields:
+            return events.select_related("organisation", "created_by")
+
+        only = get_only_fields(fields, cls.NESTED_FIELDS)
+        return events.select_related(
+            *[field for field in cls.NESTED_FIELDS if field in only]
+        ).only(*only)
+
+    def sparse_details_serializer(self, fields: list):
+        """This serializer method serializes the requested fields only, without
+        loading the deferred ones
+
+        Args:
+            fields (list): Requested fields (see utils.fields)
+
+        Returns:
+            dict: Dictionary of the requested details
+        """
+
+        return serialize_fields(self.obj, fields, self.NESTED_FIELDS)
+
     def get_scan_id(self):
         return self.obj.scan_id
 
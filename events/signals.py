@@ -0,0 +1,111 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from users.models import CustomUser, Organisation, UserPreference
+from utils.geohash import encode
+
+from .cache import bump_feed_version
+from .feed import is_feed_event, refresh_feed_events_of
+from .models import Event, EventAttendees, EventInteractions
+from .ranking import invalidate_user_affinity
+from .search import index_event
+from .utils import sync_event_tags
+
+
+def bump_feed_version_on_commit(event_ids: list):
+    """Bumps the feed version with the changed feed rows once the transaction
+    commits; no-op when no feed row changed"""
+
+    if event_ids:
+        transaction.on_commit(lambda: bump_feed_version(event_ids))
+
+
+@receiver(pre_save, sender=Event)
+def set_event_geohash(sender, instance, **kwargs):
+    """Keeps the geohash (spatial index key) in sync with the coordinates"""
+
+    try:
+        instance.geohash = encode(float(instance.latitude), float(instance.longitude))
+    except (TypeError, ValueError):
+        instance.geohash = ""
+
+
+@receiver(post_save, sender=Event)
+def refresh_event_tags(sender, instance, **kwargs):
+    """Keeps the tag index (EventTag rows) of a created or edited event current,
+    whichever code path saved it"""
+
+    sync_event_tags(instance)
+
+
+@receiver(post_save, sender=Event)
+def refresh_feed_event(sender, instance, **kwargs):
+    """Keeps the feed read-model row of a created, edited or published event
+    current, and bumps the feed version once the change is committed (so that
+    no request can re-cache the old rows under the new version). Saving an
+    event that is not, and was not, in the feed (e.g. a draft) bumps nothing.
+    """
+
+    bump_feed_version_on_commit(refresh_feed_events_of(pk=instance.pk))
+
+
+@receiver(post_save, sender=Event)
+def refresh_event_search_tokens(sender, instance, **kwargs):
+    """Keeps the search index of a created, edited or published event current
+    (deleted events lose their tokens through the cascade)"""
+
+    index_event(instance)
+
+
+@receiver(post_save, sender=Organisation)
+def refresh_organisation_feed_events(sender, instance, **kwargs):
+    """Refreshes the organisation summaries held by the feed read-model"""
+
+    bump_feed_version_on_commit(
+        refresh_feed_events_of(organisation=instance, feed_entry__isnull=False)
+    )
+
+
+@receiver(post_save, sender=CustomUser)
+def refresh_creator_feed_events(sender, instance, **kwargs):
+    """Refreshes the creator summaries held by the feed read-model"""
+
+    bump_feed_version_on_commit(
+        refresh_feed_events_of(created_by=instance, feed_entry__isnull=False)
+    )
+
+
+@receiver(post_delete, sender=Event)
+def invalidate_deleted_feed_event(sender, instance, **kwargs):
+    """Bumps the feed version when a deleted event leaves the feed (its feed
+    row is deleted through the cascade)"""
+
+    if is_feed_event(instance):
+        bump_feed_version_on_commit([instance.pk])
+
+
+@receiver(post_save, sender=EventAttendees)
+@receiver(post_delete, sender=EventAttendees)
+def invalidate_attendee_affinity(sender, instance, **kwargs):
+    """Rebuilds the personalised feed affinity of a user after an RSVP"""
+
+    invalidate_user_affinity(instance.attendee_id)
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_user_location_affinity(sender, instance, created, **kwargs):
+    """Rebuilds the personalised feed affinity of an edited user, which holds
+    their location"""
+
+    if not created:
+        invalidate_user_affinity(instance.pk)
+
+
+@receiver(post_save, sender=EventInteractions)
+@receiver(post_save, sender=UserPreference)
+def invalidate_user_activity_affinity(sender, instance, **kwargs):
+    """Rebuilds the personalised feed affinity of a user after an interaction
+    or a preference update"""
+
+    invalidate_user_affinity(instance.user_id)
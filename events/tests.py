@@ -1,3 +1,1096 @@
-from django.test import TestCase
+import base64
+import json
+import re
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APIClient
+from rest_framework.utils.encoders import JSONEncoder
+
+from events.cache import bump_feed_version, get_feed_cache_stats
+from events.checks import check_shared_caches
+from events.facets import FacetIndex, get_facet_index
+from events.fragments import get_feed_fragments
+from events.models import Event, EventInteractions, EventTag, FeedEvent
+from events.ranking import get_user_affinity
+from events.serializers import EventSerializer
+from events.utils import (
+    filter_events_feed,
+    filter_events_near,
+    get_feed_ordering,
+)
+from planoraAPI.settings.custom_DRF_settings.parsers import (
+    RequestEntityTooLarge,
+    UJSONParser,
+)
+from planoraAPI.settings.custom_DRF_settings.renderers import (
+    ColumnarJSONRenderer,
+    UJSONRenderer,
+)
+from users.models import CustomUser, Organisation, UserPreference
+from utils.geohash import get_bounding_box
+from utils.pagination import KeysetPagination
+from utils.streaming import StreamingJSONListResponse
+
+
+class FeedTestCase(TestCase):
+    """Isolates the feed state shared by the tests of a process: every cache
+    alias is cleared and the facet index is replaced by an empty one"""
+
+    client_class = APIClient
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        patcher = mock.patch("events.facets.facet_index", FacetIndex())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+def create_events(count, status="published"):
+    """Creates ``count`` upcoming events, each with its own organisation and creator"""
+
+    events = []
+    offset = Event.objects.count()
+    for i in range(offset, offset + count):
+        user = CustomUser.objects.create(email=f"user{i}@planora.test", name=f"U{i}")
+        organisation = Organisation.objects.create(
+            name=f"Org {i}", email=f"org{i}@planora.test"
+        )
+        events.append(
+            Event.objects.create(
+                organisation=organisation,
+                created_by=user,
+                name=f"Event {i}",
+                scan_id=str(10000000 + i),
+                description="Description",
+                start_datetime=timezone.now() + timedelta(days=i + 1),
+                end_datetime=timezone.now() + timedelta(days=i + 2),
+                category="music",
+                tags=["live"],
+                type="offline",
+                location="Bhopal",
+                status=status,
+            )
+        )
+    return events
+
+
+class EventBulkSerializationTestCase(FeedTestCase):
+    def test_bulk_output_matches_details_serializer(self):
+        create_events(3)
+
+        expected = [
+            EventSerializer(event).details_serializer()
+            for event in Event.objects.order_by("id")
+        ]
+
+        self.assertEqual(
+            EventSerializer.bulk_details_serializer(Event.objects.order_by("id")),
+            expected,
+        )
+        self.assertEqual(
+            EventSerializer.bulk_details_serializer(list(Event.objects.order_by("id"))),
+            expected,
+        )
+
+    def test_bulk_serializer_query_count_is_constant(self):
+        create_events(10)
+
+        with self.assertNumQueries(1):
+            EventSerializer.bulk_details_serializer(Event.objects.all())
+
+        page = list(Event.objects.all())
+        with self.assertNumQueries(2):
+            EventSerializer.bulk_details_serializer(page)
+
+    def test_feed_query_count_does_not_depend_on_page_size(self):
+        client = APIClient()
+        create_events(2)
+        get_facet_index()  # Loaded outside of the measured requests
+
+        with CaptureQueriesContext(connection) as small_page:
+            response = client.get("/api/v1/events/public-feed/")
+        self.assertEqual(len(response.json()["events"]), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_events(23)
+        get_facet_index()
+
+        with CaptureQueriesContext(connection) as full_page:
+            response = client.get("/api/v1/events/public-feed/")
+        self.assertEqual(len(response.json()["events"]), 25)
+
+        self.assertEqual(len(small_page), len(full_page))
+
+
+class KeysetPaginationTestCase(FeedTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for event, name in zip(create_events(7), "bacbdab"):
+            FeedEvent.objects.filter(pk=event.pk).update(name=f"Event {name}")
+
+    def get_page(self, sort_field, descending, cursor=None):
+        paginator = KeysetPagination(sort_field, descending)
+        paginator.page_size = 2
+        request = RequestFactory().get("/", {"cursor": cursor} if cursor else {})
+        rows = paginator.paginate_queryset(FeedEvent.objects.all(), request)
+        return [row.pk for row in rows], paginator
+
+    def test_every_sort_order_walks_forwards_and_backwards(self):
+        for sort_field in ["start_datetime", "name", "scan_id"]:
+            for descending in [False, True]:
+                prefix = "-" if descending else ""
+                expected = list(
+                    FeedEvent.objects.order_by(
+                        f"{prefix}{sort_field}", f"{prefix}pk"
+                    ).values_list("pk", flat=True)
+                )
+
+                pages, paginator = [], None
+                while paginator is None or paginator.next_cursor:
+                    cursor = paginator and paginator.next_cursor
+                    page, paginator = self.get_page(sort_field, descending, cursor)
+                    pages.append(page)
+                self.assertEqual(sum(pages, []), expected, sort_field)
+
+                backwards = [pages[-1]]
+                while paginator.previous_cursor:
+                    page, paginator = self.get_page(
+                        sort_field, descending, paginator.previous_cursor
+                    )
+                    backwards.insert(0, page)
+                self.assertEqual(backwards, pages, sort_field)
+
+    def test_tampered_cursor_is_rejected(self):
+        _, paginator = self.get_page("start_datetime", False)
+        position = json.loads(base64.urlsafe_b64decode(paginator.next_cursor))
+        client = APIClient()
+
+        for tampered in [
+            {**position, "v": 1},
+            {**position, "v": "not a date"},
+            {**position, "id": "1"},
+            {**position, "r": "yes"},
+            [position["v"], position["id"]],
+        ]:
+            cursor = base64.urlsafe_b64encode(json.dumps(tampered).encode()).decode()
+            response = client.get("/api/v1/events/public-feed/", {"cursor": cursor})
+            self.assertEqual(response.status_code, 400, tampered)
+            self.assertEqual(response.json()["field"], "cursor")
+
+        for sort_by in ["name", "scan_id"]:
+            cursor = base64.urlsafe_b64encode(
+                json.dumps({**position, "v": 1}).encode()
+            ).decode()
+            response = client.get(
+                "/api/v1/events/public-feed/", {"cursor": cursor, "sort_by": sort_by}
+            )
+            self.assertEqual(response.status_code, 400, sort_by)
+
+        response = client.get("/api/v1/events/public-feed/", {"cursor": "%%%"})
+        self.assertEqual(response.status_code, 400)
+
+
+class EventTagTestCase(FeedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.live, self.free, self.both = create_events(3)
+        self.free.tags = ["free"]
+        self.both.tags = ["live", "free"]
+        for event in [self.free, self.both]:
+            event.save()
+
+    def get_feed(self, **params):
+        request = RequestFactory().get("/", params)
+        return list(
+            filter_events_feed(request)
+            .order_by("start_datetime")
+            .values_list("pk", flat=True)
+        )
+
+    def test_save_normalizes_and_replaces_tags(self):
+        self.live.tags = [" live ", "Live", "", "x" * 150, "FREE"]
+        self.live.save()
+
+        tags = EventTag.objects.filter(event=self.live).values_list("tag", flat=True)
+        self.assertEqual(sorted(tags), ["free", "live", "x" * 100])
+
+        self.live.tags = "live"  # Not a list
+        self.live.save()
+        self.assertFalse(EventTag.objects.filter(event=self.live).exists())
+
+    def test_tags_match_case_insensitively(self):
+        self.assertEqual(self.get_feed(tags=["LIVE", "Free"]), [self.both.pk])
+
+    def test_tags_match_all_or_any(self):
+        self.assertEqual(self.get_feed(tags=["live"]), [self.live.pk, self.both.pk])
+        self.assertEqual(self.get_feed(tags=["live", "free"]), [self.both.pk])
+        self.assertEqual(
+            self.get_feed(tags=["live", "free"], tags_match="any"),
+            [self.live.pk, self.free.pk, self.both.pk],
+        )
+        self.assertEqual(self.get_feed(tags=["live", "jazz"]), [])
+
+    def test_popular_tags_count_upcoming_published_events(self):
+        draft = create_events(1, status="draft")[0]
+        past = create_events(1)[0]
+        past.start_datetime = timezone.now() - timedelta(days=1)
+        past.save()
+
+        response = APIClient().get("/api/v1/events/tags/")
+
+        self.assertEqual(
+            response.json()["tags"],
+            [{"tag": "free", "count": 2}, {"tag": "live", "count": 2}],
+        )
+
+
+class EventNearMeTestCase(FeedTestCase):
+    # Bhopal, and points about 4 km, 20 km and 150 km north of it
+    LATITUDE, LONGITUDE = 23.2599, 77.4126
+    OFFSETS = [0.0, 0.036, 0.18, 1.35]
+
+    def setUp(self):
+        super().setUp()
+        self.events = create_events(len(self.OFFSETS))
+        for event, offset in zip(self.events, self.OFFSETS):
+            event.latitude = Decimal(f"{self.LATITUDE + offset:.5f}")
+            event.longitude = Decimal(f"{self.LONGITUDE:.5f}")
+            event.save()
+
+    def get_feed(self, **params):
+        response = APIClient().get(
+            "/api/v1/events/public-feed/",
+            {"lat": self.LATITUDE, "lng": self.LONGITUDE, **params},
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return [event["details"]["id"] for event in response.json()["events"]]
+
+    def test_radius_filter(self):
+        centre, near, town, far = [event.pk for event in self.events]
+
+        self.assertEqual(self.get_feed(), [centre, near])
+        self.assertEqual(self.get_feed(radius_km=25), [centre, near, town])
+        self.assertEqual(self.get_feed(radius_km=1), [centre])
+
+    def test_distance_sort(self):
+        centre, near, town, far = [event.pk for event in self.events]
+        # Soonest events are the nearest ones, so reverse their start order
+        for event, days in zip(self.events, [4, 3, 2, 1]):
+            event.start_datetime = timezone.now() + timedelta(days=days)
+            event.save()
+
+        self.assertEqual(self.get_feed(radius_km=25), [town, near, centre])
+        self.assertEqual(
+            self.get_feed(radius_km=200, sort_by="distance"),
+            [centre, near, town, far],
+        )
+        self.assertEqual(
+            self.get_feed(radius_km=200, sort_by="distance", order="desc"),
+            [far, town, near, centre],
+        )
+
+    def test_cells_are_matched_as_prefixes(self):
+        # The covering cells of this point include "teyqz", whose prefix range
+        # cannot be expressed with an upper bound under every collation
+        event = self.events[0]
+        event.latitude, event.longitude = Decimal("22.30990"), Decimal("76.61260")
+        event.save()
+
+        query = str(
+            filter_events_near(FeedEvent.objects.all(), 22.3099, 76.6126, 1).query
+        )
+        self.assertIn("teyqz%", query)
+        self.assertNotIn('"geohash" <', query)
+        self.assertEqual(
+            self.get_feed(lat=22.3099, lng=76.6126, radius_km=1), [event.pk]
+        )
+
+    def test_search_crosses_the_antimeridian(self):
+        west, east, _, far = self.events
+        for event, longitude in [(west, "-179.95000"), (east, "179.95000")]:
+            event.latitude, event.longitude = Decimal("-17.00000"), Decimal(longitude)
+            event.save()
+
+        (_, east_edge), (west_edge, _) = get_bounding_box(-17.0, 179.99, 20)[2]
+        self.assertEqual((east_edge, west_edge), (180.0, -180.0))
+        response = APIClient().get(
+            "/api/v1/events/public-feed/",
+            {"lat": -17.0, "lng": 179.99, "radius_km": 20, "sort_by": "distance"},
+        )
+        self.assertEqual(
+            [event["details"]["id"] for event in response.json()["events"]],
+            [east.pk, west.pk],
+        )
+
+    def test_invalid_params_are_rejected(self):
+        for params, field in [
+            ({"lat": "north"}, "lat"),
+            ({"lat": 91}, "lat"),
+            ({"radius_km": 0}, "radius_km"),
+            ({"radius_km": 100000}, "radius_km"),
+        ]:
+            response = APIClient().get(
+                "/api/v1/events/public-feed/",
+                {"lat": self.LATITUDE, "lng": self.LONGITUDE, **params},
+            )
+            self.assertEqual(response.status_code, 400, params)
+            self.assertEqual(response.json()["field"], field, params)
+
+
+class EventQueryPlanTestCase(TestCase):
+    """Fails when a hot event query stops using an index and falls back to a
+    full scan of the events table"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.events = create_events(30)
+
+    def assertNoFullScan(self, queryset):
+        table = queryset.model._meta.db_table
+
+        if connection.vendor == "mysql":
+            plan = json.dumps(json.loads(queryset.explain(format="json")))
+            full_scan = re.search(
+                rf'"table_name": "{table}", "access_type": "ALL"', plan
+            )
+        elif connection.vendor == "postgresql":
+            plan = queryset.explain()
+            full_scan = re.search(rf"Seq Scan on {table}\b", plan)
+        else:
+            plan = queryset.explain()
+            full_scan = re.search(rf"SCAN {table}(?! USING (COVERING )?INDEX)", plan)
+
+        self.assertIsNone(full_scan, f"Full scan of {table}:\n{plan}")
+
+    def feed_queryset(self, **params):
+        request = RequestFactory().get("/", params)
+        return filter_events_feed(request).order_by(*get_feed_ordering(request))
+
+    def test_public_feed_uses_index(self):
+        self.assertNoFullScan(self.feed_queryset())
+
+    def test_feed_filtered_by_category_uses_index(self):
+        self.assertNoFullScan(self.feed_queryset(category="music"))
+
+    def test_feed_filtered_by_type_uses_index(self):
+        self.assertNoFullScan(self.feed_queryset(type="offline"))
+
+    def test_feed_near_me_uses_index(self):
+        self.assertNoFullScan(
+            self.feed_queryset(lat="23.26", lng="77.41", sort_by="distance")
+        )
+
+    def test_events_by_organisation_uses_index(self):
+        self.assertNoFullScan(
+            Event.objects.filter(
+                start_datetime__gte=timezone.now(),
+                organisation__id=self.events[0].organisation_id,
+            ).order_by("start_datetime")
+        )
+
+    def test_events_by_user_uses_index(self):
+        self.assertNoFullScan(
+            Event.objects.filter(
+                start_datetime__gte=timezone.now(),
+                created_by=self.events[0].created_by,
+            ).order_by("start_datetime")
+        )
+
+
+class EventSearchTestCase(FeedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.jazz, self.rock = create_events(2)
+        self.jazz.name = "Jazz Night"
+        self.jazz.save()
+
+    def search(self, query):
+        request = RequestFactory().get("/", {"search": query})
+        return list(
+            filter_events_feed(request)
+            .order_by("-relevance", "start_datetime")
+            .values_list("pk", flat=True)
+        )
+
+    def test_index_follows_event_changes(self):
+        self.assertEqual(self.search("jazz"), [self.jazz.pk])
+
+        self.rock.name = "Jazz Rock"
+        self.rock.save()
+        self.assertEqual(self.search("rock"), [self.rock.pk])
+
+        self.jazz.status = "draft"
+        self.jazz.save()
+        self.assertFalse(self.jazz.search_tokens.exists())
+        self.assertEqual(self.search("jazz"), [self.rock.pk])
+
+    def test_terms_match_token_prefixes(self):
+        self.assertEqual(self.search("ja"), [self.jazz.pk])
+        self.assertEqual(self.search("JAZZ nig"), [self.jazz.pk])
+        self.assertEqual(self.search("jazz rock"), [])
+        self.assertEqual(self.search("bho"), [self.jazz.pk, self.rock.pk])
+
+    def test_terms_ending_in_last_characters_match(self):
+        self.rock.name = "Route 99"
+        self.rock.save()
+
+        self.assertEqual(self.search("jazz"), [self.jazz.pk])
+        self.assertEqual(self.search("99"), [self.rock.pk])
+
+    def test_accents_and_case_are_folded(self):
+        self.jazz.name = "Café Crème"
+        self.jazz.description = "cafe"
+        self.jazz.save()
+
+        self.assertEqual(
+            sorted(self.jazz.search_tokens.values_list("token", flat=True)),
+            ["bhopal", "cafe", "creme"],
+        )
+        self.assertEqual(self.search("CAFÉ creme"), [self.jazz.pk])
+        self.assertEqual(self.search("crè"), [self.jazz.pk])
+
+    def test_results_are_ordered_by_relevance(self):
+        # Name tokens weigh more than description tokens (and than soonness)
+        self.jazz.name = "Night"
+        self.jazz.description = "Jazz"
+        self.jazz.save()
+        self.rock.name = "Jazz Rock"
+        self.rock.save()
+
+        self.assertEqual(self.search("jazz"), [self.rock.pk, self.jazz.pk])
+
+    def test_query_of_short_terms_matches_nothing(self):
+        self.assertEqual(self.search("j"), [])
+        self.assertEqual(self.search("a b"), [])
+        response = APIClient().get("/api/v1/events/public-feed/", {"search": "j"})
+        self.assertEqual(response.json()["total_events"], 0)
+
+
+class EventFeedCacheTestCase(FeedTestCase):
+    def test_repeated_feed_request_is_served_from_cache(self):
+        create_events(3)
+
+        first = self.client.get("/api/v1/events/public-feed/", {"category": "music"})
+        with self.assertNumQueries(0):
+            second = self.client.get(
+                "/api/v1/events/public-feed/", {"category": "music"}
+            )
+
+        self.assertEqual(first["X-Feed-Cache"], "miss")
+        self.assertEqual(second["X-Feed-Cache"], "hit")
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(get_feed_cache_stats()["hits"], 1)
+        self.assertEqual(get_feed_cache_stats()["misses"], 1)
+
+    def test_event_save_invalidates_cached_feed(self):
+        event = create_events(1, status="draft")[0]
+
+        response = self.client.get("/api/v1/events/public-feed/")
+        self.assertEqual(response.json()["total_events"], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            event.status = "published"
+            event.save()
+
+        response = self.client.get("/api/v1/events/public-feed/")
+        self.assertEqual(response["X-Feed-Cache"], "miss")
+        self.assertEqual(response.json()["total_events"], 1)
+
+
+class EventRankingTestCase(FeedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.music, self.later_music, self.coding = create_events(3)
+        self.coding.category = "coding"
+        self.coding.tags = ["python", "live"]
+        self.coding.save()
+        self.user = CustomUser.objects.create(email="ranked@planora.test", name="R")
+        self.client.force_authenticate(self.user)
+
+    def get_feed(self, **params):
+        response = self.client.get("/api/v1/events/personalised-feed/", params)
+        self.assertEqual(response.status_code, 200)
+        return [event["details"]["id"] for event in response.json()["events"]]
+
+    def interact(self, event):
+        EventInteractions.objects.create(
+            event=event, user=self.user, interaction_type="like", interaction_data={}
+        )
+
+    def test_events_are_ranked_by_affinity(self):
+        self.assertEqual(
+            self.get_feed(), [self.music.pk, self.later_music.pk, self.coding.pk]
+        )
+
+        self.interact(self.coding)
+
+        self.assertEqual(
+            self.get_feed(), [self.coding.pk, self.music.pk, self.later_music.pk]
+        )
+
+    def test_preference_update_reranks_the_feed(self):
+        self.get_feed()
+
+        UserPreference.objects.create(
+            user=self.user, designation="Dev", preferred_categories="coding"
+        )
+
+        self.assertEqual(self.get_feed()[0], self.coding.pk)
+
+    def test_location_update_reranks_the_feed(self):
+        # Delhi, far from the Bhopal events
+        latitude, longitude = Decimal("28.61390"), Decimal("77.20900")
+        self.coding.latitude, self.coding.longitude = latitude, longitude
+        self.coding.save()
+        self.get_feed()
+
+        self.user.latitude, self.user.longitude = latitude, longitude
+        self.user.save()
+
+        self.assertEqual(get_user_affinity(self.user)["latitude"], 28.6139)
+        self.assertEqual(self.get_feed()[0], self.coding.pk)
+
+    @mock.patch("events.ranking.CANDIDATE_LIMIT", 2)
+    def test_filters_apply_before_the_candidate_limit(self):
+        self.assertEqual(self.get_feed(), [self.music.pk, self.later_music.pk])
+        self.assertEqual(self.get_feed(category="coding"), [self.coding.pk])
+        self.assertEqual(self.get_feed(tags=["python"]), [self.coding.pk])
+        self.assertEqual(self.get_feed(tags=["python", "live"]), [self.coding.pk])
+        self.assertEqual(
+            self.get_feed(tags=["python", "jazz"], tags_match="any"),
+            [self.coding.pk],
+        )
+        self.assertEqual(self.get_feed(tags=["python", "jazz"]), [])
+
+
+class EventFeedReadModelTestCase(FeedTestCase):
+    def test_feed_matches_live_serialization(self):
+        create_events(3)
+
+        expected = json.loads(
+            json.dumps(
+                EventSerializer.bulk_details_serializer(
+                    Event.objects.order_by("start_datetime")
+                ),
+                cls=JSONEncoder,
+            )
+        )
+        response = self.client.get("/api/v1/events/public-feed/")
+
+        self.assertEqual(
+            [event["details"] for event in response.json()["events"]], expected
+        )
+
+    def test_feed_rows_follow_event_and_organisation_changes(self):
+        event = create_events(1)[0]
+        self.assertTrue(FeedEvent.objects.filter(pk=event.pk).exists())
+
+        event.organisation.name = "Renamed"
+        event.organisation.save()
+        self.assertEqual(
+            FeedEvent.objects.get(pk=event.pk).details["organisation"]["name"],
+            "Renamed",
+        )
+
+        event.status = "draft"
+        event.save()
+        self.assertFalse(FeedEvent.objects.filter(pk=event.pk).exists())
+
+
+class EventFacetIndexTestCase(FeedTestCase):
+    FILTERS = [
+        {},
+        {"category": "music"},
+        {"category": "sports", "type": "online"},
+        {"tags": ["live", "free"]},
+        {"tags": ["live", "free"], "tags_match": "any"},
+        {"category": "music", "tags": ["free"], "order": "desc"},
+        {"category": "unknown"},
+    ]
+
+    def setUp(self):
+        super().setUp()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for i, event in enumerate(create_events(12)):
+                event.category = ["music", "sports", "tech"][i % 3]
+                event.type = ["offline", "online"][i % 2]
+                event.tags = [["live"], ["live", "free"], ["free"], []][i % 4]
+                event.save()
+
+    def test_filters_match_sql_feed(self):
+        for params in self.FILTERS:
+            request = RequestFactory().get("/", params)
+            events = filter_events_feed(request).order_by(
+                *get_feed_ordering(request), "-pk" if "order" in params else "pk"
+            )
+            event_ids = get_facet_index().filter(
+                {
+                    "category": params.get("category"),
+                    "type": params.get("type"),
+                    "tags": params.get("tags", []),
+                    "match_all": params.get("tags_match") != "any",
+                },
+                descending="order" in params,
+            )
+
+            self.assertEqual(event_ids[:], [event.pk for event in events], params)
+
+    def test_facet_counts(self):
+        facets = get_facet_index().get_facet_counts(
+            {"category": "music", "tags": [], "match_all": True}
+        )
+
+        self.assertEqual(facets["category"], {"music": 4, "sports": 4, "tech": 4})
+        self.assertEqual(facets["type"], {"offline": 2, "online": 2})
+        self.assertEqual(facets["tags"], {"free": 2, "live": 2})
+
+    def test_index_follows_event_changes(self):
+        event = Event.objects.order_by("pk").first()
+        get_facet_index()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            event.category = "tech"
+            event.save()
+
+        with self.assertNumQueries(1):  # Only the changed row is read
+            facet_index = get_facet_index()
+        self.assertEqual(facet_index.check(), [])
+        self.assertEqual(
+            facet_index.get_facet_counts({})["category"],
+            {"tech": 5, "sports": 4, "music": 3},
+        )
+
+    def test_applied_changes_match_a_full_rebuild(self):
+        first, second, third = Event.objects.order_by("pk")[:3]
+        get_facet_index()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.start_datetime += timedelta(days=30)  # Moves to the end
+            first.save()
+            second.status = "draft"  # Leaves the feed
+            second.save()
+            third.tags = ["jazz"]  # Changes in place
+            third.save()
+            create_events(1)  # Joins the feed
+
+        with mock.patch.object(FacetIndex, "sync") as sync:
+            facet_index = get_facet_index()
+        sync.assert_not_called()
+
+        rebuilt = FacetIndex()
+        rebuilt.check()
+        self.assertEqual(facet_index.snapshot, rebuilt.snapshot)
+        self.assertEqual(facet_index.rows, rebuilt.rows)
+
+    def test_changes_outside_the_feed_keep_the_feed_version(self):
+        version = get_feed_cache_stats()["version"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            draft = create_events(1, status="draft")[0]
+            draft.name = "Still a draft"
+            draft.save()
+            draft.created_by.name = "Creator of a draft"
+            draft.created_by.save()
+            draft.organisation.name = "Organisation of a draft"
+            draft.organisation.save()
+            draft.delete()
+
+        self.assertEqual(get_feed_cache_stats()["version"], version)
+
+    def test_index_follows_feed_version_bumped_by_other_process(self):
+        event = Event.objects.order_by("pk").first()
+        get_facet_index()
+
+        # Another process changes the row and bumps the shared feed version
+        FeedEvent.objects.filter(pk=event.pk).update(
+            category="tech", updated_at=timezone.now()
+        )
+        bump_feed_version()
+
+        self.assertEqual(len(get_facet_index().filter({"category": "tech"})), 5)
+
+    def test_check_repairs_drifted_index(self):
+        event = Event.objects.order_by("pk").first()
+        facet_index = get_facet_index()
+
+        # Changed behind the back of the signals (no feed version bump)
+        FeedEvent.objects.filter(pk=event.pk).update(category="tech")
+
+        self.assertEqual(facet_index.check(), [event.pk])
+        self.assertEqual(facet_index.check(), [])
+        self.assertEqual(len(facet_index.filter({"category": "tech"})), 5)
+
+    def test_feed_served_from_facet_index(self):
+        client = APIClient()
+
+        response = client.get("/api/v1/events/public-feed/", {"category": "music"})
+        self.assertEqual(
+            [event["details"]["category"] for event in response.json()["events"]],
+            ["music"] * 4,
+        )
+        self.assertEqual(response.json()["total_events"], 4)
+
+        response = client.get(
+            "/api/v1/events/facets/", {"category": "music", "tags": "free"}
+        )
+        self.assertEqual(response.json()["total_events"], 2)
+        self.assertEqual(response.json()["facets"]["tags"], {"free": 2, "live": 1})
+
+
+class EventFragmentCacheTestCase(FeedTestCase):
+    def test_fragments_render_like_plain_details(self):
+        create_events(3)
+        feed_events = list(FeedEvent.objects.order_by("pk"))
+        renderer = UJSONRenderer()
+
+        self.assertEqual(
+            renderer.render({"events": get_feed_fragments(feed_events)}),
+            renderer.render(
+                {"events": [feed_event.details for feed_event in feed_events]}
+            ),
+        )
+
+    def test_cached_fragments_skip_details(self):
+        create_events(3)
+
+        feed_events = list(FeedEvent.objects.defer("details"))
+        with self.assertNumQueries(1):  # Deferred details of the missing rows
+            get_feed_fragments(feed_events)
+
+        feed_events = list(FeedEvent.objects.defer("details"))
+        with self.assertNumQueries(0):
+            get_feed_fragments(feed_events)
+
+    def test_edit_replaces_fragment(self):
+        event = create_events(1)[0]
+        get_feed_fragments(list(FeedEvent.objects.all()))
+
+        event.name = "Renamed"
+        event.save()
+
+        fragment = get_feed_fragments(list(FeedEvent.objects.defer("details")))[0]
+        self.assertEqual(json.loads(fragment.content)["name"], "Renamed")
+
+
+class StreamingJSONListResponseTestCase(TestCase):
+    def test_streamed_chunks_match_single_response(self):
+        create_events(5)
+        events = Event.objects.select_related("organisation", "created_by").order_by(
+            "pk"
+        )
+        expected = UJSONRenderer().render(
+            {"events": EventSerializer.bulk_details_serializer(events)}
+        )
+
+        for chunk_size in [1, 2, 5, 100]:
+            response = StreamingJSONListResponse(
+                "events",
+                events,
+                EventSerializer.bulk_details_serializer,
+                chunk_size=chunk_size,
+            )
+            self.assertEqual(b"".join(response.streaming_content), expected)
+
+        response = StreamingJSONListResponse(
+            "events", events.none(), EventSerializer.bulk_details_serializer
+        )
+        self.assertEqual(b"".join(response.streaming_content), b'{"events":[]}')
+
+    def test_events_by_user_is_streamed(self):
+        event = create_events(2)[0]
+        client = APIClient()
+        client.force_authenticate(event.created_by)
+
+        response = client.get("/api/v1/events/event-list-by-user/")
+
+        self.assertTrue(response.streaming)
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(data["events"][0]["details"]["id"], event.id)
+        self.assertEqual(data["events"][0]["total_rsvped"], 0)
+
+
+class RowReaderTestCase(TestCase):
+    def test_rows_serialize_like_models(self):
+        create_events(3)
+        queryset = Event.objects.order_by("pk")
+
+        with self.assertNumQueries(1):
+            rows = list(EventSerializer.ROWS.read(queryset))
+
+        self.assertEqual(
+            [EventSerializer(row).details_serializer() for row in rows],
+            EventSerializer.bulk_details_serializer(queryset),
+        )
+        with self.assertRaises(AttributeError):
+            rows[0].extra = 1
+
+    def test_streamed_lists_read_rows(self):
+        event = create_events(1)[0]
+        client = APIClient()
+        client.force_authenticate(event.created_by)
+
+        with self.assertNumQueries(1):
+            response = client.get("/api/v1/events/event-list-by-user/")
+            data = json.loads(b"".join(response.streaming_content))
+
+        self.assertEqual(
+            data["events"][0]["details"],
+            json.loads(
+                UJSONRenderer().render(EventSerializer(event).details_serializer())
+            ),
+        )
+
+
+class UJSONRendererTestCase(TestCase):
+    def test_native_encoding_matches_drf_encoder(self):
+        now = timezone.now()
+        data = {
+            "events": [
+                {"id": 1, "start": now, "nested": {"at": now.date()}, "tags": []},
+                {"id": 2, "start": None, "extra": now, "price": Decimal("9.50")},
+                "not a dict",
+            ],
+            "naive": now.replace(tzinfo=None),
+            "text": "line separator",
+        }
+
+        self.assertEqual(
+            json.loads(UJSONRenderer().render(data)),
+            json.loads(json.dumps(data, cls=JSONEncoder)),
+        )
+        self.assertIn(b"\\u2028", UJSONRenderer().render(data))
+
+
+class UJSONParserTestCase(TestCase):
+    def parse(self, body: bytes, content_length=None, **context):
+        request = RequestFactory().post("/", body, content_type="application/json")
+        if content_length is not None:
+            request.META["CONTENT_LENGTH"] = str(content_length)
+        return UJSONParser().parse(
+            BytesIO(body), parser_context={"request": request, **context}
+        )
+
+    def test_parses_utf8_bytes(self):
+        body = json.dumps({"name": "Événement", "tags": ["a"]}).encode("utf-8")
+        self.assertEqual(self.parse(body), {"name": "Événement", "tags": ["a"]})
+
+        with self.assertRaises(ParseError):
+            self.parse(b'{"name": ')
+
+    def test_decodes_other_charsets(self):
+        body = json.dumps({"name": "Événement"}, ensure_ascii=False)
+        self.assertEqual(
+            self.parse(body.encode("latin-1"), encoding="latin-1"),
+            {"name": "Événement"},
+        )
+
+        with self.assertRaises(ParseError):
+            self.parse(b"{}", encoding="no-such-charset")
+
+    def test_max_body_size(self):
+        body = json.dumps({"name": "x" * 100}).encode("utf-8")
+
+        class View:
+            max_body_size = 64
+
+        with self.settings(JSON_MAX_BODY_SIZE=1024):
+            self.assertEqual(self.parse(body)["name"], "x" * 100)
+            # Rejected from the header, and when the header understates the body
+            with self.assertRaises(RequestEntityTooLarge):
+                self.parse(body, content_length=2048)
+            with self.assertRaises(RequestEntityTooLarge):
+                self.parse(body, view=View())
+            with self.assertRaises(RequestEntityTooLarge):
+                self.parse(body, content_length=10, view=View())
+
+    def test_max_depth(self):
+        with self.settings(JSON_MAX_DEPTH=3):
+            self.assertEqual(self.parse(b'{"a": [{"b": 1}]}'), {"a": [{"b": 1}]})
+            with self.assertRaises(ParseError):
+                self.parse(b'{"a": [{"b": [1]}]}')
+
+    def test_route_limit_returns_413(self):
+        response = APIClient().post(
+            "/api/v1/users/obtain-auth-token/",
+            {"email": "a@planora.test", "password": "x" * 8192},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 413)
+
+
+class EventSparseFieldsetTestCase(FeedTestCase):
+    FIELDS = "id,name,start_datetime,location,organisation.name"
+
+    def test_feed_returns_requested_fields(self):
+        event = create_events(1)[0]
+
+        response = self.client.get(
+            "/api/v1/events/public-feed/", {"fields": self.FIELDS}
+        )
+
+        self.assertEqual(
+            response.json()["events"][0]["details"],
+            {
+                "id": event.id,
+                "name": event.name,
+                "start_datetime": json.loads(
+                    json.dumps(event.start_datetime, cls=JSONEncoder)
+                ),
+                "location": event.location,
+                "organisation": {"name": event.organisation.name},
+            },
+        )
+
+    def test_details_narrow_the_query(self):
+        event = create_events(1)[0]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                f"/api/v1/events/details/{event.id}/", {"fields": self.FIELDS}
+            )
+
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("description", queries[0]["sql"])
+        self.assertEqual(
+            list(response.json()["details"]),
+            ["id", "name", "start_datetime", "location", "organisation"],
+        )
+
+        full = self.client.get(f"/api/v1/events/details/{event.id}/")
+        self.assertEqual(
+            EventSerializer(event).sparse_details_serializer(EventSerializer.FIELDS),
+            EventSerializer(event).details_serializer(),
+        )
+        self.assertIn("description", full.json()["details"])
+
+    def test_invalid_field_is_rejected(self):
+        event = create_events(1)[0]
+
+        response = self.client.get(
+            f"/api/v1/events/details/{event.id}/", {"fields": "id,password"}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["field"], "fields")
+
+
+class EventConditionalGetTestCase(FeedTestCase):
+    def test_details_not_modified_before_loading_the_row(self):
+        event = create_events(1)[0]
+        url = f"/api/v1/events/details/{event.id}/"
+        etag = self.client.get(url)["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("description", queries[0]["sql"])
+
+        event.name = "Renamed"
+        event.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_details_modified_when_the_creator_changes(self):
+        event = create_events(1)[0]
+        url = f"/api/v1/events/details/{event.id}/"
+        etag = self.client.get(url)["ETag"]
+
+        event.created_by.name = "Renamed"
+        event.created_by.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["details"]["created_by"]["name"], "Renamed")
+
+    def test_feed_not_modified_until_feed_version_changes(self):
+        create_events(2)
+        etag = self.client.get("/api/v1/events/public-feed/")["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                "/api/v1/events/public-feed/", HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+
+        other = self.client.get("/api/v1/events/public-feed/", {"page": 1})
+        self.assertNotEqual(other["ETag"], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_events(1)
+        response = self.client.get(
+            "/api/v1/events/public-feed/", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class ColumnarFeedTestCase(FeedTestCase):
+    def test_columnar_feed_holds_the_same_events(self):
+        create_events(3)
+
+        rows = self.client.get("/api/v1/events/public-feed/").json()["events"]
+        response = self.client.get(
+            "/api/v1/events/public-feed/", {"format": "columnar"}
+        )
+        data = json.loads(response.content)
+
+        self.assertEqual(response["Content-Type"], ColumnarJSONRenderer.media_type)
+        self.assertEqual(data["total_events"], 3)
+        columns = data["events"]
+        self.assertEqual(
+            [
+                {
+                    **{key: values[i] for key, values in columns.items()},
+                    "organisation": data["organisations"][
+                        str(columns["organisation"][i])
+                    ],
+                    "created_by": data["users"][str(columns["created_by"][i])],
+                }
+                for i in range(3)
+            ],
+            [row["details"] for row in rows],
+        )
+
+    def test_columnar_feed_has_its_own_etag(self):
+        create_events(1)
+
+        response = self.client.get("/api/v1/events/public-feed/")
+        columnar = self.client.get(
+            "/api/v1/events/public-feed/",
+            HTTP_ACCEPT=ColumnarJSONRenderer.media_type,
+        )
+
+        self.assertEqual(columnar["Content-Type"], ColumnarJSONRenderer.media_type)
+        self.assertNotEqual(response["ETag"], columnar["ETag"])
+
+
+class SharedCacheCheckTestCase(TestCase):
+    def test_local_memory_shared_caches_are_reported(self):
+        shared = {"BACKEND": "django.core.cache.backends.redis.RedisCache"}
+        local = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+
+        with override_settings(
+            CACHES={"default": shared, "ratelimit": local, "affinity": shared}
+        ):
+            errors = check_shared_caches(None)
+        self.assertEqual([error.id for error in errors], ["events.E001"])
+        self.assertIn("RATELIMIT_CACHE_URL", errors[0].hint)
+
+        with override_settings(
+            CACHES={"default": shared, "ratelimit": shared, "affinity": shared}
+        ):
+            self.assertEqual(check_shared_caches(None), [])
@@ -15,6 +15,16 @@ events_api_v1_urls = [
         views.EventsFeedAPI().as_view(),
         name="events-personalised-feed",
     ),
+    path(
+        "tags/",
+        views.EventTagListAPI().as_view(),
+        name="events-tags",
+    ),
+    path(
+        "facets/",
+        views.EventFacetListAPI().as_view(),
+        name="events-facets",
+    ),
     path(
         "organisation-event-list/<int:organisation_id>/",
         views.EventListByOrganisation().as_view(),
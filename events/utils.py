@@ -0,0 +1,359 @@
+import math
+
+from django.db.models import Count, FloatField, Q, Value
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+from django.utils import timezone
+from rest_framework.validators import ValidationError
+
+from utils.conditional import get_etag
+from utils.fields import get_requested_fields
+from utils.geohash import get_bounding_box, get_covering_cells
+from utils.pagination import KeysetPagination
+from utils.tags import filter_by_tags, sync_tags
+
+from . import models
+from .facets import paginate_facet_feed
+from .feed import get_feed_details
+from .search import search_events
+from .serializers import EventSerializer
+
+# Define allowed sorting fields
+FEED_SORT_FIELDS = ["start_datetime", "name", "scan_id"]
+
+# "Near me" filter radius (km)
+DEFAULT_RADIUS_KM = 10.0
+MAX_RADIUS_KM = 200.0
+EARTH_RADIUS_KM = 6371.0
+
+
+def get_feed_sorting(request):
+    """Reads the feed sorting parameters of the request
+
+    Args:
+        request (Request): Incoming request
+
+    Returns:
+        tuple: (sort field, whether the order is descending)
+    """
+
+    # Get sorting parameters from the request
+    sort_by = request.GET.get("sort_by", "start_datetime")  # Default to start_datetime
+    order = request.GET.get("order", "asc")  # Default to ascending order
+
+    # Ensure sort_by is valid
+    if sort_by not in FEED_SORT_FIELDS:
+        sort_by = "start_datetime"  # Default to start_datetime if invalid
+
+    return sort_by, order == "desc"
+
+
+def get_feed_ordering(request) -> list:
+    """Builds the ``order_by`` arguments of a page-number feed request. Search
+    results are ranked by relevance unless a sort field is asked for.
+
+    Args:
+        request (Request): Incoming request
+
+    Returns:
+        list: ordering of the feed
+    """
+
+    sort_by, descending = get_feed_sorting(request)
+
+    if request.GET.get("sort_by") == "distance" and get_geo_params(request):
+        return ["-distance_km" if descending else "distance_km", "pk"]
+
+    if request.GET.get("search", "").strip() and "sort_by" not in request.GET:
+        return ["-relevance", "start_datetime", "pk"]
+
+    return [f"-{sort_by}" if descending else sort_by]
+
+
+def filter_events_feed(request):
+    """Builds the (unordered) queryset of feed rows (upcoming published events)
+    matching the search and filter parameters of a feed request
+
+    Args:
+        request (Request): Incoming request
+
+    Returns:
+        QuerySet: filtered FeedEvent rows
+    """
+
+    search_query = request.GET.get("search", "").strip()
+
+    # Fetch all upcoming events of the feed read-model (published only)
+    events = models.FeedEvent.objects.filter(start_datetime__gte=timezone.now())
+
+    # Apply search filtering (ranked by relevance) if user has entered a keyword
+    if search_query:
+        events = search_events(events, search_query)
+
+    # Retrieve query parameters
+    category = request.GET.get("category")
+    event_type = request.GET.get("type")
+    tags = request.GET.getlist("tags")  # Handles multiple tags
+
+    if category:
+        events = events.filter(category=category)
+    if event_type:
+        events = events.filter(type=event_type)
+    if tags:  # Matches all tags by default, any of them with tags_match=any
+        events = filter_by_tags(
+            events,
+            models.EventTag,
+            "event",
+            tags,
+            match_all=request.GET.get("tags_match", "all") != "any",
+        )
+
+    geo_params = get_geo_params(request)
+    if geo_params:
+        events = filter_events_near(events, *geo_params)
+
+    return events
+
+
+def get_geo_params(request):
+    """Reads and validates the "near me" parameters of a feed request
+
+    Args:
+        request (Request): Incoming request
+
+    Returns:
+        tuple: (latitude, longitude, radius in km), or None without lat/lng
+    """
+
+    if "lat" not in request.GET and "lng" not in request.GET:
+        return None
+
+    params = []
+    for field, default in [
+        ("lat", None),
+        ("lng", None),
+        ("radius_km", DEFAULT_RADIUS_KM),
+    ]:
+        try:
+            params.append(float(request.GET.get(field, default)))
+        except (TypeError, ValueError):
+            raise ValidationError(
+                {"error": f"{field} not in correct format", "field": field}
+            )
+
+    latitude, longitude, radius_km = params
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValidationError({"error": "lat/lng out of range", "field": "lat"})
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        raise ValidationError(
+            {
+                "error": f"radius_km should be between 0 and {MAX_RADIUS_KM}",
+                "field": "radius_km",
+            }
+        )
+
+    return latitude, longitude, radius_km
+
+
+def filter_events_near(events, latitude: float, longitude: float, radius_km: float):
+    """Filters events within ``radius_km`` of a point and annotates their
+    ``distance_km``. The geohash cells and bounding box covering the circle are
+    matched on indexed columns first, so the exact (haversine) distance is only
+    computed for those candidates.
+
+    Args:
+        events (QuerySet): Events to filter
+        latitude (float): Latitude of the point
+        longitude (float): Longitude of the point
+        radius_km (float): Radius in km
+
+    Returns:
+        QuerySet: events near the point annotated with ``distance_km``
+    """
+
+    cells = Q()
+    for cell in get_covering_cells(latitude, longitude, radius_km):
+        # Geohashes are lowercase ASCII, so a case insensitive LIKE 'cell%'
+        # matches the same rows under every collation and uses the index
+        cells |= Q(geohash__istartswith=cell)
+
+    min_latitude, max_latitude, longitude_ranges = get_bounding_box(
+        latitude, longitude, radius_km
+    )
+    longitudes = Q()
+    for min_longitude, max_longitude in longitude_ranges:
+        longitudes |= Q(longitude__gte=min_longitude, longitude__lte=max_longitude)
+    events = events.filter(
+        cells,
+        longitudes,
+        latitude__gte=min_latitude,
+        latitude__lte=max_latitude,
+    )
+
+    event_latitude = Radians(Cast("latitude", FloatField()))
+    event_longitude = Radians(Cast("longitude", FloatField()))
+    haversine = Power(
+        Sin((event_latitude - Value(math.radians(latitude))) / 2), 2
+    ) + Value(math.cos(math.radians(latitude))) * Cos(event_latitude) * Power(
+        Sin((event_longitude - Value(math.radians(longitude))) / 2), 2
+    )
+
+    return events.annotate(
+        distance_km=Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(haversine))
+    ).filter(distance_km__lte=radius_km)
+
+
+def is_cursor_pagination(request) -> bool:
+    """Checks whether the feed request asked for cursor (keyset) pagination
+
+    Args:
+        request (Request): Incoming request
+
+    Returns:
+        bool: True if cursor pagination is requested
+    """
+
+    return request.GET.get("pagination") == "cursor" or "cursor" in request.GET
+
+
+def get_event_fields(request):
+    """Reads the sparse fieldset (``?fields=``) of an event request
+
+    Args:
+        request (Request): Incoming request
+
+    Returns:
+        list: requested EventSerializer fields, or None for all of them
+    """
+
+    return get_requested_fields(
+        request, EventSerializer.FIELDS, EventSerializer.NESTED_FIELDS
+    )
+
+
+def get_event_etag(
+    event_id, updated_at, organisation_updated_at, creator_name, creator_email, fields
+) -> str:
+    """Builds the ETag of the details of an event. Users have no update
+    timestamp, so the creator's serialized name and email are part of it.
+
+    Args:
+        event_id (int): Event id
+        updated_at (datetime): Last update of the event
+        organisation_updated_at (datetime): Last update of its organisation
+        creator_name (str): Name of its creator
+        creator_email (str): Email of its creator
+        fields (list): Sparse fieldset of the representation, None for all
+
+    Returns:
+        str: quoted ETag
+    """
+
+    return get_etag(
+        "event",
+        event_id,
+        updated_at.isoformat(),
+        organisation_updated_at.isoformat(),
+        creator_name,
+        creator_email,
+        ",".join(fields or []),
+    )
+
+
+def is_facet_request(request) -> bool:
+    """Checks whether a page-number feed request only filters by category, type
+    and tags in date order, so that it can be answered by the facet index
+
+    Args:
+        request (Request): Incoming request
+
+    Returns:
+        bool: True if the facet index can serve the request
+    """
+
+    return (
+        not request.GET.get("search", "").strip()
+        and get_feed_sorting(request)[0] == "start_datetime"
+        and not is_cursor_pagination(request)
+        and not get_geo_params(request)
+    )
+
+
+def sync_event_tags(*events: models.Event):
+    """Updates the tag index (EventTag rows) of created, edited or imported events
+
+    Args:
+        events (Event): Saved events
+    """
+
+    sync_tags(models.EventTag, "event", list(events))
+
+
+def get_popular_tags(limit: int = 50) -> list:
+    """Counts the upcoming published events of every tag
+
+    Args:
+        limit (int): Maximum number of tags returned
+
+    Returns:
+        list: tags with their event counts, most popular first
+    """
+
+    return list(
+        models.EventTag.objects.filter(
+            event__status="published", event__start_datetime__gte=timezone.now()
+        )
+        .values("tag")
+        .annotate(count=Count("event"))
+        .order_by("-count", "tag")[:limit]
+    )
+
+
+def get_feed_data(request, paginator) -> dict:
+    """Queries and serializes the feed page asked for by a public (or not
+    personalised) feed request
+
+    Args:
+        request (Request): Incoming request
+        paginator (PageNumberPagination): Paginator of the view, used unless the
+            request asks for cursor pagination
+
+    Returns:
+        dict: response data of the feed page
+    """
+
+    fields = get_event_fields(request)
+    # Details are read from the fragment cache or sparse (see events.feed)
+    events = filter_events_feed(request).defer("details")
+    sort_by, descending = get_feed_sorting(request)
+
+    if is_cursor_pagination(request):
+        paginator = KeysetPagination(sort_by, descending)
+        paginated_events = paginator.paginate_queryset(events, request)
+
+        return {
+            "events": [
+                {"details": details}
+                for details in get_feed_details(paginated_events, fields)
+            ],
+            "next_cursor": paginator.next_cursor,
+            "previous_cursor": paginator.previous_cursor,
+        }
+
+    if is_facet_request(request):
+        # Category / type / tags filters are evaluated by the facet index
+        paginated_events = paginate_facet_feed(paginator, request)
+    else:
+        events = events.order_by(*get_feed_ordering(request))
+        paginated_events = paginator.paginate_queryset(events, request)
+
+    return {
+        "events": [
+            {"details": details}
+            for details in get_feed_details(paginated_events, fields)
+        ],
+        "total_events": paginator.page.paginator.count,
+        "page": paginator.page.number,
+        "total_pages": paginator.page.paginator.num_pages,
+        "next_page_link": paginator.get_next_link(),
+        "previous_page_link": paginator.get_previous_link(),
+    }
@@ -1,17 +1,51 @@
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, F, Q
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
+from events.cache import (
+    get_cached_feed,
+    get_feed_cache_key,
+    get_feed_etag,
+    set_cached_feed,
+)
+from events.facets import get_facet_filters, get_facet_index
+from events.feed import get_feed_details
 from events.serializers import EventSerializer
+from events.ranking import rank_events_for_user
+from events.utils import (
+    get_event_etag,
+    get_event_fields,
+    get_feed_data,
+    get_geo_params,
+    get_popular_tags,
+    is_cursor_pagination,
+)
 from events.validator import EventCreateInputValidator
+from planoraAPI.settings.custom_DRF_settings.renderers import ColumnarJSONRenderer
+from planoraAPI.settings.custom_DRF_settings.throttling import UserTokenBucketThrottle
 from users.models import OrganisationCommittee
 from users.serializers import UserSerializer
+from utils.conditional import is_not_modified, not_modified_response
+from utils.rows import RowReader
+from utils.streaming import StreamingJSONListResponse
 
 from . import models
 
+# Row readers of the streamed lists (see utils.rows)
+EVENT_COUNT_ROWS = RowReader(
+    "EventCountRow",
+    [*EventSerializer.ROWS.fields, "total_rsvped", "total_attended"],
+    EventSerializer.ROWS.related,
+)
+ATTENDEE_ROWS = RowReader(
+    "AttendeeRow", ["is_present"], {"attendee": UserSerializer.CONDENSED_ROWS}
+)
+
 # def search_events(request):
 #     results = []
 #     if request.method == "POST":
@@ -31,6 +65,7 @@ class EventCreateAPI(APIView):
 
     permission_classes = []
 
+    @transaction.atomic
     def post(self, request, organisation_id: int):
         """POST Method to create new events
 
@@ -99,6 +134,7 @@ class EventEditAPI(APIView):
 
     permission_classes = []
 
+    @transaction.atomic
     def put(self, request, event_id: int):
         """PUT Method to edit events
 
@@ -163,6 +199,7 @@ class EventPublishAPI(APIView):
 
     permission_classes = []
 
+    @transaction.atomic
     def post(self, request, event_id: int):
         """POST Method to publish events
 
@@ -198,6 +235,7 @@ class EventsPublicFeedAPI(APIView):
 
     permission_classes = []
     authentication_classes = []
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarJSONRenderer]
 
     class CustomPaginator(PageNumberPagination):
         """Custom paginator for this view only"""
@@ -209,95 +247,65 @@ class EventsPublicFeedAPI(APIView):
     def get(self, request):
         """GET Method to fetch events feed
 
+        Query Params:
+            - search, category, type, tags, tags_match (all / any)
+            - lat, lng, radius_km (near me, default 10 km)
+            - sort_by (start_datetime / name / scan_id / distance), order
+            - page (page number mode)
+            - pagination=cursor / cursor (cursor mode)
+            - fields (sparse fieldset, e.g. id,name,organisation.name)
+            - format=columnar (column arrays with shared organisation / user
+              tables, see ColumnarJSONRenderer)
+
+        Headers:
+            - If-None-Match (ETag of the feed version)
+
         Output Serializer:
-            - EventsFeedSerializer
+            - EventsFeedSerializer (cached per filter signature, see events.cache)
 
         Possible Outputs:
             - Errors
-                - None
+                - Invalid cursor (cursor field)
+                - Invalid lat / lng / radius_km
+                - Invalid field (fields field)
             - Successes
                 - events feed
+                - Not modified (304, If-None-Match matches)
         """
-        search_query = request.GET.get("search", "").strip()
+        cache_key = get_feed_cache_key(request)
+        etag = get_feed_etag(cache_key, request.accepted_renderer.format)
 
-        # Fetch all upcoming published events
-        events = models.Event.objects.filter(
-            status="published", start_datetime__gte=timezone.now()
-        ).order_by("start_datetime")
-
-        # Apply search filtering if user has entered a keyword
-        if search_query:
-            events = events.filter(
-                Q(name__icontains=search_query)  # Search in event name
-                | Q(description__icontains=search_query)  # Search in event description
-                | Q(location__icontains=search_query)  # Search in event location
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+
+        data = get_cached_feed(cache_key)
+
+        if data is not None:
+            return Response(
+                data,
+                status=status.HTTP_200_OK,
+                headers={"X-Feed-Cache": "hit", "ETag": etag},
             )
 
-        # Retrieve query parameters
-        category = request.GET.get("category")
-        event_type = request.GET.get("type")
-        tags = request.GET.getlist("tags")  # Handles multiple tags
-        # Get sorting parameters from the request
-        sort_by = request.GET.get(
-            "sort_by", "start_datetime"
-        )  # Default to start_datetime
-        order = request.GET.get("order", "asc")  # Default to ascending order
-
-        # Define allowed sorting fields
-        allowed_sort_fields = ["start_datetime", "name", "scan_id"]
-
-        # Ensure sort_by is valid
-        if sort_by not in allowed_sort_fields:
-            sort_by = "start_datetime"  # Default to start_datetime if invalid
-
-        # Apply sorting order
-        if order == "desc":
-            sort_by = f"-{sort_by}"  # Prefix '-' for descending order
-
-        # Apply sorting
-        events = events.order_by(sort_by)
-
-        # events = models.Event.objects.filter(
-        #     status="active", start_datetime__gte=timezone.now()
-        # ).order_by("start_datetime")
-
-        if category:
-            events = events.filter(category=category)
-        if event_type:
-            events = events.filter(type=event_type)
-        if tags:  # Assuming tags is a JSONField containing a list
-            events = events.filter(tags__contains=tags)
-
-        # events = events.order_by("start_datetime")  # Order by date
-        # Apply pagination (Only for this view)
-        paginator = self.CustomPaginator()
-        paginated_events = paginator.paginate_queryset(events, request)
+        data = get_feed_data(request, self.CustomPaginator())
+        set_cached_feed(cache_key, data)
 
         return Response(
-            {
-                "events": [
-                    {"details": EventSerializer(event).details_serializer()}
-                    for event in paginated_events
-                ],
-                "total_events": events.count(),
-                "page": paginator.page.number,
-                "total_pages": paginator.page.paginator.num_pages,
-                "next_page_link": paginator.get_next_link(),
-                "previous_page_link": paginator.get_previous_link(),
-            },
+            data,
             status=status.HTTP_200_OK,
+            headers={"X-Feed-Cache": "miss", "ETag": etag},
         )
 
 
 class EventsFeedAPI(APIView):
-    # ! need to add search, filter and pagination
-    """API view to fetch events feed
+    """API view to fetch the personalised events feed
 
     Methods:
         GET
     """
 
     permission_classes = []
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarJSONRenderer]
 
     class CustomPaginator(PageNumberPagination):
         """Custom paginator for this view only"""
@@ -309,78 +317,83 @@ class EventsFeedAPI(APIView):
     def get(self, request):
         """GET Method to fetch events feed
 
+        Authenticated requests without search, sort_by or cursor are ranked for
+        the user (see events.ranking); all others behave like the public feed.
+
+        Query Params:
+            - search, category, type, tags, tags_match (all / any)
+            - lat, lng, radius_km (near me, default 10 km)
+            - sort_by (start_datetime / name / scan_id / distance), order
+            - page (page number mode)
+            - pagination=cursor / cursor (cursor mode)
+            - fields (sparse fieldset, e.g. id,name,organisation.name)
+            - format=columnar (column arrays with shared organisation / user
+              tables, see ColumnarJSONRenderer)
+
+        Headers:
+            - If-None-Match (ETag of the feed version, not for ranked feeds)
+
         Output Serializer:
             - EventsFeedSerializer
 
         Possible Outputs:
             - Errors
-                - None
+                - Invalid cursor (cursor field)
+                - Invalid lat / lng / radius_km
+                - Invalid field (fields field)
             - Successes
                 - events feed
+                - Not modified (304, If-None-Match matches)
         """
-        search_query = request.GET.get("search", "").strip()
+        if self.is_personalised(request):
+            return self.get_personalised_feed(request)
 
-        # Fetch all upcoming published events
-        events = models.Event.objects.filter(
-            status="published", start_datetime__gte=timezone.now()
-        ).order_by("start_datetime")
-
-        # Apply search filtering if user has entered a keyword
-        if search_query:
-            events = events.filter(
-                Q(name__icontains=search_query)  # Search in event name
-                | Q(description__icontains=search_query)  # Search in event description
-                | Q(location__icontains=search_query)  # Search in event location
-            )
-
-        # Retrieve query parameters
-        category = request.GET.get("category")
-        event_type = request.GET.get("type")
-        tags = request.GET.getlist("tags")  # Handles multiple tags
-        # Get sorting parameters from the request
-        sort_by = request.GET.get(
-            "sort_by", "start_datetime"
-        )  # Default to start_datetime
-        order = request.GET.get("order", "asc")  # Default to ascending order
-
-        # Define allowed sorting fields
-        allowed_sort_fields = ["start_datetime", "name", "scan_id"]
-
-        # Ensure sort_by is valid
-        if sort_by not in allowed_sort_fields:
-            sort_by = "start_datetime"  # Default to start_datetime if invalid
-
-        # Apply sorting order
-        if order == "desc":
-            sort_by = f"-{sort_by}"  # Prefix '-' for descending order
+        etag = get_feed_etag(
+            get_feed_cache_key(request), request.accepted_renderer.format
+        )
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
 
-        # Apply sorting
-        events = events.order_by(sort_by)
+        return Response(
+            get_feed_data(request, self.CustomPaginator()),
+            status=status.HTTP_200_OK,
+            headers={"ETag": etag},
+        )
 
-        # events = models.Event.objects.filter(
-        #     status="active", start_datetime__gte=timezone.now()
-        # ).order_by("start_datetime")
+    def is_personalised(self, request) -> bool:
+        return (
+            request.user.is_authenticated
+            and not request.GET.get("search", "").strip()
+            and "sort_by" not in request.GET
+            and not is_cursor_pagination(request)
+            and not get_geo_params(request)
+        )
 
-        if category:
-            events = events.filter(category=category)
-        if event_type:
-            events = events.filter(type=event_type)
-        if tags:  # Assuming tags is a JSONField containing a list
-            events = events.filter(tags__contains=tags)
+    def get_personalised_feed(self, request):
+        """Ranks the precomputed candidates for the user and serializes the page"""
 
-        # events = events.order_by("start_datetime")  # Order by date
+        ranked_event_ids = rank_events_for_user(
+            request.user,
+            category=request.GET.get("category"),
+            event_type=request.GET.get("type"),
+            tags=request.GET.getlist("tags"),
+            match_all=request.GET.get("tags_match", "all") != "any",
+        )
 
-        # Apply pagination (Only for this view)
         paginator = self.CustomPaginator()
-        paginated_events = paginator.paginate_queryset(events, request)
+        page_event_ids = paginator.paginate_queryset(ranked_event_ids, request)
+        feed_events = models.FeedEvent.objects.defer("details").in_bulk(page_event_ids)
 
         return Response(
             {
                 "events": [
-                    {"details": EventSerializer(event).details_serializer()}
-                    for event in paginated_events
+                    {"details": details}
+                    for details in get_feed_details(
+                        [feed_events[id] for id in page_event_ids if id in feed_events],
+                        get_event_fields(request),
+                    )
                 ],
-                "total_events": events.count(),
+                "total_events": paginator.page.paginator.count,
                 "page": paginator.page.number,
                 "total_pages": paginator.page.paginator.num_pages,
                 "next_page_link": paginator.get_next_link(),
@@ -390,6 +403,72 @@ class EventsFeedAPI(APIView):
         )
 
 
+class EventTagListAPI(APIView):
+    """API view to fetch the popular tags of upcoming events
+
+    Methods:
+        GET
+    """
+
+    permission_classes = []
+    authentication_classes = []
+
+    def get(self, request):
+        """GET Method to fetch popular tags with their event counts
+
+        Output Serializer:
+            - tag
+            - count
+
+        Possible Outputs:
+            - Errors
+                - None
+            - Successes
+                - tags with event counts
+        """
+
+        return Response({"tags": get_popular_tags()}, status=status.HTTP_200_OK)
+
+
+class EventFacetListAPI(APIView):
+    """API view to fetch the facet counts of the events feed (sidebar filters)
+
+    Methods:
+        GET
+    """
+
+    permission_classes = []
+    authentication_classes = []
+
+    def get(self, request):
+        """GET Method to fetch the category, type and tag counts of the feed
+
+        Query Params:
+            - category, type, tags, tags_match (all / any)
+
+        Output Serializer:
+            - total_events
+            - facets (category / type / tags -> value -> count)
+
+        Possible Outputs:
+            - Errors
+                - None
+            - Successes
+                - facet counts
+        """
+
+        filters = get_facet_filters(request)
+        facet_index = get_facet_index()
+
+        return Response(
+            {
+                "total_events": len(facet_index.filter(filters)),
+                "facets": facet_index.get_facet_counts(filters),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class EventDetailAPI(APIView):
     """API view to fetch event details
 
@@ -403,17 +482,44 @@ class EventDetailAPI(APIView):
     def get(self, request, event_id: int):
         """GET Method to fetch event details
 
+        Query Params:
+            - fields (sparse fieldset, e.g. id,name,organisation.name)
+
+        Headers:
+            - If-None-Match (ETag of the event)
+
         Output Serializer:
             - EventSerializer
 
         Possible Outputs:
             - Errors
                 - Event not found (event_id field)
+                - Invalid field (fields field)
             - Successes
                 - event details
+                - Not modified (304, If-None-Match matches)
         """
 
-        event = models.Event.objects.filter(id=event_id).first()
+        fields = get_event_fields(request)
+        # Versions of the ETag, loaded whatever the sparse fieldset
+        events = models.Event.objects.filter(id=event_id).annotate(
+            event_version=F("updated_at"),
+            organisation_version=F("organisation__updated_at"),
+            creator_name=F("created_by__name"),
+            creator_email=F("created_by__email"),
+        )
+
+        if request.headers.get("If-None-Match"):
+            # Answered from the versions alone, before loading the full row
+            versions = events.values_list(
+                "event_version", "organisation_version", "creator_name", "creator_email"
+            ).first()
+            if versions:
+                etag = get_event_etag(event_id, *versions, fields)
+                if is_not_modified(request, etag):
+                    return not_modified_response(etag)
+
+        event = EventSerializer.narrow_queryset(events, fields).first()
 
         if not event:
             return Response(
@@ -421,8 +527,24 @@ class EventDetailAPI(APIView):
             )
 
         return Response(
-            {"details": EventSerializer(event).details_serializer()},
+            {
+                "details": (
+                    EventSerializer(event).sparse_details_serializer(fields)
+                    if fields
+                    else EventSerializer(event).details_serializer()
+                )
+            },
             status=status.HTTP_200_OK,
+            headers={
+                "ETag": get_event_etag(
+                    event.id,
+                    event.event_version,
+                    event.organisation_version,
+                    event.creator_name,
+                    event.creator_email,
+                    fields,
+                )
+            },
         )
 
 
@@ -434,6 +556,8 @@ class EventInteractionAPI(APIView):
     """
 
     permission_classes = []
+    throttle_classes = [UserTokenBucketThrottle]
+    throttle_scope = "interaction"
 
     def post(self, request):
         """POST Method to interact with events
@@ -449,6 +573,7 @@ class EventInteractionAPI(APIView):
             - Errors
                 - Event not found (event_id field)
                 - Invalid action (action field)
+                - Request was throttled (429, per user)
             - Successes
                 - success message
         """
@@ -644,12 +769,16 @@ class EventListByOrganisation(APIView):
     def get(self, request, organisation_id: int):
         """GET Method to fetch events feed
 
+        Query Params:
+            - fields (sparse fieldset, e.g. id,name,organisation.name)
+
         Output Serializer:
-            - EventSerializer
+            - EventSerializer (streamed in chunks)
 
         Possible Outputs:
             - Errors
                 - Permission Denied (if user not part of org)
+                - Invalid field (fields field)
             - Successes
                 - events feed of organisation
         """
@@ -660,19 +789,34 @@ class EventListByOrganisation(APIView):
                 {"error": "Permission Denied"}, status=status.HTTP_403_FORBIDDEN
             )
 
+        fields = get_event_fields(request)
         events = models.Event.objects.filter(
             start_datetime__gte=timezone.now(), organisation__id=organisation_id
-        ).order_by("start_datetime")
-
-        return Response(
-            {
-                "events": [
+        ).order_by("start_datetime", "pk")
+
+        if not fields:
+            # Full details are read as rows, without hydrating the models
+            return StreamingJSONListResponse(
+                "events",
+                EventSerializer.ROWS.read(events),
+                lambda chunk: [
                     {
                         "details": EventSerializer(event).details_serializer(),
                     }
-                    for event in events
-                ]
-            },
+                    for event in chunk
+                ],
+                status=status.HTTP_200_OK,
+            )
+
+        return StreamingJSONListResponse(
+            "events",
+            EventSerializer.narrow_queryset(events, fields),
+            lambda chunk: [
+                {
+                    "details": details,
+                }
+                for details in EventSerializer.bulk_details_serializer(chunk, fields)
+            ],
             status=status.HTTP_200_OK,
         )
 
@@ -689,35 +833,63 @@ class EventsListByUserAPI(APIView):
     def get(self, request):
         """GET Method to fetch events feed
 
+        Query Params:
+            - fields (sparse fieldset, e.g. id,name,organisation.name)
+
         Output Serializer:
-            - EventSerializer
+            - EventSerializer (streamed in chunks)
 
         Possible Outputs:
             - Errors
                 - Permission Denied (if user not part of org)
+                - Invalid field (fields field)
             - Successes
                 - events feed of organisation
         """
 
-        events = models.Event.objects.filter(
-            start_datetime__gte=timezone.now(), created_by=request.user
-        ).order_by("start_datetime")
+        fields = get_event_fields(request)
+        events = (
+            models.Event.objects.filter(
+                start_datetime__gte=timezone.now(), created_by=request.user
+            )
+            .annotate(
+                total_rsvped=Count("event_attendees"),
+                total_attended=Count(
+                    "event_attendees", filter=Q(event_attendees__is_present=True)
+                ),
+            )
+            .order_by("start_datetime", "pk")
+        )
 
-        return Response(
-            {
-                "events": [
+        if not fields:
+            # Full details are read as rows, without hydrating the models
+            return StreamingJSONListResponse(
+                "events",
+                EVENT_COUNT_ROWS.read(events),
+                lambda chunk: [
                     {
                         "details": EventSerializer(event).details_serializer(),
-                        "total_rsvped": models.EventAttendees.objects.filter(
-                            event=event
-                        ).count(),
-                        "total_attended": models.EventAttendees.objects.filter(
-                            event=event, is_present=True
-                        ).count(),
+                        "total_rsvped": event.total_rsvped,
+                        "total_attended": event.total_attended,
                     }
-                    for event in events
-                ]
-            },
+                    for event in chunk
+                ],
+                status=status.HTTP_200_OK,
+            )
+
+        return StreamingJSONListResponse(
+            "events",
+            EventSerializer.narrow_queryset(events, fields),
+            lambda chunk: [
+                {
+                    "details": details,
+                    "total_rsvped": event.total_rsvped,
+                    "total_attended": event.total_attended,
+                }
+                for event, details in zip(
+                    chunk, EventSerializer.bulk_details_serializer(chunk, fields)
+                )
+            ],
             status=status.HTTP_200_OK,
         )
 
@@ -738,7 +910,7 @@ class EventAttendeeList(APIView):
         """GET Method to fetch event attendees
 
         Output Serializer:
-            - AttendeeSerializer
+            - AttendeeSerializer (streamed in chunks)
 
         Possible Outputs:
             - Errors
@@ -759,18 +931,20 @@ class EventAttendeeList(APIView):
                 {"error": "Event not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
-        attendees = models.EventAttendees.objects.filter(event=event)
-
-        return Response(
-            {
-                "attendees": [
-                    {
-                        "user": UserSerializer(attendee).condensed_details_serializer(),
-                        "is_present": attendee.is_present,
-                    }
-                    for attendee in attendees
-                ]
-            },
+        attendees = models.EventAttendees.objects.filter(event=event).order_by("pk")
+
+        return StreamingJSONListResponse(
+            "attendees",
+            ATTENDEE_ROWS.read(attendees),
+            lambda chunk: [
+                {
+                    "user": UserSerializer(
+                        attendee.attendee
+                    ).condensed_details_serializer(),
+                    "is_present": attendee.is_present,
+                }
+                for attendee in chunk
+            ],
             status=status.HTTP_200_OK,
         )
 
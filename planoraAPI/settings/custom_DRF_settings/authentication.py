@@ -1,18 +1,73 @@
-from django.contrib.auth.models import User
 from rest_framework import authentication, exceptions
 
-from users.models import UserAuthTokens
+from users.models import CustomUser, UserAuthTokens
+from users.tokens import (
+    get_user_key,
+    hash_token,
+    is_signed_token,
+    read_signed_token,
+    revocation_list,
+    token_cache,
+    token_usage,
+)
 
 
 class TokenAuthentication(authentication.BaseAuthentication):
+    """
+    Authenticates the ``Authorization`` header against UserAuthTokens, looked
+    up by the SHA-256 digest of the token, or as a signed token (see
+    users.tokens.issue_signed_token), verified without touching UserAuthTokens.
+
+    Token -> user lookups are served from the per-process token cache
+    (users.tokens) and fall back to a single joined query on a miss; only
+    active users are cached, so deactivating a user (which drops its entries)
+    rejects its tokens. Token use is recorded in ``last_used_at`` write-behind
+    (see users.tokens.TokenUsageTracker).
+    """
+
     def authenticate(self, request):
         auth_token = request.META.get("HTTP_AUTHORIZATION")
         if not auth_token:
             return None
 
-        try:
-            user_auth_token = UserAuthTokens.objects.get(auth_token=auth_token)
-        except User.DoesNotExist:
-            raise exceptions.AuthenticationFailed("No such user")
+        if is_signed_token(auth_token):
+            return (self.authenticate_signed_token(auth_token), None)
+
+        digest = hash_token(auth_token)
+        cached = token_cache.get(digest)
+        if cached is None:
+            try:
+                user_auth_token = UserAuthTokens.objects.select_related("user").get(
+                    auth_token_digest=digest
+                )
+            except UserAuthTokens.DoesNotExist:
+                raise exceptions.AuthenticationFailed("No such user")
+            token_id, user = user_auth_token.pk, user_auth_token.user
+            if not user.is_active:
+                raise exceptions.AuthenticationFailed("User inactive")
+            token_cache.set(digest, token_id, user)
+        else:
+            token_id, user = cached
+
+        token_usage.record(token_id)
+        return (user, None)
+
+    def authenticate_signed_token(self, auth_token: str) -> CustomUser:
+        """
+        Verifies a signed token; its user is served from the token cache, and
+        loaded by id (without UserAuthTokens) on a miss.
+        """
+        payload = read_signed_token(auth_token)
+        if payload is None or revocation_list.is_revoked(payload["jti"]):
+            raise exceptions.AuthenticationFailed("Invalid or expired token")
+
+        key = get_user_key(payload["uid"])
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached[1]
 
-        return (user_auth_token.user, None)
+        user = CustomUser.objects.filter(pk=payload["uid"], is_active=True).first()
+        if user is None:
+            raise exceptions.AuthenticationFailed("User inactive")
+        token_cache.set(key, None, user)
+        return user
@@ -1,17 +1,30 @@
+import codecs
 from typing import Any, Mapping, Optional, Type
 
 import ujson
 from django.conf import settings
-from rest_framework.exceptions import ParseError
+from rest_framework import status
+from rest_framework.exceptions import APIException, ParseError
 from rest_framework.parsers import BaseParser
 from rest_framework.renderers import BaseRenderer, JSONRenderer
 
-__all__ = ["UJSONParser"]
+__all__ = ["RequestEntityTooLarge", "UJSONParser"]
+
+
+class RequestEntityTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Request body too large."
+    default_code = "request_entity_too_large"
 
 
 class UJSONParser(BaseParser):
     """
     Parses JSON-serialized data by ujson parser.
+
+    Bodies are capped at ``JSON_MAX_BODY_SIZE`` bytes (or the ``max_body_size``
+    attribute of the view): a larger ``Content-Length`` is rejected before the
+    body is read, and a body without one is never read past the cap. Documents
+    nested deeper than ``JSON_MAX_DEPTH`` are rejected.
     """
 
     media_type: str = "application/json"
@@ -28,9 +41,55 @@ class UJSONParser(BaseParser):
         """
         parser_context = parser_context or {}
         encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        max_body_size = self.get_max_body_size(parser_context)
+
+        request = parser_context.get("request")
+        try:
+            content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except (AttributeError, ValueError):
+            content_length = 0
+        if content_length > max_body_size:
+            raise RequestEntityTooLarge()
+
+        data = stream.read(max_body_size + 1)
+        if len(data) > max_body_size:
+            raise RequestEntityTooLarge()
 
         try:
-            data = stream.read().decode(encoding)
-            return ujson.loads(data)
+            # ujson reads UTF-8 bytes directly, without a decoded copy
+            if codecs.lookup(encoding).name != "utf-8":
+                data = data.decode(encoding)
+            parsed = ujson.loads(data)
+        except LookupError:
+            raise ParseError("Unsupported charset - %s" % encoding)
         except ValueError as exc:
             raise ParseError("JSON parse error - %s" % str(exc))
+
+        self.check_depth(parsed, settings.JSON_MAX_DEPTH)
+        return parsed
+
+    @staticmethod
+    def get_max_body_size(parser_context: Mapping[str, Any]) -> int:
+        view = parser_context.get("view")
+        return getattr(view, "max_body_size", None) or settings.JSON_MAX_BODY_SIZE
+
+    @staticmethod
+    def check_depth(data, max_depth: int):
+        """
+        Rejects documents whose arrays / objects nest deeper than max_depth.
+        """
+        stack = [(data, 1)]
+        while stack:
+            value, depth = stack.pop()
+            if isinstance(value, dict):
+                value = value.values()
+            elif not isinstance(value, list):
+                continue
+
+            if depth > max_depth:
+                raise ParseError(
+                    "JSON parse error - nesting deeper than %d levels" % max_depth
+                )
+            stack.extend(
+                (item, depth + 1) for item in value if isinstance(item, (dict, list))
+            )
@@ -1,9 +1,86 @@
+import datetime
 from typing import Any, Mapping, Optional, Union
 
 import ujson
 from rest_framework.renderers import JSONRenderer
 
-__all__ = ["UJSONRenderer"]
+__all__ = ["ColumnarJSONRenderer", "JSONFragment", "UJSONRenderer"]
+
+
+class JSONFragment:
+    """
+    Already encoded JSON (e.g. a cached serialized object).
+    UJSONRenderer splices it into the output as is, without decoding and
+    re-encoding it.
+    """
+
+    __slots__ = ("content",)
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def __json__(self) -> bytes:
+        return self.content
+
+
+def encode_datetime(value: datetime.datetime) -> str:
+    # Same representation as rest_framework's JSONEncoder (ECMA 262)
+    representation = value.isoformat()
+    if representation.endswith("+00:00"):
+        return representation[:-6] + "Z"
+    return representation
+
+
+# Encoders of the values serializers return most, dispatched on the exact type
+NATIVE_ENCODERS = {
+    datetime.datetime: encode_datetime,
+    datetime.date: datetime.date.isoformat,
+}
+
+
+# Types prepare_native converts or looks into
+PREPARED_TYPES = {dict, list, *NATIVE_ENCODERS}
+
+
+def prepare_native(value):
+    """
+    Convert the datetimes / dates of a payload to strings ahead of ujson, so
+    that it never takes its (slow) ``default`` path for them.
+
+    The keys to look into are sampled from the first row of a list of dicts,
+    which keeps payloads without such values (and lists of strings or
+    fragments) untouched. Anything missed is still handled by ``default``.
+    (ujson encodes Decimal natively, as a number.)
+    """
+    value_type = type(value)
+    if value_type in NATIVE_ENCODERS:
+        return NATIVE_ENCODERS[value_type](value)
+
+    if value_type is dict:
+        keys = [key for key, item in value.items() if type(item) in PREPARED_TYPES]
+        return prepare_row(value, keys) if keys else value
+
+    if value_type is list and value:
+        first = value[0]
+        if type(first) is dict:
+            keys = [key for key, item in first.items() if type(item) in PREPARED_TYPES]
+            if not keys:
+                return value
+            return [
+                prepare_row(row, keys) if type(row) is dict else row for row in value
+            ]
+        if type(first) in PREPARED_TYPES:
+            return [prepare_native(item) for item in value]
+
+    return value
+
+
+def prepare_row(row: dict, keys: list) -> dict:
+    row = row.copy()
+    for key in keys:
+        if key in row:
+            row[key] = prepare_native(row[key])
+    return row
 
 
 class UJSONRenderer(JSONRenderer):
@@ -11,6 +88,7 @@ class UJSONRenderer(JSONRenderer):
     Renderer which serializes to JSON.
     Applies JSON's backslash-u character escaping for non-ascii characters.
     Uses the blazing-fast ujson library for serialization.
+    JSONFragment values are spliced into the output verbatim.
     """
 
     # Controls whether forward slashes (/) are escaped.
@@ -34,16 +112,84 @@ class UJSONRenderer(JSONRenderer):
         encoder = self.encoder_class()
 
         ret = ujson.dumps(
-            data,
+            prepare_native(data),
             ensure_ascii=self.ensure_ascii,
             escape_forward_slashes=self.escape_forward_slashes,
             encode_html_chars=self.encode_html_chars,
             indent=indent or 0,
-            default=encoder.default,  # type: ignore
+            default=encoder.default,
         )
 
-        # force return value to unicode
-        if isinstance(ret, str):
+        # Only non-ascii output can hold U+2028 / U+2029 unescaped; the (rare)
+        # replaces are skipped unless one of them is actually present
+        if not self.ensure_ascii and ("\u2028" in ret or "\u2029" in ret):
             ret = ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
-            return bytes(ret.encode("utf-8"))
-        return ret
+        return ret.encode("utf-8")
+
+
+class ColumnarJSONRenderer(UJSONRenderer):
+    """
+    Renderer which serializes lists of rows to compact columnar JSON.
+    Selected with ``?format=columnar`` or the media type below.
+
+    Each list of row dicts in the response (e.g. ``events``) becomes one array
+    per key, with the ``details`` of a row merged into its columns. Nested
+    organisation / creator objects are moved to shared tables keyed by id
+    (``organisations`` / ``users``) and referenced by their id.
+    """
+
+    media_type: str = "application/vnd.planora.columnar+json"
+    format: str = "columnar"
+    # Nested objects moved to shared tables: column -> table
+    reference_tables: dict = {"organisation": "organisations", "created_by": "users"}
+
+    def render(
+        self,
+        data: Union[dict, None],
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[Mapping[str, Any]] = None,
+    ) -> bytes:
+        if isinstance(data, dict):
+            data = self.get_columnar_data(data)
+        return super().render(data, accepted_media_type, renderer_context)
+
+    def get_columnar_data(self, data: dict) -> dict:
+        tables = {}
+        columnar = {}
+        for key, value in data.items():
+            if isinstance(value, list) and all(isinstance(row, dict) for row in value):
+                columnar[key] = self.get_columns(value, tables)
+            else:
+                columnar[key] = value
+        columnar.update(tables)
+        return columnar
+
+    def get_columns(self, rows: list, tables: dict) -> dict:
+        rows = [self.get_row(row) for row in rows]
+        keys = dict.fromkeys(key for row in rows for key in row)
+        columns = {key: [row.get(key) for row in rows] for key in keys}
+
+        for key, table in self.reference_tables.items():
+            if key not in columns:
+                continue
+            references = []
+            for value in columns[key]:
+                if isinstance(value, dict) and "id" in value:
+                    tables.setdefault(table, {})[str(value["id"])] = value
+                    value = value["id"]
+                references.append(value)
+            columns[key] = references
+
+        return columns
+
+    @staticmethod
+    def get_row(row: dict) -> dict:
+        details = row.get("details")
+        if isinstance(details, JSONFragment):
+            details = ujson.loads(details.content)
+        if not isinstance(details, dict):
+            return row
+        return {
+            **details,
+            **{key: value for key, value in row.items() if key != "details"},
+        }
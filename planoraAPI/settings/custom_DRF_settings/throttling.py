@@ -0,0 +1,92 @@
+import threading
+from collections import Counter
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from utils.ratelimit import get_rate_limit_backend, parse_rate
+
+__all__ = [
+    "EmailTokenBucketThrottle",
+    "IPTokenBucketThrottle",
+    "UserTokenBucketThrottle",
+    "get_rate_limit_stats",
+]
+
+counters = Counter()
+counters_lock = threading.Lock()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token-bucket throttle of the view's ``throttle_scope``, keyed by a client
+    identity (``key``). The rate of each scope and key is configured in
+    ``RATE_LIMITS`` (e.g. ``{"login": {"ip": "20/min"}}``); the buckets live in
+    the ``RATE_LIMIT_BACKEND`` (utils.ratelimit).
+    """
+
+    key = None
+
+    def get_client_key(self, request):
+        """Identity of the client the bucket belongs to (None: not throttled)"""
+
+        raise NotImplementedError
+
+    def allow_request(self, request, view) -> bool:
+        scope = getattr(view, "throttle_scope", None)
+        rate = settings.RATE_LIMITS.get(scope, {}).get(self.key)
+        if not rate:
+            return True
+
+        client_key = self.get_client_key(request)
+        if client_key is None:
+            return True
+
+        capacity, period = parse_rate(rate)
+        self.retry_after = get_rate_limit_backend().consume(
+            f"{scope}:{self.key}:{client_key}", capacity, period
+        )
+
+        allowed = not self.retry_after
+        with counters_lock:
+            counters[(f"{scope}:{self.key}", "allowed" if allowed else "rejected")] += 1
+        return allowed
+
+    def wait(self) -> float:
+        return self.retry_after
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    key = "ip"
+
+    def get_client_key(self, request):
+        return self.get_ident(request)
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    key = "user"
+
+    def get_client_key(self, request):
+        return request.user.pk if request.user.is_authenticated else None
+
+
+class EmailTokenBucketThrottle(TokenBucketThrottle):
+    key = "email"
+
+    def get_client_key(self, request):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        if not email and request.user.is_authenticated:
+            email = request.user.email
+        return str(email).strip().lower() if email else None
+
+
+def get_rate_limit_stats() -> dict:
+    """Returns the allowed / rejected counters of each throttle (of this process)"""
+
+    with counters_lock:
+        items = list(counters.items())
+
+    stats = {}
+    for (throttle, outcome), count in items:
+        stats.setdefault(throttle, {"allowed": 0, "rejected": 0})[outcome] = count
+    return stats
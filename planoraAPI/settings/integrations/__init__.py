@@ -1,2 +1,4 @@
+from .auth import *
+from .cache import *
 from .drf import *
 from .email import *
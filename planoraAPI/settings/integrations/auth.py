@@ -0,0 +1,33 @@
+from planoraAPI.settings import env
+
+# Per-process cache of auth token -> user of TokenAuthentication (users.tokens)
+AUTH_TOKEN_CACHE_SIZE = env.int("AUTH_TOKEN_CACHE_SIZE", default=10000)  # 0: off
+AUTH_TOKEN_CACHE_TTL = env.int("AUTH_TOKEN_CACHE_TTL", default=60)  # seconds
+
+# Write-behind flush interval of UserAuthTokens.last_used_at (users.tokens)
+AUTH_TOKEN_USAGE_FLUSH_INTERVAL = env.int(
+    "AUTH_TOKEN_USAGE_FLUSH_INTERVAL", default=60
+)  # seconds
+
+# Opaque tokens kept per user: each login drops the least recently used ones
+AUTH_TOKENS_PER_USER = env.int("AUTH_TOKENS_PER_USER", default=10)  # 0: no cap
+# Idle days after which clear_expired_tokens deletes an opaque token
+AUTH_TOKEN_IDLE_DAYS = env.int("AUTH_TOKEN_IDLE_DAYS", default=90)
+
+# Stateless HMAC-signed auth tokens issued by authorize_user (users.tokens)
+AUTH_SIGNED_TOKENS = env.bool("AUTH_SIGNED_TOKENS", default=False)
+AUTH_SIGNED_TOKEN_TTL = env.int(
+    "AUTH_SIGNED_TOKEN_TTL", default=7 * 24 * 60 * 60
+)  # seconds
+# Interval at which each process reloads the revoked signed tokens
+AUTH_REVOCATION_REFRESH_INTERVAL = env.int(
+    "AUTH_REVOCATION_REFRESH_INTERVAL", default=30
+)  # seconds
+
+# Process pool hashing the passwords of logins and registrations (users.hashing),
+# per server process: keep workers x server processes within the CPU count
+PASSWORD_HASHING_WORKERS = env.int(
+    "PASSWORD_HASHING_WORKERS", default=2
+)  # 0: hash in the request thread
+PASSWORD_HASHING_QUEUE = env.int("PASSWORD_HASHING_QUEUE", default=16)
+PASSWORD_HASHING_TIMEOUT = env.int("PASSWORD_HASHING_TIMEOUT", default=10)  # seconds
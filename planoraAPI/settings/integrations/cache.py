@@ -0,0 +1,60 @@
+from planoraAPI.settings import env
+
+# Caches only visible to the process that filled them
+LOCAL_CACHE_BACKENDS = [
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+]
+
+# Shared cache (e.g. redis://...); local memory only suits a single process and
+# is reported by `manage.py check --deploy` (see events.checks)
+DEFAULT_CACHE = env.cache_url("CACHE_URL", default="locmemcache://")
+
+
+def get_cache_config(name: str, max_entries: int) -> dict:
+    """
+    Config of a cache alias: ``<NAME>_CACHE_URL`` if set, else the default
+    cache under its own key prefix, so its entries never evict the feed pages
+    and version of the default cache.
+
+    Args:
+        name (str): Cache alias.
+        max_entries (int): Entries kept by a local-memory cache before culling.
+
+    Returns:
+        dict: Cache config (for CACHES).
+    """
+    url = env.str(f"{name.upper()}_CACHE_URL", default="")
+    config = env.cache_url_config(url) if url else {**DEFAULT_CACHE}
+    config.setdefault("KEY_PREFIX", name)
+
+    if config["BACKEND"] in LOCAL_CACHE_BACKENDS:
+        config["LOCATION"] = name
+        config["OPTIONS"] = {**config.get("OPTIONS", {}), "MAX_ENTRIES": max_entries}
+    return config
+
+
+CACHES = {
+    "default": DEFAULT_CACHE,
+    # Encoded event JSON fragments (events.fragments)
+    "fragments": get_cache_config(
+        "fragments", env.int("FRAGMENT_CACHE_MAX_ENTRIES", default=10000)
+    ),
+    # Token buckets of the rate limits (utils.ratelimit.CacheBackend)
+    "ratelimit": get_cache_config(
+        "ratelimit", env.int("RATELIMIT_CACHE_MAX_ENTRIES", default=100000)
+    ),
+    # Affinity vectors of the personalised feed (events.ranking)
+    "affinity": get_cache_config(
+        "affinity", env.int("AFFINITY_CACHE_MAX_ENTRIES", default=10000)
+    ),
+}
+
+# Public feed response cache
+FEED_CACHE_TTL = env.int("FEED_CACHE_TTL", default=60)  # seconds
+
+# In-memory facet index of the feed (see events.facets)
+FACET_INDEX_CHECK_INTERVAL = env.int("FACET_INDEX_CHECK_INTERVAL", default=300)
+
+# Encoded event JSON fragments spliced into feed responses (see events.fragments)
+EVENT_FRAGMENT_TTL = env.int("EVENT_FRAGMENT_TTL", default=24 * 60 * 60)  # seconds
@@ -1,3 +1,5 @@
+from planoraAPI.settings import env
+
 REST_FRAMEWORK = {
     # * Custom UJSON parser and renderer classes
     "DEFAULT_RENDERER_CLASSES": [
@@ -10,4 +12,22 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "planoraAPI.settings.custom_DRF_settings.authentication.TokenAuthentication",
     ],
+    # * Reverse proxies in front of the app; client IPs of the throttles are
+    # read from X-Forwarded-For behind them, else from REMOTE_ADDR
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=0),
+}
+
+# Request body limits of UJSONParser (views can set their own max_body_size)
+JSON_MAX_BODY_SIZE = env.int("JSON_MAX_BODY_SIZE", default=1024 * 1024)  # bytes
+JSON_MAX_DEPTH = env.int("JSON_MAX_DEPTH", default=32)
+
+# Token-bucket rate limits (custom_DRF_settings.throttling), per view
+# throttle_scope and client key: "<bucket capacity>/<refill period>"
+RATE_LIMIT_BACKEND = env.str(
+    "RATE_LIMIT_BACKEND", default="utils.ratelimit.CacheBackend"
+)  # or utils.ratelimit.LocalBackend (per process)
+RATE_LIMITS = {
+    "login": {"ip": "30/min", "email": "10/min"},
+    "otp": {"ip": "10/hour", "email": "5/hour"},
+    "interaction": {"user": "60/min"},
 }
@@ -126,7 +126,6 @@ class CustomUserAdmin(AuthUserAdmin):
 class UserAuthTokensAdmin(admin.ModelAdmin):
     list_display = (
         "user",
-        "auth_token",
         "device_token",
         "type",
         "created_at",
@@ -152,6 +151,17 @@ class UserAuthTokensAdmin(admin.ModelAdmin):
     autocomplete_fields = ("user",)
 
 
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = (
+        "token_id",
+        "expires_at",
+    )
+    search_fields = ("token_id",)
+    ordering = ("expires_at",)
+    list_per_page = 20
+    list_max_show_all = 1000
+
+
 class UserPermissionsAdmin(admin.ModelAdmin):
     list_display = (
         "user",
@@ -260,6 +270,7 @@ admin.site.register(models.UserVerificationOTP, UserVerificationOTPAdmin)
 # admin.site.register(models.UserAccessRequests, UserAccessRequestsAdmin)
 admin.site.register(models.CustomUser, CustomUserAdmin)
 admin.site.register(models.UserAuthTokens, UserAuthTokensAdmin)
+admin.site.register(models.RevokedToken, RevokedTokenAdmin)
 admin.site.register(models.Organisation, OrganisationAdmin)
 admin.site.register(models.OrganisationCommittee, OrganisationCommitteeAdmin)
 # admin.site.register(models.UserPermissions, UserPermissionsAdmin)
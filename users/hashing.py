@@ -0,0 +1,155 @@
+import threading
+from concurrent import futures
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PasswordHashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many logins in progress, try again shortly."
+    default_code = "password_hashing_unavailable"
+    # Sent as Retry-After by the DRF exception handler
+    wait = 1
+
+
+def verify_password(password: str, encoded: str) -> tuple:
+    """
+    Check a password against its hash (runs in the pool workers).
+
+    Args:
+        password (str): Raw password.
+        encoded (str): Stored hash.
+
+    Returns:
+        tuple: Whether it matches, and the re-hashed password when the stored
+        hash must be upgraded (e.g. more iterations), else None.
+    """
+    upgraded = []
+    valid = check_password(password, encoded, setter=lambda raw: upgraded.append(1))
+    return valid, make_password(password) if upgraded else None
+
+
+class PasswordHashingPool:
+    """
+    Bounded process pool running the password hashers off the request threads.
+
+    PBKDF2 holds the GIL, so hashing in the request threads pins every worker
+    thread of the process during login storms. Here at most
+    ``PASSWORD_HASHING_WORKERS`` hashes run at a time, in other processes, and
+    at most ``PASSWORD_HASHING_QUEUE`` more wait for them; any further request
+    fails fast with a 503 instead of queueing behind them. A hash holds its slot
+    until it is done, even if its request gave up waiting for it.
+    """
+
+    def __init__(self, workers: int, queue: int, timeout: int):
+        """
+        Args:
+            workers (int): Worker processes; 0 hashes in the calling thread.
+            queue (int): Hashes allowed to wait for a worker.
+            timeout (int): Seconds to wait for a result before giving up.
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(workers + queue)
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=django.setup
+                )
+            return self.executor
+
+    def discard_executor(self, executor: ProcessPoolExecutor):
+        """Drops a broken executor (e.g. a worker was killed), so that the next
+        hash starts a new one"""
+
+        with self.lock:
+            if self.executor is executor:
+                self.executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, function, *args):
+        """
+        Run a hashing function in the pool.
+
+        Args:
+            function (callable): Module-level function (picklable).
+            args: Its arguments.
+
+        Returns:
+            Result of the function.
+
+        Raises:
+            PasswordHashingUnavailable: The pool and its queue are full, the
+                result did not come in time, or the pool broke.
+        """
+        if not self.workers:
+            return function(*args)
+
+        if not self.slots.acquire(blocking=False):
+            raise PasswordHashingUnavailable()
+
+        executor = self.get_executor()
+        try:
+            future = executor.submit(function, *args)
+        except BrokenProcessPool:
+            self.slots.release()
+            self.discard_executor(executor)
+            raise PasswordHashingUnavailable()
+        # Released once the worker is done with it, not when the request gives up
+        future.add_done_callback(lambda future: self.slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except futures.TimeoutError:
+            future.cancel()
+            raise PasswordHashingUnavailable()
+        except BrokenProcessPool:
+            self.discard_executor(executor)
+            raise PasswordHashingUnavailable()
+
+    def check_password(self, user, password: str) -> bool:
+        """
+        Check the password of a user, upgrading its stored hash if needed
+        (like ``AbstractBaseUser.check_password``).
+
+        Args:
+            user (CustomUser): User.
+            password (str): Raw password.
+
+        Returns:
+            bool: Whether the password is correct.
+        """
+        valid, upgraded = self.run(verify_password, password, user.password)
+        if upgraded:
+            user.password = upgraded
+            user.save(update_fields=["password"])
+        return valid
+
+    def make_password(self, password: str) -> str:
+        """
+        Hash a password for storage.
+
+        Args:
+            password (str): Raw password.
+
+        Returns:
+            str: Encoded hash (for ``user.password``).
+        """
+        return self.run(make_password, password)
+
+
+password_hashing = PasswordHashingPool(
+    settings.PASSWORD_HASHING_WORKERS,
+    settings.PASSWORD_HASHING_QUEUE,
+    settings.PASSWORD_HASHING_TIMEOUT,
+)
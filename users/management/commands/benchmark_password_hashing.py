@@ -0,0 +1,77 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+
+from users.hashing import (
+    PasswordHashingPool,
+    PasswordHashingUnavailable,
+    verify_password,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks login password checks per second: inline in the request "
+        "threads against the password hashing process pool (users.hashing)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--duration", type=float, default=10)
+
+    def run(self, threads, duration, check):
+        """Logins/sec of ``threads`` request threads checking passwords"""
+
+        deadline = time.perf_counter() + duration
+
+        def login_loop():
+            logins = rejected = 0
+            while time.perf_counter() < deadline:
+                try:
+                    check()
+                    logins += 1
+                except PasswordHashingUnavailable:
+                    rejected += 1
+                    # Rejected clients retry later (and leave the CPU to hashing)
+                    time.sleep(0.05)
+            return logins, rejected
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            results = list(executor.map(lambda _: login_loop(), range(threads)))
+        elapsed = time.perf_counter() - started
+        return (
+            sum(logins for logins, _ in results) / elapsed,
+            sum(rejected for _, rejected in results),
+        )
+
+    def handle(self, *args, **options):
+        encoded = make_password("benchmark password")
+        workers, threads = options["workers"], options["threads"]
+
+        inline, _ = self.run(
+            threads,
+            options["duration"],
+            lambda: verify_password("benchmark password", encoded),
+        )
+        self.stdout.write(
+            f"inline ({threads} threads):       {inline:8.2f} logins/sec "
+            f"(one core, GIL-bound)"
+        )
+
+        pool = PasswordHashingPool(workers, queue=workers * 2, timeout=30)
+        pool.run(verify_password, "warm up", encoded)
+        pooled, rejected = self.run(
+            threads,
+            options["duration"],
+            lambda: pool.run(verify_password, "benchmark password", encoded),
+        )
+        pool.executor.shutdown()
+        self.stdout.write(
+            f"pool ({workers} workers):          {pooled:8.2f} logins/sec "
+            f"({pooled / workers:.2f} per core, {rejected} fast 503s)"
+        )
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.tokens import delete_expired_revocations, delete_idle_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the auth tokens left unused for AUTH_TOKEN_IDLE_DAYS and the "
+        "revocations of expired signed tokens (run daily)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--idle-days", type=int, default=settings.AUTH_TOKEN_IDLE_DAYS
+        )
+
+    def handle(self, *args, **options):
+        removed = delete_idle_tokens(options["idle_days"])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} idle auth tokens"))
+        removed = delete_expired_revocations()
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} expired revocations"))
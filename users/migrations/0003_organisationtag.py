@@ -0,0 +1,72 @@
+# Generated by Django 5.1.7 on 2026-10-17 23:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_organisation_tags(apps, schema_editor):
+    Organisation = apps.get_model("users", "Organisation")
+    OrganisationTag = apps.get_model("users", "OrganisationTag")
+
+    organisation_tags = []
+    for organisation_id, tags in Organisation.objects.values_list(
+        "id", "tags"
+    ).iterator():
+        if not isinstance(tags, list):
+            continue
+        normalized = (str(tag).strip()[:100] for tag in tags)
+        organisation_tags += [
+            OrganisationTag(organisation_id=organisation_id, tag=tag)
+            for tag in dict.fromkeys(tag for tag in normalized if tag)
+        ]
+
+    OrganisationTag.objects.bulk_create(organisation_tags, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0002_organisationcommittee_is_founder_userpreference"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrganisationTag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "tag",
+                    models.CharField(
+                        help_text="Tag", max_length=100, verbose_name="tag"
+                    ),
+                ),
+                (
+                    "organisation",
+                    models.ForeignKey(
+                        help_text="Organisation",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="organisation_tags",
+                        to="users.organisation",
+                        verbose_name="organisation",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "organisation tag",
+                "verbose_name_plural": "organisation tags",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("tag", "organisation"), name="unique_organisation_tag"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_organisation_tags, migrations.RunPython.noop),
+    ]
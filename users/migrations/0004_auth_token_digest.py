@@ -0,0 +1,56 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:20
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_auth_token_digests(apps, schema_editor):
+    UserAuthTokens = apps.get_model("users", "UserAuthTokens")
+
+    batch = []
+    for user_auth_token in UserAuthTokens.objects.only("id", "auth_token").iterator():
+        user_auth_token.auth_token_digest = hashlib.sha256(
+            user_auth_token.auth_token.encode("utf-8")
+        ).hexdigest()
+        batch.append(user_auth_token)
+        if len(batch) >= 1000:
+            UserAuthTokens.objects.bulk_update(batch, ["auth_token_digest"])
+            batch = []
+
+    UserAuthTokens.objects.bulk_update(batch, ["auth_token_digest"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0003_organisationtag"),
+    ]
+
+    # Irreversible: the plaintext tokens are dropped once their digests are stored
+    operations = [
+        migrations.AddField(
+            model_name="userauthtokens",
+            name="auth_token_digest",
+            field=models.CharField(
+                help_text="SHA-256 Digest of the Auth Token",
+                max_length=64,
+                null=True,
+                verbose_name="auth token digest",
+            ),
+        ),
+        migrations.RunPython(backfill_auth_token_digests),
+        migrations.RemoveField(
+            model_name="userauthtokens",
+            name="auth_token",
+        ),
+        migrations.AlterField(
+            model_name="userauthtokens",
+            name="auth_token_digest",
+            field=models.CharField(
+                help_text="SHA-256 Digest of the Auth Token",
+                max_length=64,
+                unique=True,
+                verbose_name="auth token digest",
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.7 on 2026-10-18 00:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0004_auth_token_digest"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RevokedToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "token_id",
+                    models.CharField(
+                        help_text="Token ID (jti)",
+                        max_length=64,
+                        unique=True,
+                        verbose_name="token id",
+                    ),
+                ),
+                (
+                    "expires_at",
+                    models.DateTimeField(
+                        db_index=True, help_text="Expires At", verbose_name="expires at"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "revoked token",
+                "verbose_name_plural": "revoked tokens",
+            },
+        ),
+    ]
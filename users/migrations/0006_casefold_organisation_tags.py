@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-18 10:20
+
+from django.db import migrations
+
+
+def casefold_organisation_tags(apps, schema_editor):
+    Organisation = apps.get_model("users", "Organisation")
+    OrganisationTag = apps.get_model("users", "OrganisationTag")
+
+    OrganisationTag.objects.all().delete()
+
+    organisation_tags = []
+    for organisation_id, tags in Organisation.objects.values_list(
+        "id", "tags"
+    ).iterator():
+        if not isinstance(tags, list):
+            continue
+        normalized = (str(tag).strip().casefold()[:100] for tag in tags)
+        organisation_tags += [
+            OrganisationTag(organisation_id=organisation_id, tag=tag)
+            for tag in dict.fromkeys(tag for tag in normalized if tag)
+        ]
+
+        if len(organisation_tags) >= 1000:
+            OrganisationTag.objects.bulk_create(organisation_tags)
+            organisation_tags = []
+
+    OrganisationTag.objects.bulk_create(organisation_tags)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0005_revokedtoken"),
+    ]
+
+    operations = [
+        migrations.RunPython(casefold_organisation_tags, migrations.RunPython.noop),
+    ]
@@ -132,8 +132,12 @@ class UserAuthTokens(models.Model):
         related_query_name="auth_tokens",
     )
 
-    auth_token = models.CharField(
-        _("auth token"), help_text="Auth Token", max_length=255, unique=True, default=""
+    # Hex SHA-256 digest of the auth token (the token itself is never stored)
+    auth_token_digest = models.CharField(
+        _("auth token digest"),
+        help_text="SHA-256 Digest of the Auth Token",
+        max_length=64,
+        unique=True,
     )
     device_token = models.CharField(
         _("device token"),
@@ -163,6 +167,27 @@ class UserAuthTokens(models.Model):
         verbose_name_plural = "user auth tokens"
 
 
+class RevokedToken(models.Model):
+    """This model stores the revoked signed auth tokens until they expire
+    Returns:
+        class: details of revoked signed auth tokens
+    """
+
+    token_id = models.CharField(
+        _("token id"), help_text="Token ID (jti)", max_length=64, unique=True
+    )
+    expires_at = models.DateTimeField(
+        _("expires at"), help_text="Expires At", db_index=True
+    )
+
+    def __str__(self):
+        return self.token_id
+
+    class Meta:
+        verbose_name = "revoked token"
+        verbose_name_plural = "revoked tokens"
+
+
 class UserVerificationOTP(models.Model):
     """This model stores user's verification OTP
     Returns:
@@ -252,6 +277,37 @@ class Organisation(models.Model):
         verbose_name_plural = "organisations"
 
 
+class OrganisationTag(models.Model):
+    """This model stores the tags of organisations (normalized from Organisation.tags)
+    Returns:
+        class: details of organisation tags
+    """
+
+    organisation = models.ForeignKey(
+        "users.Organisation",
+        on_delete=models.CASCADE,
+        verbose_name="organisation",
+        help_text="Organisation",
+        related_name="organisation_tags",
+    )
+    tag = models.CharField(_("tag"), help_text="Tag", max_length=100)
+
+    def __str__(self):
+        return f"{self.organisation.name} - {self.tag}"
+
+    class Meta:
+        """Stores Meta data of the model class"""
+
+        verbose_name = "organisation tag"
+        verbose_name_plural = "organisation tags"
+        constraints = [
+            # Leading on tag so that it also serves tag lookups
+            models.UniqueConstraint(
+                fields=["tag", "organisation"], name="unique_organisation_tag"
+            )
+        ]
+
+
 class OrganisationCommittee(models.Model):
     """This model stores the details of organisation committee
     Returns:
@@ -1,4 +1,5 @@
 from utils.datetime import serialize_datetime
+from utils.rows import RowReader
 
 from . import models
 
@@ -6,6 +7,11 @@ from . import models
 class UserSerializer:
     """This serializer class contains serialization methods for User Model"""
 
+    # Keys of condensed_details_serializer, usable in sparse fieldsets (?fields=)
+    CONDENSED_FIELDS = ["id", "email", "name"]
+    # Rows serializable by condensed_details_serializer (see utils.rows)
+    CONDENSED_ROWS = RowReader("UserRow", CONDENSED_FIELDS)
+
     def __init__(self, obj: models.CustomUser):
         self.obj = obj
 
@@ -48,6 +54,11 @@ class UserSerializer:
 class OrganisationSerializer:
     """This serializer class contains serialization methods for Organisation Model"""
 
+    # Rows serializable by condensed_details_serializer (see utils.rows)
+    CONDENSED_ROWS = RowReader(
+        "OrganisationRow", ["id", "name", "description", "location"]
+    )
+
     def __init__(self, obj: models.Organisation):
         self.obj = obj
 
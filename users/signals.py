@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import CustomUser, Organisation, UserAuthTokens
+from .tokens import token_cache
+from .utils import sync_organisation_tags
+
+
+@receiver(post_delete, sender=UserAuthTokens)
+def invalidate_revoked_token(sender, instance, **kwargs):
+    """Stops serving a revoked (deleted) token from the token cache"""
+
+    token_cache.invalidate(keys=[instance.auth_token_digest])
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    """Drops the cached snapshots of an edited (e.g. deactivated) user"""
+
+    if not created:
+        token_cache.invalidate(user_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Organisation)
+def refresh_organisation_tags(sender, instance, **kwargs):
+    """Keeps the tag index (OrganisationTag rows) of a created or edited
+    organisation current"""
+
+    sync_organisation_tags(instance)
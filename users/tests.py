@@ -1,3 +1,479 @@
-from django.test import TestCase
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.exceptions import AuthenticationFailed
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from planoraAPI.settings.custom_DRF_settings.authentication import (
+    TokenAuthentication,
+)
+from planoraAPI.settings.custom_DRF_settings.throttling import get_rate_limit_stats
+from users.hashing import PasswordHashingPool, PasswordHashingUnavailable
+from users.models import (
+    CustomUser,
+    Organisation,
+    OrganisationCommittee,
+    RevokedToken,
+    UserAuthTokens,
+)
+from users.tokens import (
+    RevocationList,
+    TokenCache,
+    TokenUsageTracker,
+    hash_token,
+    token_cache,
+)
+from users.utils import authorize_user, revoke_tokens
+from utils.ratelimit import CacheBackend, LocalBackend, take_token
+
+
+class TokenAuthenticationTestCase(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.token_usage = TokenUsageTracker(interval=60)
+        patcher = mock.patch(
+            "planoraAPI.settings.custom_DRF_settings.authentication.token_usage",
+            self.token_usage,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = CustomUser.objects.create(email="user@planora.test", name="U")
+        self.token = UserAuthTokens.objects.create(
+            user=self.user,
+            auth_token_digest=hash_token("auth"),
+            device_token="device",
+            type="web",
+        )
+
+    def authenticate(self, auth_token="auth"):
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=auth_token)
+        return TokenAuthentication().authenticate(request)
+
+    def test_cached_after_first_lookup(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.authenticate()[0], self.user)
+        with self.assertNumQueries(0):
+            user = self.authenticate()[0]
+
+        self.assertEqual((user.pk, user.email), (self.user.pk, self.user.email))
+        self.assertIsNot(user, self.authenticate()[0])
+        self.assertEqual(
+            token_cache.get_stats(),
+            {"hits": 2, "misses": 1, "hit_rate": 2 / 3, "size": 1},
+        )
+
+    def test_revoked_token_is_rejected(self):
+        self.authenticate()
+        revoke_tokens("auth", "device")
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_deactivated_user_is_rejected(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_cache_is_bounded(self):
+        cache = TokenCache(max_size=2, ttl=60)
+        for auth_token in ["a", "b", "c"]:
+            cache.set(hash_token(auth_token), self.token.pk, self.user)
+
+        self.assertIsNone(cache.get(hash_token("a")))
+        self.assertEqual(cache.get(hash_token("c"))[1].pk, self.user.pk)
+        self.assertEqual(list(cache.entries), [hash_token("b"), hash_token("c")])
+
+    def test_last_used_at_is_written_behind(self):
+        other = UserAuthTokens.objects.create(
+            user=self.user,
+            auth_token_digest=hash_token("other"),
+            device_token="other",
+            type="api",
+        )
+        self.authenticate()
+        self.authenticate("other")
+        self.authenticate()
+
+        self.token.refresh_from_db()
+        self.assertIsNone(self.token.last_used_at)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.token_usage.flush(), 2)
+        self.token.refresh_from_db()
+        other.refresh_from_db()
+        self.assertIsNotNone(self.token.last_used_at)
+        self.assertGreater(self.token.last_used_at, other.last_used_at)
+        self.assertEqual(self.token_usage.flush(), 0)
+
+    def test_flushed_on_the_first_request_after_the_interval(self):
+        self.token_usage.interval = 0
+
+        self.authenticate()
+
+        self.token.refresh_from_db()
+        self.assertIsNotNone(self.token.last_used_at)
+
+    def test_tokens_are_stored_as_digests(self):
+        self.user.set_password("password")
+        self.user.save()
+
+        tokens = authorize_user({"email": self.user.email, "password": "password"})[
+            "tokens"
+        ]
+
+        user_auth_token = UserAuthTokens.objects.get(
+            device_token=tokens["device_token"]
+        )
+        self.assertEqual(
+            user_auth_token.auth_token_digest, hash_token(tokens["auth_token"])
+        )
+        self.assertEqual(self.authenticate(tokens["auth_token"])[0], self.user)
+
+    @override_settings(AUTH_TOKENS_PER_USER=2)
+    def test_logins_keep_the_most_recently_used_tokens(self):
+        self.user.set_password("password")
+        self.user.save()
+        newer = UserAuthTokens.objects.create(
+            user=self.user,
+            auth_token_digest=hash_token("newer"),
+            device_token="newer",
+            type="web",
+        )
+        UserAuthTokens.objects.filter(pk=self.token.pk).update(
+            created_at=timezone.now() - timedelta(days=2),
+            last_used_at=timezone.now(),
+        )
+        UserAuthTokens.objects.filter(pk=newer.pk).update(
+            created_at=timezone.now() - timedelta(days=1)
+        )
+
+        tokens = authorize_user({"email": self.user.email, "password": "password"})[
+            "tokens"
+        ]
+
+        self.assertEqual(
+            set(self.user.auth_tokens.values_list("device_token", flat=True)),
+            {"device", tokens["device_token"]},
+        )
+
+    def test_idle_tokens_are_cleared(self):
+        idle = UserAuthTokens.objects.create(
+            user=self.user,
+            auth_token_digest=hash_token("idle"),
+            device_token="idle",
+            type="web",
+        )
+        UserAuthTokens.objects.filter(pk=idle.pk).update(
+            created_at=timezone.now() - timedelta(days=91)
+        )
+        self.authenticate("idle")
+
+        call_command("clear_expired_tokens", "--idle-days=90", stdout=mock.Mock())
+
+        self.assertEqual(
+            list(self.user.auth_tokens.values_list("device_token", flat=True)),
+            ["device"],
+        )
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate("idle")
+
+
+@override_settings(AUTH_SIGNED_TOKENS=True)
+class SignedTokenAuthenticationTestCase(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.revocation_list = RevocationList(interval=60)
+        for target in [
+            "planoraAPI.settings.custom_DRF_settings.authentication.revocation_list",
+            "users.utils.revocation_list",
+        ]:
+            patcher = mock.patch(target, self.revocation_list)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.user = CustomUser.objects.create(email="user@planora.test", name="U")
+        self.user.set_password("password")
+        self.user.save()
+
+    def login(self):
+        return authorize_user({"email": self.user.email, "password": "password"})[
+            "tokens"
+        ]
+
+    def authenticate(self, auth_token):
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=auth_token)
+        return TokenAuthentication().authenticate(request)
+
+    def test_signed_tokens_skip_the_tokens_table(self):
+        tokens = self.login()
+
+        self.assertFalse(UserAuthTokens.objects.exists())
+        self.assertEqual(self.authenticate(tokens["auth_token"])[0], self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(tokens["auth_token"])[0], self.user)
+
+    def test_tampered_and_expired_tokens_are_rejected(self):
+        payload, signature = self.login()["auth_token"].split(":")
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(f"{payload}:{signature[::-1]}")
+        with self.settings(AUTH_SIGNED_TOKEN_TTL=0):
+            expired = self.login()["auth_token"]
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(expired)
+
+    def test_revoked_token_is_rejected(self):
+        tokens, other = self.login(), self.login()
+        self.authenticate(tokens["auth_token"])
+
+        revoke_tokens(tokens["auth_token"], tokens["device_token"])
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(tokens["auth_token"])
+        self.assertEqual(self.authenticate(other["auth_token"])[0], self.user)
+        # Other processes load the revocation from the database
+        other_process = RevocationList(interval=60)
+        self.assertTrue(other_process.is_revoked(tokens["device_token"]))
+
+    def test_expired_revocations_are_cleared_off_the_request_path(self):
+        tokens = self.login()
+        revoke_tokens(tokens["auth_token"], tokens["device_token"])
+        RevokedToken.objects.update(expires_at=timezone.now())
+
+        with self.assertNumQueries(1):
+            self.revocation_list.refresh()
+        self.assertTrue(RevokedToken.objects.exists())
+
+        call_command("clear_expired_tokens", stdout=mock.Mock())
+        self.assertFalse(RevokedToken.objects.exists())
+
+    def test_opaque_tokens_keep_working(self):
+        with self.settings(AUTH_SIGNED_TOKENS=False):
+            tokens = self.login()
+
+        self.assertEqual(self.authenticate(tokens["auth_token"])[0], self.user)
+
+
+class PasswordHashingPoolTestCase(TestCase):
+    def setUp(self):
+        self.pool = PasswordHashingPool(workers=1, queue=0, timeout=10)
+        self.addCleanup(
+            lambda: self.pool.executor and self.pool.executor.shutdown(wait=True)
+        )
+        self.user = CustomUser.objects.create(
+            email="user@planora.test",
+            name="U",
+            password=self.pool.make_password("password"),
+        )
+
+    def test_hashes_in_worker_process(self):
+        self.assertTrue(self.pool.check_password(self.user, "password"))
+        self.assertFalse(self.pool.check_password(self.user, "wrong"))
+        self.assertIsNotNone(self.pool.executor)
+
+    def test_saturated_pool_fails_fast(self):
+        self.pool.slots.acquire()
+        self.addCleanup(self.pool.slots.release)
+
+        with self.assertRaises(PasswordHashingUnavailable):
+            self.pool.check_password(self.user, "password")
+
+        with mock.patch("users.utils.password_hashing", self.pool):
+            response = APIClient().post(
+                "/api/v1/users/obtain-auth-token/",
+                {"email": self.user.email, "password": "password"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+
+    def test_timed_out_hash_keeps_its_slot_until_done(self):
+        self.pool.timeout = 0.1
+
+        with self.assertRaises(PasswordHashingUnavailable):
+            self.pool.run(time.sleep, 2)
+        # The worker is still busy, so no other hash may start
+        self.assertFalse(self.pool.slots.acquire(blocking=False))
+
+        self.pool.timeout = 10
+        deadline = time.monotonic() + 10
+        while not self.pool.slots.acquire(blocking=False):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.05)
+        self.pool.slots.release()
+        self.assertTrue(self.pool.check_password(self.user, "password"))
+
+    def test_recovers_from_a_broken_pool(self):
+        with self.assertRaises(PasswordHashingUnavailable):
+            self.pool.run(os._exit, 1)
+
+        self.assertIsNone(self.pool.executor)
+        self.assertTrue(self.pool.check_password(self.user, "password"))
+
+    def test_registration_inserts_the_user_once(self):
+        with mock.patch("users.views.password_hashing", self.pool), mock.patch(
+            "users.models.CustomUser.save", autospec=True, side_effect=CustomUser.save
+        ) as save:
+            response = APIClient().post(
+                "/api/v1/users/register/",
+                {
+                    "email": "new@planora.test",
+                    "name": "New",
+                    "password": "password",
+                    "location": "Bhopal",
+                    "mobile_no": "9999999999",
+                },
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(save.call_count, 1)
+        self.assertTrue(
+            CustomUser.objects.get(email="new@planora.test").check_password("password")
+        )
+
+
+class OrganisationTagTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(email="user@planora.test", name="U")
+        self.organisations = {}
+        for name, tags in [
+            ("Music", ["live", "music"]),
+            ("Coding", ["coding", " live "]),
+            ("Other", ["music"]),
+        ]:
+            organisation = Organisation.objects.create(
+                name=name, email=f"{name}@planora.test", tags=tags
+            )
+            OrganisationCommittee.objects.create(
+                user=self.user, organisation=organisation
+            )
+            self.organisations[name] = organisation
+        # Organisations the user is not a member of are never listed
+        Organisation.objects.create(
+            name="Foreign", email="foreign@planora.test", tags=["live"]
+        )
+
+    def list_organisations(self, **params):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get("/api/v1/users/organisation-list/", params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(
+            organisation["details"]["name"]
+            for organisation in response.json()["organisations"]
+        )
+
+    def test_organisations_filtered_by_tags(self):
+        self.assertEqual(self.list_organisations(), ["Coding", "Music", "Other"])
+        self.assertEqual(self.list_organisations(tags="live"), ["Coding", "Music"])
+        self.assertEqual(self.list_organisations(tags=["live", "music"]), ["Music"])
+        self.assertEqual(
+            self.list_organisations(tags=["coding", "music"], tags_match="any"),
+            ["Coding", "Music", "Other"],
+        )
+
+    def test_edited_tags_are_reindexed(self):
+        organisation = self.organisations["Other"]
+        organisation.tags = ["Live"]
+        organisation.save()
+
+        self.assertEqual(
+            self.list_organisations(tags="LIVE"), ["Coding", "Music", "Other"]
+        )
+        self.assertEqual(self.list_organisations(tags="music"), ["Music"])
+
+
+@override_settings(RATE_LIMITS={"login": {"ip": "3/min", "email": "2/min"}})
+class RateLimitTestCase(TestCase):
+    def setUp(self):
+        patcher = mock.patch(
+            "planoraAPI.settings.custom_DRF_settings.throttling.get_rate_limit_backend",
+            return_value=LocalBackend(),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def login(self, email, ip="10.0.0.1", **headers):
+        return APIClient().post(
+            "/api/v1/users/obtain-auth-token/",
+            {"email": email, "password": "password"},
+            format="json",
+            REMOTE_ADDR=ip,
+            **headers,
+        )
+
+    def test_token_bucket(self):
+        state, wait = take_token(None, 2, 60, now=0)
+        state, wait = take_token(state, 2, 60, now=0)
+        self.assertEqual((state, wait), ((0, 0), 0))
+
+        state, wait = take_token(state, 2, 60, now=15)
+        self.assertEqual(wait, 15)  # half a token refilled, 30 s per token
+        self.assertEqual(take_token(state, 2, 60, now=30)[1], 0)
+
+    def test_login_is_throttled_by_email_and_ip(self):
+        rejected = get_rate_limit_stats().get("login:email", {}).get("rejected", 0)
+
+        self.assertEqual(self.login("a@planora.test").status_code, 400)
+        self.assertEqual(self.login("A@planora.test ").status_code, 400)
+        response = self.login("a@planora.test")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "30")
+        self.assertEqual(
+            get_rate_limit_stats()["login:email"]["rejected"], rejected + 1
+        )
+
+        # The IP bucket (3/min) ran out as well; other IPs are unaffected
+        self.assertEqual(self.login("b@planora.test").status_code, 429)
+        self.assertEqual(self.login("b@planora.test", ip="10.0.0.2").status_code, 400)
+
+    def test_forwarded_for_header_cannot_bypass_the_ip_bucket(self):
+        for i in range(3):
+            response = self.login(
+                f"{i}@planora.test", HTTP_X_FORWARDED_FOR=f"192.0.2.{i}"
+            )
+            self.assertEqual(response.status_code, 400)
+
+        response = self.login("3@planora.test", HTTP_X_FORWARDED_FOR="192.0.2.3")
+        self.assertEqual(response.status_code, 429)
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1})
+    def test_client_ip_read_behind_a_proxy(self):
+        for i in range(3):
+            self.login(f"{i}@planora.test", HTTP_X_FORWARDED_FOR="spoofed, 192.0.2.1")
+
+        response = self.login("3@planora.test", HTTP_X_FORWARDED_FOR="192.0.2.2")
+        self.assertEqual(response.status_code, 400)
+
+    def test_cache_backend_buckets_are_atomic(self):
+        caches["ratelimit"].clear()
+        backend = CacheBackend()
+        barrier = threading.Barrier(20)
+
+        def consume():
+            barrier.wait()
+            return backend.consume("atomic", 5, 60)
+
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            waits = list(executor.map(lambda _: consume(), range(20)))
+        self.assertEqual(waits.count(0), 5)
+
+        # A bucket locked by a request that never finishes throttles the others
+        caches["ratelimit"].add("ratelimit:locked:lock", 1)
+        with mock.patch.object(CacheBackend, "lock_wait", 0.01):
+            self.assertEqual(backend.consume("locked", 5, 60), 12)
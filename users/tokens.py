@@ -0,0 +1,383 @@
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Case, DateTimeField, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from users.models import CustomUser, RevokedToken, UserAuthTokens
+
+SIGNED_TOKEN_SALT = "users.tokens.signed"
+
+
+def hash_token(auth_token: str) -> str:
+    """
+    Digest under which an auth token is stored and looked up.
+
+    Args:
+        auth_token (str): Auth token.
+
+    Returns:
+        str: Hex SHA-256 digest (64 characters).
+    """
+    return hashlib.sha256(auth_token.encode("utf-8")).hexdigest()
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of auth token -> user snapshot, kept per process.
+
+    A snapshot holds the column values of the user, so each hit builds a fresh
+    CustomUser (no instance is shared between requests) without a query.
+    Entries expire after ``AUTH_TOKEN_CACHE_TTL`` seconds, which bounds how
+    long another process may serve a revoked token or deactivated user; in this
+    process, revocation and deactivation drop the entries at once (see
+    users.signals).
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        """
+        Args:
+            max_size (int): Maximum number of cached tokens (least recently
+                used ones are evicted first); 0 disables the cache.
+            ttl (int): Seconds an entry is served for.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        """
+        Look up the user of a token.
+
+        Args:
+            key (str | tuple): Digest of the opaque token of the request
+                (hash_token), or the user key of a signed token (get_user_key).
+
+        Returns:
+            tuple | None: Token id and user (built from the snapshot), or None on
+            a miss.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+
+        return entry[1], CustomUser.from_db(DEFAULT_DB_ALIAS, entry[2], entry[3])
+
+    def set(self, key, token_id: int | None, user: CustomUser):
+        """
+        Cache the snapshot of the user of a token.
+
+        Args:
+            key (str | tuple): Digest of the opaque token of the request
+                (hash_token), or the user key of a signed token (get_user_key).
+            token_id (int | None): Id of its UserAuthTokens row (None if signed).
+            user (CustomUser): Its user, as loaded from the database.
+        """
+        if not self.max_size:
+            return
+
+        attnames = tuple(field.attname for field in user._meta.concrete_fields)
+        values = tuple(getattr(user, attname) for attname in attnames)
+        with self.lock:
+            self.entries[key] = (
+                time.monotonic() + self.ttl,
+                token_id,
+                attnames,
+                values,
+            )
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, keys=(), user_ids=()):
+        """
+        Drop the entries of the given tokens and of the tokens of the given users.
+
+        Args:
+            keys (iterable): Keys of the tokens to drop.
+            user_ids (iterable): Users whose tokens are dropped.
+        """
+        user_ids = set(user_ids)
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+            if user_ids:
+                for key, (*_, attnames, values) in list(self.entries.items()):
+                    if values[attnames.index("id")] in user_ids:
+                        del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+    def get_stats(self) -> dict:
+        """Returns the hit/miss counters of the cache (of this process)"""
+
+        with self.lock:
+            hits, misses, size = self.hits, self.misses, len(self.entries)
+
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "size": size,
+        }
+
+
+class TokenUsageTracker:
+    """
+    Write-behind tracker of ``UserAuthTokens.last_used_at``, kept per process.
+
+    Requests only record the use of their token in memory; every
+    ``AUTH_TOKEN_USAGE_FLUSH_INTERVAL`` seconds the next request flushes the
+    recorded times in a single ``UPDATE ... SET last_used_at = CASE id ...``.
+    Times recorded since the last flush are lost if the process stops.
+    """
+
+    def __init__(self, interval: int):
+        """
+        Args:
+            interval (int): Seconds between flushes.
+        """
+        self.interval = interval
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.flushed_at = time.monotonic()
+
+    def record(self, token_id: int):
+        """
+        Record the use of a token now, flushing the recorded uses when due.
+
+        Args:
+            token_id (int): Id of the UserAuthTokens row.
+        """
+        with self.lock:
+            self.pending[token_id] = timezone.now()
+            due = time.monotonic() - self.flushed_at >= self.interval
+
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write the recorded uses to the database.
+
+        Returns:
+            int: Number of tokens updated.
+        """
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.flushed_at = time.monotonic()
+
+        if not pending:
+            return 0
+
+        return UserAuthTokens.objects.filter(pk__in=pending).update(
+            last_used_at=Case(
+                *[
+                    When(pk=token_id, then=Value(used_at))
+                    for token_id, used_at in pending.items()
+                ],
+                output_field=DateTimeField(),
+            )
+        )
+
+
+def prune_user_tokens(user: CustomUser, keep: int) -> int:
+    """
+    Delete the least recently used tokens of a user beyond the newest ``keep``.
+
+    Args:
+        user (CustomUser): User whose tokens are pruned.
+        keep (int): Tokens kept (by last use, else creation); 0 keeps all.
+
+    Returns:
+        int: Number of tokens deleted.
+    """
+    if not keep:
+        return 0
+
+    # Ids are fetched first: MySQL does not allow LIMIT in an IN subquery
+    stale_ids = list(
+        UserAuthTokens.objects.filter(user=user)
+        .order_by(Coalesce("last_used_at", "created_at").desc(), "-pk")
+        .values_list("pk", flat=True)[keep:]
+    )
+    if not stale_ids:
+        return 0
+    return UserAuthTokens.objects.filter(pk__in=stale_ids).delete()[0]
+
+
+def delete_idle_tokens(idle_days: int) -> int:
+    """
+    Delete the tokens not used (or, if never used, created) in ``idle_days``.
+
+    Args:
+        idle_days (int): Days of inactivity after which a token is deleted.
+
+    Returns:
+        int: Number of tokens deleted.
+    """
+    # Flush first, so the pending uses of this process count
+    token_usage.flush()
+    return (
+        UserAuthTokens.objects.alias(used_at=Coalesce("last_used_at", "created_at"))
+        .filter(used_at__lt=timezone.now() - timedelta(days=idle_days))
+        .delete()[0]
+    )
+
+
+def delete_expired_revocations() -> int:
+    """
+    Delete the revocations of signed tokens that have expired anyway.
+
+    Returns:
+        int: Number of revocations deleted.
+    """
+    return RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()[0]
+
+
+def is_signed_token(auth_token: str) -> bool:
+    """Signed tokens are ``<payload>:<signature>``; opaque ones have no colon"""
+
+    return ":" in auth_token
+
+
+def issue_signed_token(user: CustomUser) -> dict:
+    """
+    Issue a stateless auth token, HMAC-signed with ``SECRET_KEY``.
+
+    Args:
+        user (CustomUser): Authorized user.
+
+    Returns:
+        dict: ``auth_token`` (carrying the user id, token id, issue and expiry
+        times) and ``device_token`` (the token id, needed to revoke it).
+    """
+    issued_at = int(time.time())
+    token_id = secrets.token_urlsafe(16)
+    auth_token = signing.Signer(salt=SIGNED_TOKEN_SALT).sign_object(
+        {
+            "uid": user.pk,
+            "jti": token_id,
+            "iat": issued_at,
+            "exp": issued_at + settings.AUTH_SIGNED_TOKEN_TTL,
+        }
+    )
+    return {"auth_token": auth_token, "device_token": token_id}
+
+
+def read_signed_token(auth_token: str):
+    """
+    Verify a signed token, without any database access.
+
+    Args:
+        auth_token (str): Signed token.
+
+    Returns:
+        dict | None: Payload (uid, jti, iat, exp), or None if the signature is
+        invalid or the token expired (revocation is checked separately).
+    """
+    try:
+        payload = signing.Signer(salt=SIGNED_TOKEN_SALT).unsign_object(auth_token)
+    except (signing.BadSignature, ValueError):
+        return None
+
+    if payload["exp"] <= time.time():
+        return None
+    return payload
+
+
+def get_user_key(user_id: int) -> tuple:
+    """Token cache key of the users of signed tokens"""
+
+    return ("user", user_id)
+
+
+class RevocationList:
+    """
+    In-memory set of the revoked signed tokens, backed by RevokedToken.
+
+    Tokens revoked in this process are rejected at once; the ones revoked by
+    other processes once the set is reloaded, every
+    ``AUTH_REVOCATION_REFRESH_INTERVAL`` seconds (checked on use). Rows are
+    only needed until their token would have expired anyway; the
+    clear_expired_tokens command deletes them after that.
+    """
+
+    def __init__(self, interval: int):
+        """
+        Args:
+            interval (int): Seconds between reloads from the database.
+        """
+        self.interval = interval
+        self.token_ids = set()
+        self.lock = threading.Lock()
+        self.refreshed_at = None
+
+    def is_revoked(self, token_id: str) -> bool:
+        if (
+            self.refreshed_at is None
+            or time.monotonic() - self.refreshed_at >= self.interval
+        ):
+            self.refresh()
+        return token_id in self.token_ids
+
+    def revoke(self, token_id: str, expires_at: int):
+        """
+        Revoke a signed token.
+
+        Args:
+            token_id (str): ``jti`` of the token.
+            expires_at (int): ``exp`` of the token (unix time).
+        """
+        RevokedToken.objects.get_or_create(
+            token_id=token_id,
+            defaults={
+                "expires_at": timezone.now()
+                + timedelta(seconds=max(expires_at - time.time(), 0))
+            },
+        )
+        with self.lock:
+            self.token_ids.add(token_id)
+
+    def refresh(self):
+        """Reloads the revoked tokens that have not expired yet (read-only, as it
+        runs on the request path)"""
+
+        token_ids = set(
+            RevokedToken.objects.filter(expires_at__gt=timezone.now()).values_list(
+                "token_id", flat=True
+            )
+        )
+        with self.lock:
+            self.token_ids = token_ids
+            self.refreshed_at = time.monotonic()
+
+
+token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE, settings.AUTH_TOKEN_CACHE_TTL)
+token_usage = TokenUsageTracker(settings.AUTH_TOKEN_USAGE_FLUSH_INTERVAL)
+revocation_list = RevocationList(settings.AUTH_REVOCATION_REFRESH_INTERVAL)
+
+
+def get_token_cache_stats() -> dict:
+    """Returns the hit/miss counters of the auth token cache of this process"""
+
+    return token_cache.get_stats()
@@ -1,12 +1,24 @@
 import secrets
 
+from django.conf import settings
+
 from users.models import (
     CustomUser,
+    OrganisationTag,
     UserAuthTokens,
     UserVerificationOTP,
     # UserVerificationOTP,
 )
+from users.hashing import password_hashing
 from users.serializers import UserSerializer
+from users.tokens import (
+    hash_token,
+    issue_signed_token,
+    prune_user_tokens,
+    read_signed_token,
+    revocation_list,
+)
+from utils.tags import sync_tags
 
 
 def generate_tokens():
@@ -32,26 +44,31 @@ def authorize_user(data):
     if not user:
         return None
 
-    if not user.check_password(data["password"]):
+    # Hashed off the request thread (raises a 503 when the pool is saturated)
+    if not password_hashing.check_password(user, data["password"]):
         return {"error": "Invalid Password"}
 
-    tokens = generate_tokens()
+    return issue_tokens(user)
 
-    existing_tokens = UserAuthTokens.objects.filter(user=user).first()
-
-    if not existing_tokens:
-        UserAuthTokens(
-            user=user,
-            auth_token=tokens["auth_token"],
-            device_token=tokens["device_token"],
-            type="web",
-        ).save()
-    else:
-        tokens = {
-            "auth_token": existing_tokens.auth_token,
-            "device_token": existing_tokens.device_token,
+
+def issue_tokens(user):
+    if settings.AUTH_SIGNED_TOKENS:
+        return {
+            "tokens": issue_signed_token(user),
+            "user_details": UserSerializer(user).details_serializer(),
         }
 
+    tokens = generate_tokens()
+
+    # Only the digest is stored, so every login issues a new token
+    UserAuthTokens(
+        user=user,
+        auth_token_digest=hash_token(tokens["auth_token"]),
+        device_token=tokens["device_token"],
+        type="web",
+    ).save()
+    prune_user_tokens(user, settings.AUTH_TOKENS_PER_USER)
+
     return {
         "tokens": tokens,
         "user_details": UserSerializer(user).details_serializer(),
@@ -59,8 +76,15 @@ def authorize_user(data):
 
 
 def revoke_tokens(auth_token, device_token):
+    payload = read_signed_token(auth_token)
+    if payload is not None:
+        # The device token of a signed token is its id
+        if payload["jti"] == device_token:
+            revocation_list.revoke(payload["jti"], payload["exp"])
+        return
+
     UserAuthTokens.objects.filter(
-        auth_token=auth_token, device_token=device_token
+        auth_token_digest=hash_token(auth_token), device_token=device_token
     ).delete()
 
 
@@ -68,8 +92,8 @@ def create_user(email, name, password):
     user = CustomUser(
         email=email,
         name=name,
-    ).save()
-    user.set_password(password)
+        password=password_hashing.make_password(password),
+    )
     user.save()
 
     return user
@@ -84,5 +108,9 @@ def create_verification_otp(email):
     return otp
 
 
+def sync_organisation_tags(*organisations):
+    sync_tags(OrganisationTag, "organisation", list(organisations))
+
+
 # def verify_otp(user, otp):
 #     return UserVerificationOTP.objects.filter(user=user, otp=otp).first()
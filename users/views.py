@@ -3,11 +3,17 @@ from rest_framework.response import Response
 from rest_framework.validators import ValidationError
 from rest_framework.views import APIView
 
+from planoraAPI.settings.custom_DRF_settings.throttling import (
+    EmailTokenBucketThrottle,
+    IPTokenBucketThrottle,
+)
 from users.emails import send_verification_email
+from users.hashing import password_hashing
 from users.models import (
     CustomUser,
     Organisation,
     OrganisationCommittee,
+    OrganisationTag,
     UserPreference,
     UserVerificationOTP,
 )
@@ -16,13 +22,20 @@ from users.serializers import (
     UserPreferenceSerializer,
     UserSerializer,
 )
-from users.utils import authorize_user, create_verification_otp
+from users.utils import (
+    authorize_user,
+    create_verification_otp,
+    issue_tokens,
+)
 from users.validator import (
     OrganisationCreateInputValidator,
     UserObtainAuthTokenInputValidator,
     UserPreferenceInputValidator,
     UserRegistrationInputValidator,
 )
+from utils.fields import get_requested_fields
+from utils.streaming import StreamingJSONListResponse
+from utils.tags import filter_by_tags
 
 
 class UserObtainAuthTokenAPI(APIView):
@@ -34,6 +47,9 @@ class UserObtainAuthTokenAPI(APIView):
 
     permission_classes = []
     authentication_classes = []
+    max_body_size = 4 * 1024  # bytes, credentials only
+    throttle_classes = [IPTokenBucketThrottle, EmailTokenBucketThrottle]
+    throttle_scope = "login"
 
     def post(self, request):
         """POST Method to generate and serve the auth tokens
@@ -50,6 +66,8 @@ class UserObtainAuthTokenAPI(APIView):
             - Errors
                 - User not found (email field)
                 - incorrect password (password field)
+                - Too many logins in progress (503, password hashing pool full)
+                - Request was throttled (429, per IP / email)
             - Successes
                 - tokens and user details
 
@@ -78,6 +96,7 @@ class UserRegistrationAPI(APIView):
 
     permission_classes = []
     authentication_classes = []
+    max_body_size = 4 * 1024  # bytes, credentials only
 
     def post(self, request):
         """POST Method to register a user
@@ -95,6 +114,7 @@ class UserRegistrationAPI(APIView):
         Possible Outputs:
             - Errors
             - email already exists (email field)
+            - Too many logins in progress (503, password hashing pool full)
             - Successes
             - tokens and user details
 
@@ -115,12 +135,12 @@ class UserRegistrationAPI(APIView):
             is_active=True,
             is_staff=False,
             is_superuser=False,
+            # Hashed off the request thread, so the user is inserted once
+            password=password_hashing.make_password(validated_data["password"]),
         )
         user.save()
-        user.set_password(validated_data["password"])
-        user.save()
 
-        user_authorization = authorize_user(validated_data)
+        user_authorization = issue_tokens(user)
 
         return Response(user_authorization, status=status.HTTP_201_CREATED)
 
@@ -133,6 +153,9 @@ class UserSendVerificationOTPAPI(APIView):
     """
 
     permission_classes = []
+    max_body_size = 4 * 1024  # bytes, credentials only
+    throttle_classes = [IPTokenBucketThrottle, EmailTokenBucketThrottle]
+    throttle_scope = "otp"
 
     def post(self, request):
         """POST Method to send OTP for user verification
@@ -146,6 +169,7 @@ class UserSendVerificationOTPAPI(APIView):
         Possible Outputs:
             - Errors
             - User not found (email field)
+            - Request was throttled (429, per IP / email)
             - Successes
             - success message
 
@@ -172,6 +196,7 @@ class UserVerifyOTPAPI(APIView):
     """
 
     permission_classes = []
+    max_body_size = 4 * 1024  # bytes, credentials only
 
     def post(self, request):
         """POST Method to verify OTP for user verification
@@ -223,26 +248,39 @@ class UserListAPI(APIView):
     def get(self, request):
         """GET Method to list all users
 
+        Query Params:
+            - fields (sparse fieldset of id, email, name)
+
         Output Serializer:
-            - User Serializer (details_serializer)
+            - User Serializer (details_serializer) (streamed in chunks)
 
         Possible Outputs:
             - Errors
-            - None
+            - Invalid field (fields field)
             - Successes
             - list of users
 
         """
 
-        users = CustomUser.objects.all()
+        fields = get_requested_fields(request, UserSerializer.CONDENSED_FIELDS)
 
-        return Response(
-            {
-                "users": [
-                    UserSerializer(user).condensed_details_serializer()
-                    for user in users
-                ]
-            },
+        if fields:
+            # The requested columns are read as dicts, in the requested order
+            return StreamingJSONListResponse(
+                "users",
+                CustomUser.objects.order_by("pk").values(*fields),
+                list,
+                status=status.HTTP_200_OK,
+            )
+
+        users = CustomUser.objects.order_by("pk")
+
+        return StreamingJSONListResponse(
+            "users",
+            UserSerializer.CONDENSED_ROWS.read(users),
+            lambda chunk: [
+                UserSerializer(user).condensed_details_serializer() for user in chunk
+            ],
             status=status.HTTP_200_OK,
         )
 
@@ -327,6 +365,9 @@ class UserOrganisationListAPI(APIView):
     def get(self, request):
         """GET Method to list organisations for a user
 
+        Query Params:
+            - tags, tags_match (all / any)
+
         Output Serializer:
             - Organisation Serializer (details_serializer)
 
@@ -338,7 +379,21 @@ class UserOrganisationListAPI(APIView):
         """
 
         user = request.user
-        organisation_committees = OrganisationCommittee.objects.filter(user=user)
+        organisation_committees = OrganisationCommittee.objects.filter(
+            user=user
+        ).select_related("organisation")
+
+        tags = request.GET.getlist("tags")
+        if tags:
+            organisation_committees = organisation_committees.filter(
+                organisation__in=filter_by_tags(
+                    Organisation.objects.all(),
+                    OrganisationTag,
+                    "organisation",
+                    tags,
+                    match_all=request.GET.get("tags_match", "all") != "any",
+                )
+            )
 
         return Response(
             {
@@ -0,0 +1,54 @@
+import hashlib
+
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def get_etag(*parts) -> str:
+    """
+    Build a strong ETag from the values a representation depends on.
+
+    Args:
+        parts: Values identifying the representation (ids, versions, ...).
+
+    Returns:
+        str: Quoted ETag.
+    """
+    digest = hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def is_not_modified(request, etag: str) -> bool:
+    """
+    Check the ``If-None-Match`` header of a request against an ETag.
+
+    Args:
+        request (Request): Incoming request.
+        etag (str): Current ETag of the representation.
+
+    Returns:
+        bool: True if the client's copy is current (answer with a 304).
+    """
+    if_none_match = request.headers.get("If-None-Match")
+    if not if_none_match:
+        return False
+
+    etags = parse_etags(if_none_match)
+    # If-None-Match uses the weak comparison
+    return "*" in etags or etag.removeprefix("W/") in [
+        tag.removeprefix("W/") for tag in etags
+    ]
+
+
+def not_modified_response(etag: str) -> Response:
+    """
+    Build the bodyless 304 response of a conditional GET.
+
+    Args:
+        etag (str): Current ETag of the representation.
+
+    Returns:
+        Response: 304 Not Modified.
+    """
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,90 @@
+from rest_framework.validators import ValidationError
+
+FIELDS_QUERY_PARAM = "fields"
+
+
+def get_requested_fields(request, fields: list, nested_fields: dict = None):
+    """
+    Parse the sparse fieldset of a request (``?fields=id,name,organisation.name``).
+
+    Args:
+        request (Request): Incoming request.
+        fields (list): Fields the endpoint can return.
+        nested_fields (dict): Fields of the nested objects (e.g. ``organisation``).
+
+    Returns:
+        list | None: Requested fields in the requested order, or None (all fields).
+    """
+    value = request.GET.get(FIELDS_QUERY_PARAM, "")
+    requested = list(
+        dict.fromkeys(field.strip() for field in value.split(",") if field.strip())
+    )
+    if not requested:
+        return None
+
+    nested_fields = nested_fields or {}
+    for field in requested:
+        key, _, child = field.partition(".")
+        if key not in fields or (child and child not in nested_fields.get(key, [])):
+            raise ValidationError(
+                {"error": f"Invalid field {field}", "field": FIELDS_QUERY_PARAM}
+            )
+
+    # A whole nested object already covers its dotted fields
+    return [
+        field
+        for field in requested
+        if "." not in field or field.partition(".")[0] not in requested
+    ]
+
+
+def get_only_fields(fields: list, nested_fields: dict = None) -> list:
+    """
+    Map a sparse fieldset to the ``QuerySet.only()`` arguments loading it.
+
+    Args:
+        fields (list): Requested fields (see get_requested_fields).
+        nested_fields (dict): Fields of the nested objects (foreign keys).
+
+    Returns:
+        list: Model field paths (``organisation`` and ``organisation__name`` style).
+    """
+    nested_fields = nested_fields or {}
+    only = ["id"]
+    for field in fields:
+        key, _, child = field.partition(".")
+        only.append(key)
+        if key in nested_fields:
+            only.extend(
+                f"{key}__{nested}"
+                for nested in ([child] if child else nested_fields[key])
+            )
+    return list(dict.fromkeys(only))
+
+
+def serialize_fields(obj, fields: list, nested_fields: dict = None) -> dict:
+    """
+    Serialize the given fields of an object, reading only those attributes (so
+    the fields deferred by ``get_only_fields`` are never loaded).
+
+    Args:
+        obj (Model): Object to serialize.
+        fields (list): Requested fields (see get_requested_fields).
+        nested_fields (dict): Fields of the nested objects (foreign keys).
+
+    Returns:
+        dict: Serialized fields, in the requested order.
+    """
+    nested_fields = nested_fields or {}
+    data = {}
+    for field in fields:
+        key, _, child = field.partition(".")
+        value = getattr(obj, key)
+        if key in nested_fields and value is not None:
+            children = [child] if child else nested_fields[key]
+            nested = data.setdefault(key, {})
+            for nested_field in children:
+                nested[nested_field] = getattr(value, nested_field)
+        else:
+            data[key] = value
+    return data
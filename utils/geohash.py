@@ -0,0 +1,150 @@
+import math
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+KM_PER_DEGREE = 111.32
+
+
+def encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION):
+    """
+    Encode a coordinate into a geohash.
+
+    Args:
+        latitude (float): Latitude in degrees.
+        longitude (float): Longitude in degrees.
+        precision (int): Number of characters of the geohash.
+
+    Returns:
+        str: Geohash of the coordinate.
+    """
+    latitude_range, longitude_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash, bits, bit_count, even = [], 0, 0, True
+
+    while len(geohash) < precision:
+        value, value_range = (
+            (longitude, longitude_range) if even else (latitude, latitude_range)
+        )
+        middle = (value_range[0] + value_range[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            value_range[0] = middle
+        else:
+            value_range[1] = middle
+
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(BASE32[bits])
+            bits, bit_count = 0, 0
+
+    return "".join(geohash)
+
+
+def get_cell_size(precision: int) -> tuple:
+    """
+    Get the size of a geohash cell.
+
+    Args:
+        precision (int): Number of characters of the geohash.
+
+    Returns:
+        tuple: (latitude span, longitude span) of a cell in degrees.
+    """
+    latitude_bits = (5 * precision) // 2
+    longitude_bits = 5 * precision - latitude_bits
+    return 180.0 / 2**latitude_bits, 360.0 / 2**longitude_bits
+
+
+def get_degree_deltas(latitude: float, radius_km: float) -> tuple:
+    """
+    Get the half-size of the bounding box of a circle.
+
+    Args:
+        latitude (float): Latitude of the centre in degrees.
+        radius_km (float): Radius of the circle in km.
+
+    Returns:
+        tuple: (latitude delta, longitude delta) in degrees.
+    """
+    latitude_delta = radius_km / KM_PER_DEGREE
+    longitude_delta = radius_km / (
+        KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01)
+    )
+    return latitude_delta, longitude_delta
+
+
+def get_bounding_box(latitude: float, longitude: float, radius_km: float) -> tuple:
+    """
+    Get the bounding box of a circle. A box crossing the antimeridian is split
+    into two longitude ranges, one on each side of it; a box reaching a pole
+    spans every longitude.
+
+    Args:
+        latitude (float): Latitude of the centre in degrees.
+        longitude (float): Longitude of the centre in degrees.
+        radius_km (float): Radius of the circle in km.
+
+    Returns:
+        tuple: (min latitude, max latitude, list of (min longitude, max
+        longitude) ranges).
+    """
+    latitude_delta, longitude_delta = get_degree_deltas(latitude, radius_km)
+    min_latitude = max(latitude - latitude_delta, -90.0)
+    max_latitude = min(latitude + latitude_delta, 90.0)
+
+    if longitude_delta >= 180.0 or min_latitude == -90.0 or max_latitude == 90.0:
+        longitude_ranges = [(-180.0, 180.0)]
+    elif longitude - longitude_delta < -180.0:
+        longitude_ranges = [
+            (-180.0, longitude + longitude_delta),
+            (longitude - longitude_delta + 360.0, 180.0),
+        ]
+    elif longitude + longitude_delta > 180.0:
+        longitude_ranges = [
+            (longitude - longitude_delta, 180.0),
+            (-180.0, longitude + longitude_delta - 360.0),
+        ]
+    else:
+        longitude_ranges = [(longitude - longitude_delta, longitude + longitude_delta)]
+
+    return min_latitude, max_latitude, longitude_ranges
+
+
+def get_covering_cells(latitude: float, longitude: float, radius_km: float) -> list:
+    """
+    Get the geohash prefixes covering a circle: the cell of the centre and its
+    neighbours, at the finest precision whose cells are larger than the radius.
+
+    Args:
+        latitude (float): Latitude of the centre in degrees.
+        longitude (float): Longitude of the centre in degrees.
+        radius_km (float): Radius of the circle in km.
+
+    Returns:
+        list: Geohash prefixes (at most 9).
+    """
+    latitude_delta, longitude_delta = get_degree_deltas(latitude, radius_km)
+
+    precision = GEOHASH_PRECISION
+    while precision > 1:
+        latitude_span, longitude_span = get_cell_size(precision)
+        if latitude_span >= latitude_delta and longitude_span >= longitude_delta:
+            break
+        precision -= 1
+
+    latitude_span, longitude_span = get_cell_size(precision)
+    if latitude_span < latitude_delta or longitude_span < longitude_delta:
+        # Wider than the coarsest cells (e.g. near a pole): match every geohash
+        return [""]
+
+    cells = {
+        encode(
+            min(max(latitude + i * latitude_span, -90.0), 90.0),
+            (longitude + j * longitude_span + 180.0) % 360.0 - 180.0,
+            precision,
+        )
+        for i in (-1, 0, 1)
+        for j in (-1, 0, 1)
+    }
+    return sorted(cells)
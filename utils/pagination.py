@@ -0,0 +1,126 @@
+import base64
+from datetime import datetime
+
+import ujson
+from django.db.models import Q
+from rest_framework.validators import ValidationError
+
+
+class KeysetPagination:
+    """Keyset (cursor) paginator ordering a queryset on ``(sort_field, pk)``
+
+    Instead of an ``OFFSET`` scan, every page seeks straight past the last row
+    of the previous page, so the cost of a page does not grow with its depth.
+    No ``COUNT(*)`` is issued; clients walk the feed with the opaque
+    ``next_cursor`` / ``previous_cursor`` values.
+    """
+
+    page_size = 25
+    cursor_query_param = "cursor"
+
+    def __init__(self, sort_field: str, descending: bool = False):
+        self.sort_field = sort_field
+        self.descending = descending
+        self.next_cursor = None
+        self.previous_cursor = None
+
+    def encode_cursor(self, obj, reverse: bool) -> str:
+        """Encodes the position of the given row into an opaque cursor
+
+        Args:
+            obj (Model): Row the cursor points at
+            reverse (bool): Whether the cursor walks backwards
+
+        Returns:
+            str: URL safe cursor
+        """
+
+        value = getattr(obj, self.sort_field)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+
+        payload = ujson.dumps({"v": value, "id": obj.pk, "r": reverse})
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, cursor: str, field) -> dict:
+        """Decodes a cursor produced by ``encode_cursor``, checking that its
+        position is a value of the sort field
+
+        Args:
+            cursor (str): Opaque cursor sent by the client
+            field (Field): Model field of the sort field
+
+        Returns:
+            dict: position of the cursor (``v``, ``id`` and ``r`` keys)
+        """
+
+        try:
+            position = ujson.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            value, pk = position["v"], position["id"]
+            reverse = position.get("r", False)
+
+            if field.get_internal_type() == "DateTimeField":
+                if not isinstance(value, str):
+                    raise TypeError("Not an ISO datetime")
+                value = datetime.fromisoformat(value)
+            elif field.get_internal_type() in ["IntegerField", "BigIntegerField"]:
+                if not isinstance(value, int) or isinstance(value, bool):
+                    raise TypeError("Not an integer")
+            elif not isinstance(value, str):
+                raise TypeError("Not a string")
+
+            if not isinstance(pk, int) or isinstance(pk, bool):
+                raise TypeError("Not an id")
+            if not isinstance(reverse, bool):
+                raise TypeError("Not a direction")
+        except (ValueError, TypeError, KeyError, UnicodeError):
+            raise ValidationError({"error": "Invalid cursor", "field": "cursor"})
+
+        return {"v": value, "id": pk, "r": reverse}
+
+    def paginate_queryset(self, queryset, request) -> list:
+        """Returns the rows of the page addressed by the request's cursor
+
+        Args:
+            queryset (QuerySet): Filtered (unordered) queryset
+            request (Request): Incoming request
+
+        Returns:
+            list: rows of the requested page
+        """
+
+        cursor = request.GET.get(self.cursor_query_param)
+        field = queryset.model._meta.get_field(self.sort_field)
+        position = self.decode_cursor(cursor, field) if cursor else None
+        reverse = bool(position and position["r"])
+
+        # Walking backwards flips the direction of both the seek and the order
+        descending = self.descending != reverse
+        prefix = "-" if descending else ""
+        queryset = queryset.order_by(f"{prefix}{self.sort_field}", f"{prefix}pk")
+
+        if position:
+            lookup = "lt" if descending else "gt"
+            queryset = queryset.filter(
+                Q(**{f"{self.sort_field}__{lookup}": position["v"]})
+                | Q(**{self.sort_field: position["v"], f"pk__{lookup}": position["id"]})
+            )
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+
+        if reverse:
+            rows.reverse()
+
+        if rows:
+            has_next = position is not None if reverse else has_more
+            has_previous = has_more if reverse else position is not None
+            self.next_cursor = (
+                self.encode_cursor(rows[-1], reverse=False) if has_next else None
+            )
+            self.previous_cursor = (
+                self.encode_cursor(rows[0], reverse=True) if has_previous else None
+            )
+
+        return rows
@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+
+def parse_rate(rate: str) -> tuple:
+    """
+    Parse a ``"<capacity>/<period>"`` rate (e.g. ``"5/min"``, ``"100/hour"``).
+
+    Args:
+        rate (str): Rate; the period is read from its first letter (s/m/h/d).
+
+    Returns:
+        tuple: Bucket capacity, and seconds to refill it from empty.
+    """
+    capacity, period = rate.split("/")
+    return int(capacity), PERIODS[period[0]]
+
+
+def take_token(state, capacity: int, period: int, now: float) -> tuple:
+    """
+    Take a token from a bucket refilled at ``capacity / period`` tokens/sec.
+
+    Args:
+        state (tuple | None): Tokens left and time of the last update, None
+            for a new (full) bucket.
+        capacity (int): Bucket capacity (burst size).
+        period (int): Seconds to refill the bucket from empty.
+        now (float): Current time.
+
+    Returns:
+        tuple: New state, and seconds to wait for a token (0 if one was taken).
+    """
+    tokens, updated_at = state or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated_at) * capacity / period)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) * period / capacity
+
+
+class LocalBackend:
+    """
+    Token buckets kept in this process (tests, single-process deployments);
+    the least recently used ones are dropped past ``max_size`` buckets.
+    """
+
+    def __init__(self, max_size: int = 100000):
+        self.max_size = max_size
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, period: int) -> float:
+        """
+        Take a token from a bucket.
+
+        Args:
+            key (str): Bucket key (scope and client).
+            capacity (int): Bucket capacity.
+            period (int): Seconds to refill the bucket from empty.
+
+        Returns:
+            float: Seconds to wait for a token, 0 if one was taken.
+        """
+        with self.lock:
+            self.buckets[key], wait = take_token(
+                self.buckets.get(key), capacity, period, time.monotonic()
+            )
+            self.buckets.move_to_end(key)
+            while len(self.buckets) > self.max_size:
+                self.buckets.popitem(last=False)
+        return wait
+
+
+class CacheBackend:
+    """
+    Token buckets kept in the ``ratelimit`` cache, shared by all processes when
+    a shared cache (e.g. redis) is configured. Each read-modify-write of a
+    bucket holds a per-bucket lock taken with the atomic ``cache.add``, so
+    concurrent requests of one client cannot both take the last token. A
+    request that cannot get the lock within ``lock_wait`` seconds is throttled.
+    """
+
+    prefix = "ratelimit"
+    # Seconds after which the lock of a crashed holder expires
+    lock_timeout = 5
+    # Seconds a request waits for a bucket locked by a concurrent one
+    lock_wait = 0.5
+    lock_poll_interval = 0.005
+
+    def consume(self, key: str, capacity: int, period: int) -> float:
+        """See LocalBackend.consume"""
+
+        key = f"{self.prefix}:{key}"
+        cache = caches["ratelimit"]
+
+        deadline = time.monotonic() + self.lock_wait
+        while not cache.add(f"{key}:lock", 1, timeout=self.lock_timeout):
+            if time.monotonic() >= deadline:
+                return period / capacity
+            time.sleep(self.lock_poll_interval)
+
+        try:
+            state, wait = take_token(cache.get(key), capacity, period, time.time())
+            # A bucket untouched for a whole period is full again, like a new one
+            cache.set(key, state, timeout=period)
+        finally:
+            cache.delete(f"{key}:lock")
+        return wait
+
+
+backends = {}
+
+
+def get_rate_limit_backend():
+    """Returns the backend of ``RATE_LIMIT_BACKEND`` (one instance per process)"""
+
+    path = settings.RATE_LIMIT_BACKEND
+    if path not in backends:
+        backends[path] = import_string(path)()
+    return backends[path]
@@ -0,0 +1,82 @@
+from utils.streaming import STREAM_CHUNK_SIZE
+
+
+class RowReader:
+    """
+    Reads a queryset as ``values_list`` tuples into compact ``__slots__`` rows.
+
+    The rows expose the same attributes the hand-written serializers read from
+    model instances (``row.name``, ``row.organisation.name``), so the
+    serializers consume them unchanged, without the model hydration cost
+    (``Model.__init__``, ``_state``, per-instance ``__dict__``, field caches).
+    """
+
+    def __init__(self, name: str, fields: list, related: dict = None):
+        """
+        Args:
+            name (str): Name of the generated row class (e.g. ``"EventRow"``).
+            fields (list): Columns (or annotations) read as attributes.
+            related (dict): Readers of the foreign keys, by field name (e.g.
+                ``{"organisation": RowReader(...)}``), read through joins.
+        """
+        self.fields = list(fields)
+        self.related = related or {}
+        self.row_class = type(name, (), {"__slots__": (*self.fields, *self.related)})
+
+        # Related columns follow the own columns, e.g. organisation__name
+        self.columns = list(self.fields)
+        self.related_slices = []
+        for key, reader in self.related.items():
+            start = len(self.columns)
+            self.columns.extend(f"{key}__{column}" for column in reader.columns)
+            self.related_slices.append((key, reader, slice(start, len(self.columns))))
+
+    def build(self, values: tuple):
+        """
+        Build a row from a ``values_list`` tuple of ``self.columns``.
+
+        Args:
+            values (tuple): Column values.
+
+        Returns:
+            object: Row; a related row is None when its foreign key is null.
+        """
+        row = self.row_class.__new__(self.row_class)
+        for field, value in zip(self.fields, values):
+            setattr(row, field, value)
+        for key, reader, columns in self.related_slices:
+            related = values[columns]
+            # The first related column is its primary key
+            setattr(row, key, reader.build(related) if related[0] is not None else None)
+        return row
+
+    def read(self, queryset) -> "Rows":
+        """
+        Read a queryset as rows.
+
+        Args:
+            queryset (QuerySet): Ordered (and filtered / annotated) queryset.
+
+        Returns:
+            Rows: Lazily read rows.
+        """
+        return Rows(self, queryset.values_list(*self.columns))
+
+
+class Rows:
+    """Rows of a RowReader, iterable like the queryset they are read from"""
+
+    def __init__(self, reader: RowReader, queryset):
+        self.reader = reader
+        self.queryset = queryset
+
+    def __iter__(self):
+        return map(self.reader.build, self.queryset)
+
+    def iterator(self, chunk_size: int = STREAM_CHUNK_SIZE):
+        """
+        Build the rows chunk by chunk (``QuerySet.iterator``). Only the built
+        rows of a chunk are alive at a time, but on MySQL the driver still
+        buffers every value tuple of the query (see StreamingJSONListResponse).
+        """
+        return map(self.reader.build, self.queryset.iterator(chunk_size=chunk_size))
@@ -0,0 +1,61 @@
+from django.http import StreamingHttpResponse
+
+from planoraAPI.settings.custom_DRF_settings.renderers import UJSONRenderer
+
+STREAM_CHUNK_SIZE = 500
+
+
+class StreamingJSONListResponse(StreamingHttpResponse):
+    """
+    Streams a ``{"<key>": [...]}`` JSON response chunk by chunk.
+
+    The queryset is iterated in chunks (``QuerySet.iterator``); each chunk is
+    hydrated, serialized, encoded with UJSONRenderer and sent before the next
+    one is, so neither the model instances, their dicts nor the JSON body are
+    ever all held in memory. The database driver may still buffer the raw
+    result set: mysqlclient (production) fetches every row of the query into
+    the client when it is executed, so memory grows with the row count there,
+    though far slower than when the whole list is built. Only backends with
+    server-side cursors (PostgreSQL, SQLite) stream in constant memory.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        queryset,
+        serializer,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        status: int = 200,
+    ):
+        """
+        Args:
+            key (str): Envelope key of the list (e.g. ``"events"``).
+            queryset (QuerySet): Ordered rows to stream.
+            serializer (callable): Serializes a list of rows into a list of dicts.
+            chunk_size (int): Number of rows fetched and encoded at a time.
+            status (int): HTTP status code.
+        """
+        super().__init__(
+            self.stream(key, queryset, serializer, chunk_size),
+            content_type="application/json",
+            status=status,
+        )
+
+    @staticmethod
+    def stream(key: str, queryset, serializer, chunk_size: int):
+        renderer = UJSONRenderer()
+        # Opening of the envelope, e.g. b'{"events":['
+        yield renderer.render({key: []})[:-2]
+
+        separator = b""
+        chunk = []
+        for row in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield separator + renderer.render(serializer(chunk))[1:-1]
+                separator, chunk = b",", []
+
+        if chunk:
+            yield separator + renderer.render(serializer(chunk))[1:-1]
+
+        yield b"]}"
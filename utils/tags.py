@@ -0,0 +1,65 @@
+from django.db.models import Count
+
+TAG_MAX_LENGTH = 100
+
+
+def normalize_tags(tags) -> list:
+    """
+    Normalize a JSON list of tags for the tag side tables.
+
+    Args:
+        tags (list | None): Tags as stored in a ``tags`` JSONField.
+
+    Returns:
+        list: Unique, stripped, case folded, non-empty tags (in their original
+            order).
+    """
+    if not isinstance(tags, list):
+        return []
+
+    normalized = (str(tag).strip().casefold()[:TAG_MAX_LENGTH] for tag in tags)
+    return list(dict.fromkeys(tag for tag in normalized if tag))
+
+
+def filter_by_tags(queryset, tag_model, field: str, tags: list, match_all=True):
+    """
+    Filter a queryset through its tag side table.
+
+    Args:
+        queryset (QuerySet): Queryset to filter (events, organisations, ...).
+        tag_model (Model): Tag side table with a ``tag`` column.
+        field (str): Name of the foreign key from the tag model to the queryset's model.
+        tags (list): Tags to filter by.
+        match_all (bool): Match rows having all the tags (AND) or any of them (OR).
+
+    Returns:
+        QuerySet: Filtered queryset.
+    """
+    tags = normalize_tags(tags)
+    if not tags:
+        return queryset
+
+    tagged = tag_model.objects.filter(tag__in=tags).values(f"{field}_id")
+    if match_all and len(tags) > 1:
+        tagged = tagged.annotate(matched=Count("tag")).filter(matched=len(tags))
+
+    return queryset.filter(pk__in=tagged.values(f"{field}_id"))
+
+
+def sync_tags(tag_model, field: str, objs: list):
+    """
+    Replace the tag side table rows of the given objects with their current ``tags``.
+
+    Args:
+        tag_model (Model): Tag side table with a ``tag`` column.
+        field (str): Name of the foreign key from the tag model to the objects' model.
+        objs (list): Saved objects having a ``tags`` JSON list.
+    """
+    tag_model.objects.filter(**{f"{field}__in": objs}).delete()
+    tag_model.objects.bulk_create(
+        [
+            tag_model(**{field: obj, "tag": tag})
+            for obj in objs
+            for tag in normalize_tags(obj.tags)
+        ]
+    )